@@ -0,0 +1,696 @@
+"""
+Benchmark suite untuk throughput Extract, Transform dan Load
+Hasil disimpan sebagai JSON di benchmarks/results/ supaya bisa dibandingkan antar commit
+
+Contoh:
+    python benchmarks/run_benchmarks.py                 # semua grup
+    python benchmarks/run_benchmarks.py --only rr,load  # grup tertentu
+    python benchmarks/run_benchmarks.py --quick         # ukuran kecil (cepat)
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/<baseline>.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from urllib.parse import quote
+
+# Tambahkan path root project
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+BENCHMARKS = {}
+
+
+def benchmark(group):
+    """Decorator untuk mendaftarkan fungsi benchmark per grup"""
+    def decorator(fn):
+        BENCHMARKS[group] = fn
+        return fn
+    return decorator
+
+
+def measure(fn, repeat=5, rows=None):
+    """
+    Mengukur waktu eksekusi fn() sebanyak `repeat` kali
+
+    Returns:
+        dict: statistik waktu (detik) dan throughput rows/detik jika `rows` diberikan
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    result = {
+        'min_s': min(times),
+        'median_s': statistics.median(times),
+        'mean_s': statistics.mean(times),
+        'repeat': repeat
+    }
+    if rows:
+        result['rows'] = rows
+        result['rows_per_s'] = rows / result['median_s'] if result['median_s'] > 0 else float('inf')
+    return result
+
+
+def peak_memory(fn):
+    """Puncak alokasi memori (bytes) selama satu kali fn(), diukur terpisah dari timing"""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@contextlib.contextmanager
+def quiet():
+    """Sembunyikan output print pipeline selama pengukuran"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+@contextlib.contextmanager
+def working_directory(path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def _weather_arrays(n, seed=0):
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    return {
+        'temp': rng.uniform(15, 38, n),
+        'humidity': rng.uniform(20, 100, n),
+        'wind_speed': rng.uniform(0, 8, n)
+    }
+
+
+@benchmark('rr')
+def bench_rr(args):
+    """calculate_total_rr scalar (loop per record) vs calculate_total_rr_batch"""
+    from config.rr_tables import calculate_total_rr, calculate_total_rr_batch
+
+    sizes = [10 ** k for k in range(2, 7)]
+    scalar_limit = 10 ** 6 if args.full else 10 ** 5
+    if args.quick:
+        sizes = sizes[:3]
+
+    results = {}
+    for n in sizes:
+        weather = _weather_arrays(n)
+        pollution = {}
+
+        results[f'rr_batch_{n}'] = measure(
+            lambda: calculate_total_rr_batch(pollution, weather),
+            repeat=5, rows=n
+        )
+
+        if n <= scalar_limit:
+            records = [
+                {'temp': float(t), 'humidity': float(h), 'wind_speed': float(w)}
+                for t, h, w in zip(weather['temp'], weather['humidity'], weather['wind_speed'])
+            ]
+            results[f'rr_scalar_{n}'] = measure(
+                lambda: [calculate_total_rr(pollution, record) for record in records],
+                repeat=3 if n >= 10 ** 5 else 5, rows=n
+            )
+    return results
+
+
+@benchmark('transform')
+def bench_transform(args):
+    """SimpleETL.transform pada payload sintetis berbentuk respons API asli (serial vs process pool)"""
+    from config.config import TRANSFORM_CONFIG
+    from src.etl_pipeline import SimpleETL
+    from src.synthetic_data import make_raw_records
+
+    sizes = [34, 1000] if args.quick else [34, 1000, 10000]
+    if args.full:
+        sizes.append(100000)
+    workers = max(2, os.cpu_count() or 1)
+
+    results = {}
+    for n in sizes:
+        etl = SimpleETL()
+        etl.data = make_raw_records(n)
+
+        def run():
+            with quiet():
+                etl.transform(workers=1)
+
+        results[f'transform_{n}'] = measure(run, repeat=3, rows=n)
+        results[f'transform_{n}']['peak_bytes_per_row'] = peak_memory(run) / n
+
+        if n >= 10000:
+            def run_parallel():
+                with quiet():
+                    etl.transform(workers=workers)
+
+            min_records = TRANSFORM_CONFIG['parallel_min_records']
+            TRANSFORM_CONFIG['parallel_min_records'] = 0
+            try:
+                results[f'transform_parallel_{n}'] = measure(run_parallel, repeat=3, rows=n)
+            finally:
+                TRANSFORM_CONFIG['parallel_min_records'] = min_records
+            results[f'transform_parallel_{n}']['workers'] = workers
+    return results
+
+
+@benchmark('validation')
+def bench_validation(args):
+    """Validasi batch (mask vectorized + parse timestamp) dengan ~1% baris rusak"""
+    from datetime import timedelta
+    import numpy as np
+    from src.validation import validate
+
+    sizes = [10 ** 4, 10 ** 5] if args.quick else [10 ** 4, 10 ** 5, 10 ** 6]
+    results = {}
+    for n in sizes:
+        rng = np.random.default_rng(0)
+        weather = _weather_arrays(n)
+        columns = {
+            'lat': rng.uniform(-11, 6, n), 'lon': rng.uniform(95, 141, n),
+            'pm2_5': rng.gamma(2, 15, n), 'pm10': rng.gamma(2, 25, n), 'no2': rng.gamma(2, 10, n),
+            'so2': rng.gamma(2, 5, n), 'o3': rng.gamma(2, 20, n), 'co': rng.gamma(2, 300, n),
+            'temperature': weather['temp'], 'humidity': weather['humidity'], 'wind_speed': weather['wind_speed'],
+            'pressure': rng.uniform(990, 1020, n), 'cloud_cover': rng.uniform(0, 100, n)
+        }
+        bad = rng.choice(n, n // 100, replace=False)
+        columns['pm2_5'][bad[::2]] = np.nan
+        columns['humidity'][bad[1::2]] = 150
+        now = time.time()
+        timestamps = np.full(n, (datetime.now() - timedelta(minutes=5)).isoformat(), dtype=object)
+        observed = {'pollution': np.full(n, now - 900.0), 'weather': np.full(n, now - 600.0)}
+
+        results[f'validate_{n}'] = measure(lambda: validate(columns, timestamps, observed, now=now), repeat=3, rows=n)
+        results[f'validate_{n}']['us_per_row'] = results[f'validate_{n}']['median_s'] / n * 1e6
+    return results
+
+
+@benchmark('load')
+def bench_load(args):
+    """SimpleETL.load per format output"""
+    from config.config import HISTORY_CONFIG, DEDUP_CONFIG
+    from src.etl_pipeline import SimpleETL
+    from src.synthetic_data import make_raw_records
+
+    n = 1000 if args.quick else 10000
+    etl = SimpleETL()
+    etl.data = make_raw_records(n)
+    with quiet():
+        transformed = etl.transform()
+
+    # Hanya format output yang diukur: jangan tulis ke history store, dan tanpa deteksi
+    # perubahan (repeat kedua akan dianggap "tidak berubah" dan tidak menulis apa pun)
+    history_enabled, dedup_enabled = HISTORY_CONFIG['enabled'], DEDUP_CONFIG['enabled']
+    HISTORY_CONFIG['enabled'] = DEDUP_CONFIG['enabled'] = False
+
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp, working_directory(tmp):
+            for output_format in ['csv', 'json', 'ndjson', 'both']:
+                def run():
+                    with quiet():
+                        etl.load(transformed, output_format)
+
+                results[f'load_{output_format}_{n}'] = measure(run, repeat=3, rows=n)
+    finally:
+        HISTORY_CONFIG['enabled'], DEDUP_CONFIG['enabled'] = history_enabled, dedup_enabled
+    return results
+
+
+@benchmark('json')
+def bench_json(args):
+    """Parse payload API & tulis output JSON: stdlib json vs src.fastjson (orjson jika terpasang) vs NDJSON"""
+    import json
+    import pandas as pd
+    from src import fastjson
+    from src.etl_pipeline import SimpleETL
+    from src.synthetic_data import make_raw_records
+
+    n = 1000 if args.quick else 10000
+    records = make_raw_records(n)
+    payloads = [json.dumps(record['pollution']).encode('utf-8') for record in records]
+    payloads += [json.dumps(record['weather']).encode('utf-8') for record in records]
+
+    results = {
+        f'parse_stdlib_{n}': measure(lambda: [json.loads(p) for p in payloads], repeat=5, rows=len(payloads)),
+        f'parse_fastjson_{n}': measure(lambda: [fastjson.loads(p) for p in payloads], repeat=5, rows=len(payloads))
+    }
+    results[f'parse_fastjson_{n}']['backend'] = fastjson.BACKEND
+
+    etl = SimpleETL()
+    etl.data = records
+    with quiet():
+        df = pd.DataFrame(etl.transform(workers=1))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'out')
+
+        def write_stdlib():
+            # Cara lama: list of dict + json.dump(indent=2)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(df.to_dict('records'), f, indent=2, ensure_ascii=False)
+
+        results[f'write_json_stdlib_{n}'] = measure(write_stdlib, repeat=3, rows=n)
+        results[f'write_json_{n}'] = measure(lambda: fastjson.write_records(df, path), repeat=3, rows=n)
+        results[f'write_ndjson_{n}'] = measure(lambda: fastjson.write_records(df, path, lines=True), repeat=3, rows=n)
+        results[f'write_ndjson_{n}']['bytes'] = os.path.getsize(path)
+        fastjson.write_records(df, path)
+        results[f'write_json_{n}']['bytes'] = os.path.getsize(path)
+    return results
+
+
+@benchmark('extract')
+def bench_extract(args):
+    """SimpleETL.extract terhadap mock server lokal dengan latency buatan, per strategi sumber polusi"""
+    from config.config import RATE_LIMITS
+    from src.mock_api import start_mock_server
+    from src.etl_pipeline import SimpleETL
+    from src.synthetic_data import make_locations
+
+    latencies = [0.0, 0.02] if args.quick else [0.0, 0.02, 0.1]
+    locations = make_locations(args.locations)
+
+    class TimedETL(SimpleETL):
+        # Durasi fetch per kota: hedging menargetkan ekor (p95/max), bukan total
+        def _extract_city(self, *task):
+            start = time.perf_counter()
+            super()._extract_city(*task)
+            self.city_seconds.append(time.perf_counter() - start)
+
+    results = {}
+
+    # Ekor latency WeatherAPI (3% request +0,5 s): bundled vs hedged. Dijalankan pertama dengan
+    # satu run pemanasan supaya sampel latency per proses (dasar hedge_delay) berasal dari server ini.
+    # Rate limit klien dilepas sementara: dengan default 5 req/s durasi per kota didominasi antrean
+    # token bucket, bukan latency server
+    server, base_url = start_mock_server(mode='synthesize', latency=0.02, jitter=0.01,
+                                         slow_rate=0.03, slow_latency=0.5, seed=0)
+    limits = RATE_LIMITS['weatherapi']
+    saved_limits = dict(limits)
+    limits.update(requests_per_second=0, burst=0)
+    try:
+        for strategy in ('bundled', 'hedged'):
+            runs = []
+
+            def run():
+                etl = TimedETL(cities=locations, openweather_base_url=base_url,
+                               weatherapi_base_url=base_url, pollution_strategy=strategy)
+                etl.city_seconds = []
+                with quiet():
+                    etl.extract()
+                runs.append(etl)
+
+            run()
+            result = measure(run, repeat=3, rows=len(locations))
+            seconds = sorted(t for etl in runs[1:] for t in etl.city_seconds)
+            result['city_p50_s'] = seconds[len(seconds) // 2]
+            result['city_p95_s'] = seconds[min(len(seconds) - 1, int(len(seconds) * 0.95))]
+            result['city_max_s'] = seconds[-1]
+            result['weather_requests'] = sum(etl.clients['weatherapi'].summary()['requests'] for etl in runs[1:])
+            result['hedges'] = {key: sum(etl.strategy.summary().get(f'weatherapi:{key}', 0) for etl in runs[1:])
+                                for key in ('hedge_sent', 'hedge_won')}
+            results[f'extract_{len(locations)}loc_tail500ms_{strategy}'] = result
+    finally:
+        limits.update(saved_limits)
+        server.shutdown()
+        server.server_close()
+
+    for latency in latencies:
+        server, base_url = start_mock_server(mode='synthesize', latency=latency, jitter=latency / 2)
+        try:
+            for strategy in ('separate', 'bundled', 'hedged'):
+                def run():
+                    etl = SimpleETL(
+                        cities=locations,
+                        openweather_base_url=base_url,
+                        weatherapi_base_url=base_url,
+                        pollution_strategy=strategy
+                    )
+                    with quiet():
+                        etl.extract()
+
+                suffix = '' if strategy == 'separate' else f'_{strategy}'
+                results[f'extract_{len(locations)}loc_latency{int(latency * 1000)}ms{suffix}'] = measure(
+                    run, repeat=3, rows=len(locations)
+                )
+        finally:
+            server.shutdown()
+            server.server_close()
+    return results
+
+
+@benchmark('api')
+def bench_api(args):
+    """Risk API: request/detik dari snapshot di memori (koneksi keep-alive paralel)"""
+    import http.client
+    import threading
+    import numpy as np
+    import pandas as pd
+    from src.risk_api import RiskAPI, start_risk_api
+    from src.synthetic_data import make_locations
+
+    locations = make_locations(args.locations)
+    rng = np.random.default_rng(0)
+    api = RiskAPI(latest_path=os.path.join(tempfile.mkdtemp(), 'risk_latest.csv'))
+    api.publish(pd.DataFrame({
+        'timestamp': datetime.now().isoformat(),
+        'city': [location['name'] for location in locations],
+        'lat': [location['lat'] for location in locations],
+        'lon': [location['lon'] for location in locations],
+        'pm2_5': rng.uniform(0, 80, len(locations)),
+        'rr_total': rng.uniform(1, 2, len(locations))
+    }), 'bench')
+    start_risk_api(port=0, api=api)
+    host, port = api.address
+
+    requests_total = 2000 if args.quick else 20000
+    clients = 4
+
+    def client(paths):
+        connection = http.client.HTTPConnection(host, port)
+        for path in paths:
+            connection.request('GET', path)
+            connection.getresponse().read()
+        connection.close()
+
+    results = {}
+    city = quote(locations[0]['name'])
+    for name, path in [('city', f'/risk/{city}'), ('latest', '/risk/latest'),
+                       ('nearest', '/risk/nearest?lat=-6.2&lon=106.8')]:
+        def run():
+            threads = [threading.Thread(target=client, args=([path] * (requests_total // clients),))
+                       for _ in range(clients)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        results[f'api_{name}_{clients}clients'] = measure(run, repeat=3, rows=requests_total)
+    return results
+
+
+@benchmark('calibration')
+def bench_calibration(args):
+    """Kalibrasi RR: fit Poisson + bootstrap (serial vs process pool) pada data kasus Jawa Tengah"""
+    from src.calibration import build_dataset, design_matrix, fit_poisson, bootstrap
+
+    df, factors, _ = build_dataset(use_history=False)
+    X, _, _, _ = design_matrix(df, factors)
+    y = df['cases'].to_numpy(dtype=float)
+    beta = fit_poisson(X, y)[0][0]
+
+    replicates = 1000 if args.quick else 10000
+    workers = os.cpu_count() or 1
+    results = {'calibration_fit': measure(lambda: fit_poisson(X, y), repeat=5, rows=len(y))}
+    results['calibration_bootstrap_serial'] = measure(
+        lambda: bootstrap(X, y, beta, replicates, workers=1), repeat=3, rows=replicates)
+    if workers > 1:
+        results[f'calibration_bootstrap_{workers}workers'] = measure(
+            lambda: bootstrap(X, y, beta, replicates, workers=workers), repeat=3, rows=replicates)
+    return results
+
+
+@benchmark('scenarios')
+def bench_scenarios(args):
+    """Scenario engine: ratusan tabel RR alternatif × satu tahun history per jam"""
+    import pandas as pd
+    from src.scenarios import BASELINE, ScenarioEngine, summarize, sweep
+
+    hours = 24 * 30 if args.quick else 24 * 365
+    weather = _weather_arrays(args.locations * hours)
+    history = pd.DataFrame({
+        'city': [f"city_{i}" for i in range(args.locations) for _ in range(hours)],
+        'temperature': weather['temp'], 'humidity': weather['humidity'], 'wind_speed': weather['wind_speed']
+    })
+    rows = len(history)
+
+    # 400 skenario: cut-off bersama (16 kombinasi) vs cut-off berbeda semua (400 kombinasi)
+    shared = [BASELINE] + sweep(['NO2=1.05:1.15:5', 'humidity.edges.2=60:75:16', 'temperature.rr.Panas=1.00:1.12:5'])
+    distinct = [BASELINE] + sweep(['humidity.edges.2=60:75:400'])
+    return {
+        'scenarios_400_shared_edges': measure(lambda: summarize(ScenarioEngine(history).evaluate(shared)),
+                                              repeat=3, rows=rows * (len(shared) - 1)),
+        'scenarios_400_distinct_edges': measure(lambda: summarize(ScenarioEngine(history).evaluate(distinct)),
+                                                repeat=3, rows=rows * (len(distinct) - 1))
+    }
+
+
+@benchmark('alerts')
+def bench_alerts(args):
+    """Alert: self-check end-to-end ke webhook sink lokal + evaluasi aturan untuk banyak kota"""
+    import numpy as np
+    import pandas as pd
+    from src.alerts import AlertEngine, selfcheck
+
+    failures = []
+
+    def check():
+        with quiet():
+            failures[:] = selfcheck(verbose=False)
+
+    timing = measure(check, repeat=1)
+    results = {'alerts_selfcheck': {**timing, 'failed_checks': list(failures), 'failed': bool(failures)}}
+
+    n = 1000 if args.quick else 10000
+    rng = np.random.default_rng(0)
+    latest = pd.DataFrame({
+        'city': [f"city_{i}" for i in range(n)],
+        'risk_category': rng.choice(['Rendah', 'Sedang', 'Tinggi', 'Sangat Tinggi'], n),
+        'rr_total': rng.uniform(1.0, 1.5, n),
+        'pm2_5': rng.gamma(2, 15, n)
+    })
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = AlertEngine(state_path=os.path.join(tmp, 'alert_state.json'))
+        results[f'alerts_evaluate_{n}'] = measure(lambda: engine.evaluate(latest, 'bench', save=False), repeat=3, rows=n)
+    return results
+
+
+@benchmark('cube')
+def bench_cube(args):
+    """Cube agregat history: build per bulan, update satu run, query roll-up/drill-down, retensi"""
+    import numpy as np
+    import pandas as pd
+    from config.rr_tables import INDONESIAN_CITIES
+    from src.cube import RiskCube
+    from src.history_store import HistoryStore
+    from src.maintenance import Maintenance
+
+    hours = pd.date_range('2025-01-01', periods=24 * (30 if args.quick else 365), freq='h')
+    cities = [INDONESIAN_CITIES[i % len(INDONESIAN_CITIES)] for i in range(args.locations)]
+    rng = np.random.default_rng(0)
+    n = len(hours) * len(cities)
+    history = pd.DataFrame({
+        'timestamp': np.repeat(hours.strftime('%Y-%m-%dT%H:%M:%S').to_numpy(), len(cities)),
+        'city': np.tile([f"{city['name']}_{i}" for i, city in enumerate(cities)], len(hours)),
+        'province': np.tile([city['province'] for city in cities], len(hours)),
+        'rr_total': rng.uniform(1.0, 1.5, n),
+        'risk_category': rng.choice(['Rendah', 'Sedang', 'Tinggi', 'Sangat Tinggi'], n),
+        **{m: rng.gamma(2, 15, n) for m in ('pm2_5', 'pm10', 'no2', 'so2', 'o3', 'co')}
+    })
+    months = history['timestamp'].str[:7]
+    parts = {month: part for month, part in history.groupby(months)}
+    last_month = max(parts)
+    run = parts[last_month][parts[last_month]['timestamp'] == parts[last_month]['timestamp'].max()]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        cube = RiskCube(tmp)
+
+        def build():
+            for month, part in parts.items():
+                cube.rebuild_month(month, part)
+
+        results[f'cube_build_{n}'] = measure(build, repeat=3 if args.quick else 1, rows=n)
+        results['cube_update_one_run'] = measure(lambda: cube.update(last_month, run), repeat=5, rows=len(run))
+        results['cube_load'] = measure(lambda: RiskCube(tmp).refresh(), repeat=3, rows=n)
+        cube.refresh('base')
+        for by in ('region', 'province,month', 'city,day', 'region,hour'):
+            results[f"cube_query_{by.replace(',', '_')}"] = measure(
+                lambda: cube.query(by, measures='rr_total,pm2_5'), repeat=5, rows=n)
+
+    # Retensi lewat Maintenance: cube & catatan versi bulan yang dihapus harus ikut hilang
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(os.path.join(tmp, 'history'))
+        store.cube = store.cube or RiskCube(store.root)
+        old = run.assign(timestamp=run['timestamp'].str.replace(last_month, '2000-01', regex=False))
+        store.write_partition('2000-01', old)
+        store.write_partition(last_month, run)
+        maintenance = Maintenance(store=store, output_dir=os.path.join(tmp, 'output'),
+                                  processed_dir=tmp, raw_dir=tmp, now=datetime.strptime(f'{last_month}-28', '%Y-%m-%d'))
+        with quiet():
+            timing = measure(maintenance.apply_retention, repeat=1)
+        months = set(RiskCube(store.root).query('month')['month'].astype(str).str[:7])
+        failures = [message for message, ok in (
+            ("partisi 2000-01 terhapus", store.months() == [last_month]),
+            ("cube 2000-01 terhapus", store.cube.months() == [last_month] and months == {last_month}),
+            ("versi 2000-01 terhapus", list(store.versions()) == [last_month])
+        ) if not ok]
+        results['cube_retention'] = {**timing, 'failed_checks': failures, 'failed': bool(failures)}
+    return results
+
+
+# Budget waktu import (detik, tanpa startup interpreter) untuk jalur start cepat;
+# modul di HEAVY_MODULES tidak boleh ikut ter-import oleh modul-modul ini
+IMPORT_BUDGETS = {'src.cli': 0.05, 'src.etl_pipeline': 0.5, 'src.scheduler': 0.5}
+HEAVY_MODULES = ('pandas', 'plotly', 'sklearn', 'streamlit')
+
+
+@benchmark('import')
+def bench_import(args):
+    """Waktu import modul entry point di proses baru + cek library berat tidak ikut ter-import"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = {}
+    for module, budget in IMPORT_BUDGETS.items():
+        code = (
+            "import json, sys, time\n"
+            "start = time.perf_counter()\n"
+            f"import {module}\n"
+            "elapsed = time.perf_counter() - start\n"
+            f"print(json.dumps([elapsed, [m for m in {HEAVY_MODULES!r} if m in sys.modules]]))"
+        )
+        times, heavy = [], set()
+        for _ in range(3 if args.quick else 7):
+            output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                    check=True, cwd=root).stdout
+            elapsed, loaded = json.loads(output.strip().splitlines()[-1])
+            times.append(elapsed)
+            heavy.update(loaded)
+
+        median = statistics.median(times)
+        results[f'import_{module}'] = {
+            'min_s': min(times), 'median_s': median, 'mean_s': statistics.mean(times), 'repeat': len(times),
+            'budget_s': budget, 'heavy_modules': sorted(heavy),
+            'over_budget': median > budget or bool(heavy)
+        }
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(current, baseline_path, threshold):
+    """
+    Membandingkan hasil dengan baseline JSON (memakai waktu minimum, paling stabil terhadap noise)
+
+    Returns:
+        list: nama benchmark yang lebih lambat dari baseline melebihi threshold
+    """
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    print("\n" + "="*70)
+    print(f"📊 PERBANDINGAN vs {baseline.get('git_commit', '?')} ({os.path.basename(baseline_path)})")
+    print("="*70)
+
+    regressions = []
+    for name, result in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if not base:
+            print(f"   {name:32s}: (baru)")
+            continue
+        ratio = result['min_s'] / base['min_s'] if base['min_s'] > 0 else float('inf')
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  ⚠️ REGRESI'
+            regressions.append(name)
+        print(f"   {name:32s}: {base['min_s']:.6f}s → {result['min_s']:.6f}s ({ratio:.2f}x){flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark ETL pipeline')
+    parser.add_argument('--only', help=f"Grup dipisah koma ({','.join(BENCHMARKS)})")
+    parser.add_argument('--quick', action='store_true', help='Ukuran data kecil')
+    parser.add_argument('--full', action='store_true', help='Termasuk ukuran terbesar (lambat)')
+    parser.add_argument('--locations', type=int, default=34, help='Jumlah lokasi untuk benchmark extract')
+    parser.add_argument('--output', default=RESULTS_DIR, help='Folder hasil JSON')
+    parser.add_argument('--compare', help='File JSON baseline untuk dibandingkan')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Batas regresi (default 10%%)')
+    args = parser.parse_args(argv)
+
+    groups = args.only.split(',') if args.only else list(BENCHMARKS)
+    unknown = [g for g in groups if g not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Grup tidak dikenal: {unknown}")
+
+    print("\n" + "="*70)
+    print("⏱️  ETL BENCHMARK")
+    print("="*70)
+
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': {}
+    }
+
+    for group in groups:
+        print(f"\n▶️  {group}")
+        results = BENCHMARKS[group](args)
+        for name, result in results.items():
+            throughput = f" | {result['rows_per_s']:>14,.0f} rows/s" if 'rows_per_s' in result else ''
+            budget = ''
+            if 'budget_s' in result:
+                budget = f" | budget {result['budget_s']:.2f}s {'❌' if result['over_budget'] else '✅'}"
+                if result['heavy_modules']:
+                    budget += f" (ikut ter-import: {', '.join(result['heavy_modules'])})"
+            if 'failed' in result:
+                budget = f" | self-check {'❌ ' + '; '.join(result['failed_checks']) if result['failed'] else '✅'}"
+            if 'city_p95_s' in result:
+                budget = (f" | per kota p95 {result['city_p95_s']:.3f}s max {result['city_max_s']:.3f}s"
+                          f" | hedge {result['hedges']['hedge_sent']}/{result['weather_requests']} request")
+            print(f"   {name:32s}: {result['median_s']:.6f}s{throughput}{budget}")
+        report['results'].update(results)
+
+    os.makedirs(args.output, exist_ok=True)
+    filename = f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{report['git_commit']}.json"
+    path = os.path.join(args.output, filename)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Hasil tersimpan: {path}")
+
+    over_budget = [name for name, result in report['results'].items() if result.get('over_budget')]
+    if over_budget:
+        print(f"\n❌ {len(over_budget)} import melewati budget: {', '.join(over_budget)}")
+    failed = [name for name, result in report['results'].items() if result.get('failed')]
+    if failed:
+        print(f"\n❌ Self-check gagal: {', '.join(failed)}")
+
+    if args.compare:
+        regressions = compare(report, args.compare, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} benchmark mengalami regresi")
+            sys.exit(1)
+    if over_budget or failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
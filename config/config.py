@@ -28,8 +28,81 @@ CITIES = [
 ]
 
 # API Endpoints
-OPENWEATHER_POLLUTION_URL = "http://api.openweathermap.org/data/2.5/air_pollution"
-WEATHERAPI_URL = "http://api.weatherapi.com/v1/current.json"
+# Base URL bisa diarahkan ke mock server lokal (src/mock_api.py) untuk run offline / load test
+OPENWEATHER_UPSTREAM_URL = "http://api.openweathermap.org"
+WEATHERAPI_UPSTREAM_URL = "http://api.weatherapi.com"
+OPENWEATHER_BASE_URL = os.getenv("OPENWEATHER_BASE_URL", OPENWEATHER_UPSTREAM_URL).rstrip("/")
+WEATHERAPI_BASE_URL = os.getenv("WEATHERAPI_BASE_URL", WEATHERAPI_UPSTREAM_URL).rstrip("/")
+OPENWEATHER_POLLUTION_PATH = "/data/2.5/air_pollution"
+OPENWEATHER_POLLUTION_HISTORY_PATH = "/data/2.5/air_pollution/history"
+OPENWEATHER_POLLUTION_FORECAST_PATH = "/data/2.5/air_pollution/forecast"
+WEATHERAPI_CURRENT_PATH = "/v1/current.json"
+WEATHERAPI_HISTORY_PATH = "/v1/history.json"
+WEATHERAPI_FORECAST_PATH = "/v1/forecast.json"
+OPENWEATHER_POLLUTION_URL = OPENWEATHER_BASE_URL + OPENWEATHER_POLLUTION_PATH
+WEATHERAPI_URL = WEATHERAPI_BASE_URL + WEATHERAPI_CURRENT_PATH
+
+# Rate limit per provider (token bucket)
+# OpenWeatherMap free tier: 60 call/menit; WeatherAPI free tier: kuota bulanan besar
+RATE_LIMITS = {
+    "openweather": {
+        "requests_per_second": float(os.getenv("OPENWEATHER_RPS", "1.0")),
+        "burst": int(os.getenv("OPENWEATHER_BURST", "5"))
+    },
+    "weatherapi": {
+        "requests_per_second": float(os.getenv("WEATHERAPI_RPS", "5.0")),
+        "burst": int(os.getenv("WEATHERAPI_BURST", "10"))
+    }
+}
+
+# Retry dengan exponential backoff + jitter; retry_budget = total retry per run
+RETRY_CONFIG = {
+    "max_attempts": int(os.getenv("RETRY_MAX_ATTEMPTS", "4")),
+    "base_delay": float(os.getenv("RETRY_BASE_DELAY", "0.5")),
+    "max_delay": float(os.getenv("RETRY_MAX_DELAY", "30")),
+    "timeout": float(os.getenv("REQUEST_TIMEOUT", "10")),
+    "retry_budget": int(os.getenv("RETRY_BUDGET", "50"))
+}
+
+# Extract paralel (jumlah thread worker)
+EXTRACT_CONFIG = {
+    "max_workers": int(os.getenv("EXTRACT_WORKERS", "8"))
+}
+
+# Sumber data polusi saat extract (src/providers.py):
+# separate = OpenWeatherMap + WeatherAPI (2 call/kota); bundled = blok air_quality WeatherAPI aqi=yes
+# (1 call/kota, OpenWeatherMap hanya jika blok tidak ada); hedged = bundled + call WeatherAPI kedua
+# jika yang pertama lebih lambat dari persentil latency-nya (OpenWeatherMap jika WeatherAPI gagal)
+POLLUTION_SOURCE_CONFIG = {
+    "strategy": os.getenv("POLLUTION_STRATEGY", "separate"),
+    "hedge_percentile": float(os.getenv("POLLUTION_HEDGE_PERCENTILE", "95")),
+    "hedge_min_samples": int(os.getenv("POLLUTION_HEDGE_MIN_SAMPLES", "20")),
+    "hedge_default_seconds": float(os.getenv("POLLUTION_HEDGE_DEFAULT_SECONDS", "2.0"))
+}
+
+# Forecast risiko ke depan: jumlah jam (24-72) dan maksimum hari forecast WeatherAPI (free tier: 3)
+FORECAST_CONFIG = {
+    "hours": int(os.getenv("FORECAST_HOURS", "72")),
+    "max_days": int(os.getenv("FORECAST_MAX_DAYS", "3"))
+}
+
+# Transform: jumlah proses untuk data besar (paralel hanya jika record >= parallel_min_records)
+# dan batas jumlah record yang detailnya dicetak per kota
+TRANSFORM_CONFIG = {
+    "workers": int(os.getenv("TRANSFORM_WORKERS", str(os.cpu_count() or 1))),
+    "parallel_min_records": int(os.getenv("TRANSFORM_PARALLEL_MIN_RECORDS", "20000")),
+    "verbose_max_records": int(os.getenv("TRANSFORM_VERBOSE_MAX_RECORDS", "100"))
+}
+
+# Retry otomatis (sekali) untuk kota/sumber yang gagal, N menit setelah run terjadwal (0 = nonaktif)
+RETRY_FAILED_DELAY_MINUTES = int(os.getenv("RETRY_FAILED_DELAY_MINUTES", "10"))
+
+# Mock API server lokal (record/replay)
+MOCK_API_CONFIG = {
+    "host": os.getenv("MOCK_API_HOST", "127.0.0.1"),
+    "port": int(os.getenv("MOCK_API_PORT", "8765")),
+    "recordings_dir": BASE_DIR / "data" / "raw" / "recordings"
+}
 
 # Database Configuration
 DATABASE_CONFIG = {
@@ -52,6 +125,7 @@ DATA_PATHS = {
     "raw": BASE_DIR / "data" / "raw",
     "processed": BASE_DIR / "data" / "processed",
     "output": BASE_DIR / "output",
+    "history": BASE_DIR / "data" / "history",
     "models": BASE_DIR / "models"
 }
 
@@ -63,6 +137,155 @@ CSV_FILES = {
     "kasus_ispa": BASE_DIR / "tren-kasus-ispa-per-bulan-tahun-2020-2022.csv"
 }
 
+# History store (partisi CSV per bulan); SimpleETL.load menambahkan setiap run ke sini
+HISTORY_CONFIG = {
+    "enabled": os.getenv("HISTORY_ENABLED", "1") == "1"
+}
+
+# Deteksi perubahan: load hanya menulis kota yang nilai terukurnya berubah sejak observasi terakhir
+# (latest_path = snapshot lengkap observasi terakhir per kota, juga dibaca dashboard;
+# relatif terhadap working directory seperti file output/risk_analysis_*)
+DEDUP_CONFIG = {
+    "enabled": os.getenv("DEDUP_ENABLED", "1") == "1",
+    "decimals": int(os.getenv("DEDUP_DECIMALS", "6")),
+    "latest_path": os.path.join("output", "risk_latest.csv")
+}
+
+# Interpolasi IDW skor per kota ke grid (rentang sama dengan peta dashboard); tile biner
+# output/risk_grid_latest.rrgt ditulis ulang setiap load (relatif terhadap working directory)
+GRID_CONFIG = {
+    "enabled": os.getenv("GRID_ENABLED", "1") == "1",
+    "lat_range": (-11.0, 6.0),
+    "lon_range": (95.0, 141.0),
+    "step_deg": float(os.getenv("GRID_STEP_DEG", "0.25")),
+    "power": float(os.getenv("GRID_IDW_POWER", "2")),
+    "max_distance_km": float(os.getenv("GRID_MAX_DISTANCE_KM", "500")),
+    "layers": ("rr_total", "pm2_5"),
+    "tile_path": os.path.join("output", "risk_grid_latest.rrgt")
+}
+
+# Cube agregat history (src/cube.py): satu file per partisi bulan di <history>/_cube/, diperbarui
+# setiap history ditulis (load, backfill, maintenance, recompute); measures = kolom yang diagregasi
+CUBE_CONFIG = {
+    "enabled": os.getenv("CUBE_ENABLED", "1") == "1",
+    "dir_name": "_cube",
+    "measures": ("rr_total", "pm2_5", "pm10", "no2", "so2", "o3", "co")
+}
+
+# Laporan statis per run (HTML + JSON tanpa dependensi, src/report.py): output/reports/<run_id>/
+# dan salinan output/reports/latest/ untuk disajikan sebagai file biasa; keep_runs = jumlah run disimpan
+REPORT_CONFIG = {
+    "enabled": os.getenv("REPORT_ENABLED", "1") == "1",
+    "root": os.path.join("output", "reports"),
+    "keep_runs": int(os.getenv("REPORT_KEEP_RUNS", "48")),
+    "top_n": int(os.getenv("REPORT_TOP_N", "10"))
+}
+
+# Risk API read-only (src/risk_api.py); scheduler ikut menjalankannya jika enabled
+RISK_API_CONFIG = {
+    "enabled": os.getenv("RISK_API_ENABLED", "1") == "1",
+    "host": os.getenv("RISK_API_HOST", "127.0.0.1"),
+    "port": int(os.getenv("RISK_API_PORT", "8080")),
+    "reload_interval": float(os.getenv("RISK_API_RELOAD_INTERVAL", "30")),
+    "history_cache_size": int(os.getenv("RISK_API_HISTORY_CACHE_SIZE", "256")),
+    "history_default_days": int(os.getenv("RISK_API_HISTORY_DEFAULT_DAYS", "7")),
+    "max_age": int(os.getenv("RISK_API_MAX_AGE", "60"))
+}
+
+# Skor on-demand koordinat sembarang (/risk/score): ukuran sel grid coalescing (derajat, 0.05 ≈ 5.5 km),
+# masa berlaku hasil per sel (detik; WeatherAPI current diperbarui ~15 menit) dan jumlah sel di cache
+ON_DEMAND_CONFIG = {
+    "cell_deg": float(os.getenv("ON_DEMAND_CELL_DEG", "0.05")),
+    "ttl_seconds": int(os.getenv("ON_DEMAND_TTL_SECONDS", "900")),
+    "cache_size": int(os.getenv("ON_DEMAND_CACHE_SIZE", "10000"))
+}
+
+# Maintenance harian (off-peak dari scheduler): compaction, downsampling & retensi
+MAINTENANCE_CONFIG = {
+    "enabled": os.getenv("MAINTENANCE_ENABLED", "1") == "1",
+    "at": os.getenv("MAINTENANCE_AT", "03:30"),
+    "compact_after_days": int(os.getenv("MAINTENANCE_COMPACT_AFTER_DAYS", "2")),
+    "hourly_after_days": int(os.getenv("MAINTENANCE_HOURLY_AFTER_DAYS", "30")),
+    "daily_after_days": int(os.getenv("MAINTENANCE_DAILY_AFTER_DAYS", "180")),
+    "history_retention_days": int(os.getenv("MAINTENANCE_HISTORY_RETENTION_DAYS", "730")),
+    "file_retention_days": int(os.getenv("MAINTENANCE_FILE_RETENTION_DAYS", "14")),
+    "keep_batch_files": int(os.getenv("MAINTENANCE_KEEP_BATCH_FILES", "3"))
+}
+
+# Kalibrasi RR terhadap kasus ISPA bulanan (regresi Poisson + bootstrap paralel)
+CALIBRATION_CONFIG = {
+    "province": os.getenv("CALIBRATION_PROVINCE", "Jawa Tengah"),
+    "bootstrap": int(os.getenv("CALIBRATION_BOOTSTRAP", "1000")),
+    "workers": int(os.getenv("CALIBRATION_WORKERS", str(os.cpu_count() or 1))),
+    "chunk_size": int(os.getenv("CALIBRATION_CHUNK_SIZE", "250")),
+    "seed": int(os.getenv("CALIBRATION_SEED", "42")),
+    "confidence": float(os.getenv("CALIBRATION_CONFIDENCE", "0.95")),
+    "min_months": int(os.getenv("CALIBRATION_MIN_MONTHS", "12"))
+}
+
+# Recompute skor history setelah tabel RR berubah (record per batch vectorized)
+RECOMPUTE_CONFIG = {
+    "chunk_rows": int(os.getenv("RECOMPUTE_CHUNK_ROWS", "200000"))
+}
+
+# Scenario engine: rentang history default dan batas jumlah skenario per run (hasil sweep)
+SCENARIO_CONFIG = {
+    "history_days": int(os.getenv("SCENARIO_HISTORY_DAYS", "365")),
+    "max_scenarios": int(os.getenv("SCENARIO_MAX_SCENARIOS", "5000"))
+}
+
+# Validasi batch sebelum scoring: rentang fisik (satuan kolom output transform), kolom wajib,
+# umur observasi terhadap timestamp fetch; baris gagal ditulis ke quarantine_dir beserta alasannya
+VALIDATION_CONFIG = {
+    "enabled": os.getenv("VALIDATION_ENABLED", "1") == "1",
+    "required": ["lat", "lon", "pm2_5", "pm10", "temperature", "humidity", "wind_speed"],
+    "ranges": {
+        "lat": (-90, 90),
+        "lon": (-180, 180),
+        "pm2_5": (0, 1000),
+        "pm10": (0, 2000),
+        "no2": (0, 2000),
+        "so2": (0, 2000),
+        "o3": (0, 1000),
+        "co": (0, 100000),
+        "temperature": (-30, 60),
+        "humidity": (0, 100),
+        "wind_speed": (0, 75),
+        "pressure": (850, 1100),
+        "cloud_cover": (0, 100)
+    },
+    "max_age_hours": float(os.getenv("VALIDATION_MAX_AGE_HOURS", "6")),
+    "max_future_minutes": float(os.getenv("VALIDATION_MAX_FUTURE_MINUTES", "15")),
+    "quarantine_dir": os.path.join("output", "quarantine")
+}
+
+# Alert setiap akhir load: aturan per kota + debounce, dikirim batch ke webhook (dipisah koma)
+ALERT_CONFIG = {
+    "enabled": os.getenv("ALERT_ENABLED", "1") == "1",
+    "webhooks": [url for url in os.getenv("ALERT_WEBHOOKS", "").split(",") if url.strip()],
+    "min_category": os.getenv("ALERT_MIN_CATEGORY", "Sangat Tinggi"),
+    "rr_threshold": float(os.getenv("ALERT_RR_THRESHOLD", "1.30")),
+    "rr_consecutive_runs": int(os.getenv("ALERT_RR_CONSECUTIVE_RUNS", "3")),
+    "pm25_spike_ratio": float(os.getenv("ALERT_PM25_SPIKE_RATIO", "1.5")),
+    "pm25_spike_min_delta": float(os.getenv("ALERT_PM25_SPIKE_MIN_DELTA", "25")),
+    "pm25_ema_alpha": float(os.getenv("ALERT_PM25_EMA_ALPHA", "0.3")),
+    "clear_runs": int(os.getenv("ALERT_CLEAR_RUNS", "2")),
+    "cooldown_minutes": float(os.getenv("ALERT_COOLDOWN_MINUTES", "180")),
+    "state_path": os.path.join("output", "alert_state.json"),
+    "timeout": float(os.getenv("ALERT_TIMEOUT", "5")),
+    "retries": int(os.getenv("ALERT_RETRIES", "3")),
+    "queue_size": int(os.getenv("ALERT_QUEUE_SIZE", "100")),
+    "flush_timeout": float(os.getenv("ALERT_FLUSH_TIMEOUT", "10"))
+}
+
+# Backfill riwayat polusi (OpenWeatherMap air_pollution/history)
+BACKFILL_CONFIG = {
+    "chunk_days": int(os.getenv("BACKFILL_CHUNK_DAYS", "30")),
+    "workers": int(os.getenv("BACKFILL_WORKERS", "4")),
+    "retry_budget": int(os.getenv("BACKFILL_RETRY_BUDGET", "500")),
+    "checkpoint": BASE_DIR / "data" / "history" / "_backfill_checkpoint.json"
+}
+
 # Model Configuration
 MODEL_CONFIG = {
     "test_size": 0.2,
@@ -80,6 +303,24 @@ RISK_THRESHOLDS = {
     "hazardous": (301, 500)
 }
 
+# Metrics endpoint (format Prometheus) untuk scheduler
+METRICS_CONFIG = {
+    "enabled": os.getenv("METRICS_ENABLED", "1") == "1",
+    "host": os.getenv("METRICS_HOST", "127.0.0.1"),
+    "port": int(os.getenv("METRICS_PORT", "9108"))
+}
+
+# Profiling opt-in per run (src/profiling.py): sampling = stack semua thread run setiap interval_ms
+# (wall-clock, format folded untuk flamegraph), cprofile = cProfile thread utama (.pstats);
+# file ditulis ke output/profiles/ dan hanya keep_last profil terbaru disimpan
+PROFILE_CONFIG = {
+    "enabled": os.getenv("PROFILE_ENABLED", "0") == "1",
+    "mode": os.getenv("PROFILE_MODE", "sampling"),
+    "interval_ms": float(os.getenv("PROFILE_INTERVAL_MS", "10")),
+    "dir": os.path.join("output", "profiles"),
+    "keep_last": int(os.getenv("PROFILE_KEEP_LAST", "24"))
+}
+
 # Logging configuration
 LOGGING_CONFIG = {
     "level": "INFO",
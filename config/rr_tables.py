@@ -3,6 +3,12 @@ Tabel Risk Ratio (RR) untuk Model Multiplikatif
 Berdasarkan Metodologi Kelompok
 """
 
+import hashlib
+import inspect
+import json
+
+import numpy as np
+
 # Tabel 1: Faktor Risiko Polusi Udara terhadap ISPA
 POLLUTION_RR = {
     'PM2.5': {
@@ -33,26 +39,73 @@ POLLUTION_RR = {
 }
 
 # Tabel 2: Faktor Risiko Cuaca terhadap ISPA
+# Kondisi ditulis dengan operator & (bukan a <= x <= b) supaya bisa dievaluasi
+# untuk nilai tunggal maupun array numpy (lihat calculate_total_rr_batch)
 WEATHER_RR = {
     'temperature': [
         {'condition': lambda t: t < 20, 'rr': 1.05, 'category': 'Dingin', 'source': 'Lowen et al.'},
-        {'condition': lambda t: 20 <= t <= 25, 'rr': 1.00, 'category': 'Normal', 'source': 'Davis et al.'},
+        {'condition': lambda t: (20 <= t) & (t <= 25), 'rr': 1.00, 'category': 'Normal', 'source': 'Davis et al.'},
         {'condition': lambda t: t > 30, 'rr': 1.03, 'category': 'Panas', 'source': 'Davis et al.'},
-        {'condition': lambda t: 25 < t <= 30, 'rr': 1.01, 'category': 'Hangat', 'source': 'Interpolasi'}
+        {'condition': lambda t: (25 < t) & (t <= 30), 'rr': 1.01, 'category': 'Hangat', 'source': 'Interpolasi'}
     ],
     'humidity': [
         {'condition': lambda h: h < 40, 'rr': 1.05, 'category': 'Rendah', 'source': 'Lowen; Shaman'},
-        {'condition': lambda h: 40 <= h <= 60, 'rr': 1.00, 'category': 'Optimal', 'source': 'ASHRAE'},
+        {'condition': lambda h: (40 <= h) & (h <= 60), 'rr': 1.00, 'category': 'Optimal', 'source': 'ASHRAE'},
         {'condition': lambda h: h > 70, 'rr': 1.03, 'category': 'Tinggi', 'source': 'Studi epidemiologi'},
-        {'condition': lambda h: 60 < h <= 70, 'rr': 1.01, 'category': 'Sedang', 'source': 'Interpolasi'}
+        {'condition': lambda h: (60 < h) & (h <= 70), 'rr': 1.01, 'category': 'Sedang', 'source': 'Interpolasi'}
     ],
     'wind_speed': [
         {'condition': lambda w: w < 1.5, 'rr': 1.03, 'category': 'Lemah', 'source': 'Studi dispersi'},
-        {'condition': lambda w: 1.5 <= w <= 3, 'rr': 1.00, 'category': 'Normal', 'source': 'Review dispersion'},
+        {'condition': lambda w: (1.5 <= w) & (w <= 3), 'rr': 1.00, 'category': 'Normal', 'source': 'Review dispersion'},
         {'condition': lambda w: w > 3, 'rr': 0.99, 'category': 'Kuat', 'source': 'Review dispersion'}
     ]
 }
 
+# Bentuk parametrik WEATHER_RR untuk scenario engine (src/scenarios.py): kategori urut naik,
+# x < edges[0] → kategori 0, edges[0] <= x <= edges[1] → 1, edges[i-1] < x <= edges[i] → i,
+# x > edges[-1] → terakhir. Harus sinkron dengan kondisi di WEATHER_RR (dicek saat import,
+# lihat _check_weather_bins): cut-off yang diubah di satu tabel saja langsung gagal.
+WEATHER_BINS = {
+    'temperature': {'edges': [20, 25, 30], 'categories': ['Dingin', 'Normal', 'Hangat', 'Panas'],
+                    'rr': [1.05, 1.00, 1.01, 1.03]},
+    'humidity': {'edges': [40, 60, 70], 'categories': ['Rendah', 'Optimal', 'Sedang', 'Tinggi'],
+                 'rr': [1.05, 1.00, 1.01, 1.03]},
+    'wind_speed': {'edges': [1.5, 3], 'categories': ['Lemah', 'Normal', 'Kuat'],
+                   'rr': [1.03, 1.00, 0.99]}
+}
+
+
+def _check_weather_bins():
+    """
+    Pastikan WEATHER_BINS memberi kategori & RR yang sama dengan kondisi WEATHER_RR di setiap
+    batas, tepat di kiri/kanannya, di tengah antar batas dan di luar batas terluar
+
+    Raises:
+        ValueError: jika kedua tabel tidak sinkron
+    """
+    if set(WEATHER_BINS) != set(WEATHER_RR):
+        raise ValueError(f"Parameter WEATHER_BINS {sorted(WEATHER_BINS)} != WEATHER_RR {sorted(WEATHER_RR)}")
+    for parameter, rules in WEATHER_RR.items():
+        bins = WEATHER_BINS[parameter]
+        edges = np.asarray(bins['edges'], dtype=float)
+        if not len(bins['categories']) == len(bins['rr']) == len(edges) + 1:
+            raise ValueError(f"WEATHER_BINS['{parameter}']: jumlah categories/rr harus len(edges) + 1")
+        step = 1e-6 * max(1.0, float(np.abs(edges).max()))
+        probes = np.unique(np.concatenate([
+            edges - step, edges, edges + step, (edges[:-1] + edges[1:]) / 2, [edges[0] - 1, edges[-1] + 1]
+        ]))
+        for value in probes:
+            index = int(value >= edges[0]) + int((value > edges[1:]).sum())
+            expected = (bins['categories'][index], bins['rr'][index])
+            rule = next((rule for rule in rules if rule['condition'](value)), None)
+            actual = (rule['category'], rule['rr']) if rule is not None else ('Unknown', 1.0)
+            if actual != expected:
+                raise ValueError(f"WEATHER_BINS['{parameter}'] tidak sinkron dengan WEATHER_RR pada nilai {value:g}: "
+                                 f"{expected} vs {actual}")
+
+
+_check_weather_bins()
+
 # Kota-kota besar di Indonesia (1 kota per provinsi)
 INDONESIAN_CITIES = [
     # Sumatera (10 provinsi)
@@ -102,6 +155,26 @@ INDONESIAN_CITIES = [
     {'name': 'Manokwari', 'lat': -0.8614, 'lon': 134.0640, 'province': 'Papua Barat'},
 ]
 
+# Wilayah (pulau/kepulauan) per provinsi, sama dengan pengelompokan INDONESIAN_CITIES di atas
+REGIONS = {
+    'Sumatera': ['Aceh', 'Sumatera Utara', 'Sumatera Barat', 'Riau', 'Jambi', 'Sumatera Selatan', 'Bengkulu',
+                 'Lampung', 'Kepulauan Bangka Belitung', 'Kepulauan Riau'],
+    'Jawa': ['DKI Jakarta', 'Jawa Barat', 'Jawa Tengah', 'DI Yogyakarta', 'Jawa Timur', 'Banten'],
+    'Kalimantan': ['Kalimantan Barat', 'Kalimantan Tengah', 'Kalimantan Selatan', 'Kalimantan Timur',
+                   'Kalimantan Utara'],
+    'Sulawesi': ['Sulawesi Utara', 'Sulawesi Tengah', 'Sulawesi Selatan', 'Sulawesi Tenggara', 'Gorontalo',
+                 'Sulawesi Barat'],
+    'Bali & Nusa Tenggara': ['Bali', 'Nusa Tenggara Barat', 'Nusa Tenggara Timur'],
+    'Maluku & Papua': ['Maluku', 'Maluku Utara', 'Papua', 'Papua Barat']
+}
+PROVINCE_REGIONS = {province: region for region, provinces in REGIONS.items() for province in provinces}
+UNKNOWN_REGION = 'Lainnya'
+
+
+def region_of(province):
+    """Wilayah untuk nama provinsi (UNKNOWN_REGION jika tidak dikenal)"""
+    return PROVINCE_REGIONS.get(province, UNKNOWN_REGION)
+
 # Kategori Risiko berdasarkan RR Total
 RISK_CATEGORIES = [
     {'min': 0, 'max': 1.05, 'category': 'Rendah', 'color': 'green', 'description': 'Risiko ISPA minimal'},
@@ -110,6 +183,36 @@ RISK_CATEGORIES = [
     {'min': 1.30, 'max': float('inf'), 'category': 'Sangat Tinggi', 'color': 'red', 'description': 'Risiko ISPA sangat tinggi'}
 ]
 
+def _rule_fingerprint(rule):
+    # Kondisi berupa lambda: source-nya (batas & operator kategori) ikut di-hash; bytecode
+    # hanya fallback karena berubah antar versi Python
+    try:
+        condition = inspect.getsource(rule['condition']).strip()
+    except (OSError, TypeError):
+        code = rule['condition'].__code__
+        condition = [code.co_code.hex(), repr(code.co_consts)]
+    return {**{k: v for k, v in rule.items() if k != 'condition'}, 'condition': condition}
+
+
+def table_version():
+    """
+    Hash isi tabel RR (POLLUTION_RR, WEATHER_RR, RISK_CATEGORIES)
+
+    Setiap record hasil scoring menyimpan hash ini di kolom rr_version, sehingga record
+    yang dihitung dengan tabel lama bisa dikenali dan dihitung ulang (src/recompute.py).
+
+    Returns:
+        str: 12 karakter hex
+    """
+    content = {
+        'pollution': POLLUTION_RR,
+        'weather': {parameter: [_rule_fingerprint(rule) for rule in rules] for parameter, rules in WEATHER_RR.items()},
+        'risk': RISK_CATEGORIES
+    }
+    encoded = json.dumps(content, sort_keys=True, default=repr).encode()
+    return hashlib.blake2b(encoded, digest_size=6).hexdigest()
+
+
 def get_pollution_rr(pollutant, concentration=None):
     """
     Mendapatkan Risk Ratio untuk polutan tertentu
@@ -187,6 +290,7 @@ def calculate_total_rr(pollution_data, weather_data):
     return {
         'rr_total': round(rr_total, 4),
         'category': category,
+        'rr_version': RR_TABLE_VERSION,
         'breakdown': {
             'pollution': {
                 'PM2.5': rr_pm25,
@@ -202,3 +306,113 @@ def calculate_total_rr(pollution_data, weather_data):
             }
         }
     }
+
+
+def _levels(categories):
+    # Urutan unik + 'Unknown' di akhir (kode kategori = index di list ini)
+    return list(dict.fromkeys(categories)) + ['Unknown']
+
+
+# Daftar kategori per kolom output untuk kode kategori (lihat calculate_total_rr_batch)
+CATEGORY_LEVELS = {
+    'risk_category': _levels(cat['category'] for cat in RISK_CATEGORIES),
+    'temp_category': _levels(rule['category'] for rule in WEATHER_RR['temperature']),
+    'humidity_category': _levels(rule['category'] for rule in WEATHER_RR['humidity']),
+    'wind_category': _levels(rule['category'] for rule in WEATHER_RR['wind_speed'])
+}
+
+
+# Versi tabel saat ini (lihat table_version)
+RR_TABLE_VERSION = table_version()
+
+
+def _select_category(conditions, categories, levels, codes):
+    if codes:
+        return np.select(conditions, [levels.index(c) for c in categories],
+                         default=len(levels) - 1).astype(np.int8)
+    return np.select(conditions, categories, default='Unknown')
+
+
+def _weather_rr_batch(parameter, values, column=None, codes=False):
+    """
+    Versi vectorized get_weather_rr: rule pertama yang cocok menang (urutan sama dengan loop)
+
+    Returns:
+        tuple: (array rr, array kategori; int8 index CATEGORY_LEVELS[column] jika codes=True)
+    """
+    rules = WEATHER_RR[parameter]
+    conditions = [np.asarray(rule['condition'](values), dtype=bool) for rule in rules]
+    rr = np.select(conditions, [rule['rr'] for rule in rules], default=1.0)
+    category = _select_category(conditions, [rule['category'] for rule in rules],
+                                CATEGORY_LEVELS.get(column), codes)
+    return rr, category
+
+
+def calculate_total_rr_batch(pollution_data, weather_data, category_codes=False):
+    """
+    Menghitung RR Total untuk banyak record sekaligus (vectorized numpy)
+    
+    Hasilnya identik dengan memanggil calculate_total_rr per record, tetapi tanpa
+    membuat dict per record.
+    
+    Args:
+        pollution_data: Dict nama polutan -> array konsentrasi
+        weather_data: Dict 'temp', 'humidity', 'wind_speed' -> array nilai
+            (key yang tidak ada memakai default yang sama dengan versi scalar)
+        category_codes: Kolom kategori berupa kode int8 (index CATEGORY_LEVELS[kolom])
+            alih-alih array string, untuk pd.Categorical.from_codes
+    
+    Returns:
+        dict: array per kolom output transform
+            ('rr_total', 'risk_category', 'rr_pm2_5', ..., 'wind_category', 'rr_version')
+    """
+    columns = [np.asarray(v) for v in list(pollution_data.values()) + list(weather_data.values())]
+    n = len(columns[0]) if columns else 0
+    
+    def weather_column(key, default):
+        if key in weather_data:
+            return np.asarray(weather_data[key], dtype=float)
+        return np.full(n, default, dtype=float)
+    
+    # Hitung RR Polusi (median konstan, sama seperti versi scalar)
+    rr_pm25 = get_pollution_rr('PM2.5')
+    rr_pm10 = get_pollution_rr('PM10')
+    rr_no2 = get_pollution_rr('NO2')
+    rr_so2 = get_pollution_rr('SO2')
+    rr_o3 = get_pollution_rr('O3')
+    
+    # Hitung RR Cuaca
+    rr_temp, temp_cat = _weather_rr_batch('temperature', weather_column('temp', 25),
+                                          'temp_category', category_codes)
+    rr_humid, humid_cat = _weather_rr_batch('humidity', weather_column('humidity', 50),
+                                            'humidity_category', category_codes)
+    rr_wind, wind_cat = _weather_rr_batch('wind_speed', weather_column('wind_speed', 2),
+                                          'wind_category', category_codes)
+    
+    # Model Multiplikatif
+    rr_total = (rr_pm25 * rr_pm10 * rr_no2 * rr_so2 * rr_o3) * rr_temp * rr_humid * rr_wind
+    
+    # Tentukan Kategori
+    category = _select_category(
+        [(rr_total >= cat['min']) & (rr_total < cat['max']) for cat in RISK_CATEGORIES],
+        [cat['category'] for cat in RISK_CATEGORIES],
+        CATEGORY_LEVELS['risk_category'],
+        category_codes
+    )
+    
+    return {
+        'rr_total': np.round(rr_total, 4),
+        'risk_category': category,
+        'rr_pm2_5': np.full(n, rr_pm25),
+        'rr_pm10': np.full(n, rr_pm10),
+        'rr_no2': np.full(n, rr_no2),
+        'rr_so2': np.full(n, rr_so2),
+        'rr_o3': np.full(n, rr_o3),
+        'rr_temperature': rr_temp,
+        'rr_humidity': rr_humid,
+        'rr_wind': rr_wind,
+        'temp_category': temp_cat,
+        'humidity_category': humid_cat,
+        'wind_category': wind_cat,
+        'rr_version': np.full(n, RR_TABLE_VERSION)
+    }
@@ -32,24 +32,24 @@ echo ""
 echo "✓ Setup complete!"
 echo ""
 echo "Choose an option:"
-echo "1. Run full pipeline"
-echo "2. Run pipeline without model training"
+echo "1. Run pipeline once"
+echo "2. Run scheduler (every hour + daily maintenance + risk API)"
 echo "3. Launch dashboard only"
 echo ""
 read -p "Enter choice (1-3): " choice
 
 case $choice in
     1)
-        echo "🚀 Running full pipeline..."
-        python src/main.py
+        echo "🚀 Running pipeline..."
+        python src/cli.py run
         ;;
     2)
-        echo "🚀 Running pipeline without model training..."
-        python src/main.py --skip-model
+        echo "🕐 Running scheduler..."
+        python src/cli.py schedule
         ;;
     3)
         echo "🎨 Launching dashboard..."
-        streamlit run src/dashboard.py
+        python src/cli.py dashboard
         ;;
     *)
         echo "Invalid choice"
@@ -0,0 +1,550 @@
+"""
+Alert risiko per kota, dievaluasi setiap akhir SimpleETL.load
+
+Aturan (lihat ALERT_CONFIG):
+- category     : kota masuk kategori >= min_category (default 'Sangat Tinggi')
+- rr_sustained : rr_total >= rr_threshold selama rr_consecutive_runs run berturut-turut
+- pm25_spike   : PM2.5 >= pm25_spike_ratio × baseline EMA dan naik >= pm25_spike_min_delta µg/m³
+
+State per kota (kategori terakhir, streak RR, EMA PM2.5, status tiap aturan) disimpan
+ringkas di output/alert_state.json, sehingga satu evaluasi cukup O(jumlah kota) tanpa
+membaca history. Debounce: aturan yang sudah aktif tidak di-fire ulang, baru 'resolved'
+setelah clear_runs run berturut-turut tidak terpenuhi, dan fire berikutnya menunggu
+cooldown_minutes (kota yang naik-turun di sekitar batas tidak membanjiri notifikasi).
+Baris snapshot yang timestamp-nya sama dengan yang tercatat di state (fetch gagal atau
+observasi tidak berubah/dedup) tidak dievaluasi: streak, EMA dan status aturan dibawa apa adanya.
+
+Alert satu run dikirim sebagai satu batch JSON ke setiap URL di ALERT_WEBHOOKS oleh
+thread background (retry + backoff), jadi pipeline tidak menunggu webhook.
+
+Contoh:
+    python src/alerts.py sink --port 9110
+    ALERT_WEBHOOKS=http://127.0.0.1:9110/ python src/etl_pipeline.py
+    python src/alerts.py evaluate --dry-run
+    python src/alerts.py selfcheck             # uji end-to-end terhadap webhook sink lokal
+"""
+
+import argparse
+import atexit
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# Tambahkan path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import ALERT_CONFIG, DEDUP_CONFIG
+from config.rr_tables import RISK_CATEGORIES
+from src import fastjson
+from src.metrics import ALERTS_EMITTED, ALERT_DELIVERIES
+
+RULES = ('category', 'rr_sustained', 'pm25_spike')
+
+# Urutan kategori risiko (Unknown/kosong = -1, tidak pernah memicu alert)
+CATEGORY_RANK = {cat['category']: rank for rank, cat in enumerate(RISK_CATEGORIES)}
+
+
+def _column(latest, name):
+    if name not in latest.columns:
+        return np.full(len(latest), np.nan)
+    return latest[name].to_numpy(dtype=float, na_value=np.nan)
+
+
+def _number(value):
+    # NaN tidak valid di JSON standar
+    return None if value is None or np.isnan(value) else round(float(value), 4)
+
+
+def debounce(rule, active, now, clear_runs, cooldown):
+    """
+    Update status satu aturan untuk satu kota (dict rule diubah in-place)
+
+    Returns:
+        str: 'fired', 'resolved', atau None
+    """
+    if active:
+        rule['clear'] = 0
+        if rule.get('active') or now - rule.get('last_fired', 0) < cooldown:
+            return None
+        rule['active'] = True
+        rule['last_fired'] = now
+        return 'fired'
+
+    if not rule.get('active'):
+        return None
+    rule['clear'] = rule.get('clear', 0) + 1
+    if rule['clear'] < clear_runs:
+        return None
+    rule['active'] = False
+    rule['clear'] = 0
+    return 'resolved'
+
+
+class AlertEngine:
+    """
+    Evaluasi aturan alert terhadap snapshot terkini (satu baris per kota)
+
+    Args:
+        config: Override ALERT_CONFIG (sebagian key saja juga boleh)
+        state_path: File state per kota (default: ALERT_CONFIG['state_path'])
+    """
+
+    def __init__(self, config=None, state_path=None):
+        self.config = {**ALERT_CONFIG, **(config or {})}
+        self.state_path = state_path or self.config['state_path']
+        self.min_rank = CATEGORY_RANK[self.config['min_category']]
+
+    def load_state(self):
+        if not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def save_state(self, state):
+        os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+    def conditions(self, latest, previous):
+        """
+        Kondisi tiap aturan untuk semua kota sekaligus (vectorized)
+
+        Args:
+            latest: DataFrame snapshot (city, risk_category, rr_total, pm2_5)
+            previous: List state kota sebelumnya, urut sama dengan latest
+
+        Returns:
+            tuple: (dict aturan -> array bool, streak RR, EMA PM2.5 baru, baseline PM2.5)
+        """
+        config = self.config
+        rank = np.array([CATEGORY_RANK.get(str(c), -1) for c in latest['risk_category']], dtype=int)
+        rr = _column(latest, 'rr_total')
+        pm25 = _column(latest, 'pm2_5')
+
+        streak = np.array([p.get('rr_streak', 0) for p in previous], dtype=int)
+        streak = np.where(rr >= config['rr_threshold'], streak + 1, 0)
+
+        baseline = np.array([p.get('pm25_ema') for p in previous], dtype=float)
+        with np.errstate(invalid='ignore'):
+            spike = (pm25 >= baseline * config['pm25_spike_ratio']) & \
+                    (pm25 - baseline >= config['pm25_spike_min_delta'])
+        alpha = config['pm25_ema_alpha']
+        ema = np.where(np.isnan(baseline), pm25,
+                       np.where(np.isnan(pm25), baseline, alpha * pm25 + (1 - alpha) * baseline))
+
+        rules = {
+            'category': rank >= self.min_rank,
+            'rr_sustained': streak >= config['rr_consecutive_runs'],
+            'pm25_spike': spike
+        }
+        return rules, streak, ema, baseline
+
+    def evaluate(self, latest, run_id, now=None, save=True):
+        """
+        Evaluasi satu run dan update state
+
+        run_id yang sama dievaluasi ulang (retry_failed) dari state sebelum run tersebut,
+        sehingga streak tidak terhitung dua kali dan alert yang sudah terkirim tidak diulang.
+        Kota yang timestamp-nya tidak berubah sejak evaluasi terakhir dilewati (state dibawa).
+
+        Returns:
+            list: alert (dict) yang fired/resolved pada run ini
+        """
+        now = time.time() if now is None else now
+        state = self.load_state()
+        rerun = state.get('run_id') == run_id
+        base = state.get('previous', {}) if rerun else state.get('cities', {})
+        emitted = set(state.get('emitted', [])) if rerun else set()
+
+        cities = latest['city'].astype(str).tolist()
+        previous = [base.get(city, {}) for city in cities]
+        rules, streak, ema, baseline = self.conditions(latest, previous)
+
+        categories = latest['risk_category'].astype(str).tolist()
+        rr = _column(latest, 'rr_total')
+        pm25 = _column(latest, 'pm2_5')
+        provinces = latest['province'].astype(str).tolist() if 'province' in latest.columns else [None] * len(cities)
+        timestamps = latest['timestamp'].astype(str).tolist() if 'timestamp' in latest.columns else [None] * len(cities)
+        clear_runs = self.config['clear_runs']
+        cooldown = self.config['cooldown_minutes'] * 60
+
+        alerts = []
+        updated = dict(base)
+        for i, city in enumerate(cities):
+            # Baris lama di snapshot (fetch gagal / dedup): bukan data baru, state tidak disentuh
+            if timestamps[i] is not None and timestamps[i] == previous[i].get('timestamp'):
+                continue
+            city_rules = {name: dict(previous[i].get('rules', {}).get(name, {})) for name in RULES}
+            for name in RULES:
+                event = debounce(city_rules[name], bool(rules[name][i]), now, clear_runs, cooldown)
+                key = f"{city}|{name}|{event}"
+                if event is None or key in emitted:
+                    continue
+                emitted.add(key)
+                alerts.append({
+                    'city': city,
+                    'province': provinces[i],
+                    'rule': name,
+                    'event': event,
+                    'timestamp': timestamps[i],
+                    'risk_category': categories[i],
+                    'previous_category': previous[i].get('category'),
+                    'rr_total': _number(rr[i]),
+                    'rr_streak': int(streak[i]),
+                    'pm2_5': _number(pm25[i]),
+                    'pm25_baseline': _number(baseline[i])
+                })
+            updated[city] = {
+                'timestamp': timestamps[i],
+                'category': categories[i],
+                'rr_streak': int(streak[i]),
+                'pm25_ema': _number(ema[i]),
+                'rules': city_rules
+            }
+
+        if save:
+            self.save_state({'run_id': run_id, 'updated': datetime.now().isoformat(),
+                             'previous': base, 'cities': updated, 'emitted': sorted(emitted)})
+        for alert in alerts:
+            ALERTS_EMITTED.inc(rule=alert['rule'], event=alert['event'])
+        return alerts
+
+
+def batch_payload(alerts, run_id):
+    """Satu payload webhook untuk semua alert satu run"""
+    return {
+        'run_id': run_id,
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'count': len(alerts),
+        'fired': sum(alert['event'] == 'fired' for alert in alerts),
+        'alerts': alerts
+    }
+
+
+class AlertDispatcher:
+    """
+    Kirim batch alert ke webhook dari thread background
+
+    submit() hanya memasukkan payload ke antrian (tidak pernah menunggu jaringan); worker
+    mengirim POST JSON ke setiap URL dengan retry + exponential backoff. Antrian penuh =
+    payload di-drop (tercatat di etl_alert_deliveries_total{status="dropped"}).
+
+    Args:
+        urls: List URL webhook
+        timeout: Timeout per request (detik)
+        retries: Jumlah retry per URL untuk error jaringan/5xx/429
+        queue_size: Maks batch yang menunggu dikirim
+    """
+
+    def __init__(self, urls, timeout=None, retries=None, queue_size=None, backoff=0.5):
+        self.urls = list(urls)
+        self.timeout = timeout or ALERT_CONFIG['timeout']
+        self.retries = ALERT_CONFIG['retries'] if retries is None else retries
+        self.backoff = backoff
+        self.queue = queue.Queue(maxsize=queue_size or ALERT_CONFIG['queue_size'])
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def _start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._worker, name='alert-dispatcher', daemon=True)
+                self.thread.start()
+                # Proses singkat (cron/CLI): tunggu antrian terkirim sebelum exit, dengan batas waktu
+                atexit.register(self.flush, ALERT_CONFIG['flush_timeout'])
+
+    def submit(self, payload):
+        """
+        Returns:
+            bool: True jika payload masuk antrian
+        """
+        if not self.urls:
+            return False
+        self._start()
+        try:
+            self.queue.put_nowait(payload)
+        except queue.Full:
+            ALERT_DELIVERIES.inc(status='dropped')
+            return False
+        return True
+
+    def _worker(self):
+        import requests
+
+        session = requests.Session()
+        while True:
+            payload = self.queue.get()
+            try:
+                body = fastjson.dumps(payload)
+                for url in self.urls:
+                    self._post(session, url, body)
+            except Exception as e:
+                print(f"⚠️  Alert dispatcher error: {str(e)}")
+            finally:
+                self.queue.task_done()
+
+    def _post(self, session, url, body):
+        import requests
+
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            try:
+                response = session.post(url, data=body, timeout=self.timeout,
+                                        headers={'Content-Type': 'application/json'})
+            except requests.RequestException:
+                continue
+            if response.status_code < 400:
+                ALERT_DELIVERIES.inc(status='ok')
+                return True
+            if response.status_code < 500 and response.status_code != 429:
+                break
+        ALERT_DELIVERIES.inc(status='failed')
+        print(f"⚠️  Alert gagal dikirim ke {url}")
+        return False
+
+    def flush(self, timeout=None):
+        """
+        Tunggu semua batch di antrian selesai dikirim
+
+        Returns:
+            bool: True jika antrian kosong sebelum timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.queue.all_tasks_done.wait(remaining)
+        return True
+
+
+_DISPATCHER = None
+
+
+def get_dispatcher():
+    """Dispatcher bersama per proses (satu worker thread untuk semua run)"""
+    global _DISPATCHER
+    if _DISPATCHER is None:
+        _DISPATCHER = AlertDispatcher(ALERT_CONFIG['webhooks'])
+    return _DISPATCHER
+
+
+def notify(latest, run_id, engine=None, dispatcher=None, now=None):
+    """
+    Evaluasi alert untuk snapshot terkini lalu antrikan batch-nya ke webhook
+
+    Returns:
+        list: alert run ini
+    """
+    alerts = (engine or AlertEngine()).evaluate(latest, run_id, now=now)
+    if alerts:
+        (dispatcher or get_dispatcher()).submit(batch_payload(alerts, run_id))
+    return alerts
+
+
+def print_alerts(alerts):
+    for alert in alerts:
+        icon = '🚨' if alert['event'] == 'fired' else '✅'
+        print(f"   {icon} {alert['city']:15s} {alert['rule']:13s} {alert['event']:8s} "
+              f"RR {alert['rr_total']} ({alert['risk_category']}) PM2.5 {alert['pm2_5']}")
+
+
+class _SinkHandler(BaseHTTPRequestHandler):
+    received = None
+    status = 200
+    on_payload = None
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        payload = fastjson.loads(self.rfile.read(length))
+        self.received.append(payload)
+        if self.on_payload is not None:
+            self.on_payload(payload)
+
+        body = b'{"ok":true}'
+        self.send_response(self.status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_alert_sink(host='127.0.0.1', port=0, status=200, on_payload=None):
+    """
+    Webhook lokal untuk uji coba: menyimpan setiap payload di server.received
+
+    Args:
+        host, port: Alamat bind (port 0 = pilih port bebas)
+        status: Status HTTP yang dibalas (misal 503 untuk uji retry)
+        on_payload: Callback(payload) opsional
+
+    Returns:
+        tuple: (server, url)
+    """
+    received = []
+    handler = type('SinkHandler', (_SinkHandler,), {
+        'received': received,
+        'status': status,
+        'on_payload': staticmethod(on_payload) if on_payload else None
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.received = received
+    threading.Thread(target=server.serve_forever, name='alert-sink', daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/"
+
+
+def selfcheck(verbose=True):
+    """
+    Uji end-to-end notify() → AlertDispatcher → webhook sink lokal (juga dijalankan oleh
+    benchmark grup 'alerts')
+
+    Enam run berurutan untuk kota A (kota B selalu Rendah) dengan clear_runs=2 dan cooldown
+    60 menit: satu batch per run yang punya alert, debounce (aturan aktif tidak fire ulang,
+    run_id sama tidak dikirim ulang), resolved setelah clear_runs, cooldown sebelum fire lagi,
+    baris snapshot lama (fetch gagal) tidak menambah streak, lalu retry ke sink yang membalas 503.
+
+    Returns:
+        list: pesan cek yang gagal (kosong = semua lolos)
+    """
+    import tempfile
+
+    import pandas as pd
+
+    failures = []
+
+    def check(ok, message):
+        if verbose:
+            print(f"   {'✅' if ok else '❌'} {message}")
+        if not ok:
+            failures.append(message)
+
+    config = {'min_category': 'Sangat Tinggi', 'rr_threshold': 1.30, 'rr_consecutive_runs': 2,
+              'clear_runs': 2, 'cooldown_minutes': 60}
+    # (run_id, menit sejak run pertama, kategori kota A)
+    runs = [('r1', 0, 'Sangat Tinggi'), ('r2', 10, 'Sangat Tinggi'), ('r3', 20, 'Rendah'),
+            ('r4', 30, 'Rendah'), ('r5', 40, 'Sangat Tinggi'), ('r6', 65, 'Sangat Tinggi')]
+    expected = {
+        'r1': ([('A', 'category', 'fired')], 'kategori Sangat Tinggi → fired'),
+        'r2': ([('A', 'rr_sustained', 'fired')], 'category tidak fire ulang, rr_sustained fired setelah 2 run'),
+        'r4': ([('A', 'category', 'resolved'), ('A', 'rr_sustained', 'resolved')],
+               'resolved setelah clear_runs=2 run normal'),
+        'r6': ([('A', 'category', 'fired')], 'fire lagi setelah cooldown 60 menit (rr_sustained masih cooldown)')
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = AlertEngine(config, state_path=os.path.join(tmp, 'alert_state.json'))
+        server, url = start_alert_sink()
+        dispatcher = AlertDispatcher([url], retries=0)
+        try:
+            start = time.time()
+            for run_id, minute, category in runs:
+                latest = pd.DataFrame({
+                    'city': ['A', 'B'], 'province': ['P', 'P'], 'timestamp': [run_id, run_id],
+                    'risk_category': [category, 'Rendah'],
+                    'rr_total': [1.35 if category == 'Sangat Tinggi' else 1.0, 1.0],
+                    'pm2_5': [20.0, 20.0]
+                })
+                notify(latest, run_id, engine=engine, dispatcher=dispatcher, now=start + minute * 60)
+                if run_id == 'r2':
+                    repeat = notify(latest, run_id, engine=engine, dispatcher=dispatcher, now=start + minute * 60)
+                    check(repeat == [], "run_id yang sama dievaluasi ulang tanpa alert baru")
+                dispatcher.flush(5)
+
+            batches = [payload['run_id'] for payload in server.received]
+            check(batches == list(expected), f"satu batch per run yang punya alert: {batches}")
+            received = {payload['run_id']: payload for payload in server.received}
+            for run_id, (events, description) in expected.items():
+                got = [(alert['city'], alert['rule'], alert['event'])
+                       for alert in received.get(run_id, {}).get('alerts', [])]
+                check(got == events, f"{run_id}: {description}")
+            check('r3' not in received and 'r5' not in received,
+                  "r3 tanpa batch (belum clear_runs), r5 tanpa batch (masih cooldown)")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    # Satu observasi RR tinggi lalu dua run yang fetch-nya gagal (baris lama di snapshot)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = AlertEngine(config, state_path=os.path.join(tmp, 'alert_state.json'))
+        stale = pd.DataFrame({'city': ['A'], 'province': ['P'], 'timestamp': ['t1'],
+                              'risk_category': ['Tinggi'], 'rr_total': [1.35], 'pm2_5': [20.0]})
+        events = [engine.evaluate(stale, run_id, now=start) for run_id in ('s1', 's2', 's3')]
+        streak = engine.load_state()['cities']['A']['rr_streak']
+        check(not any(events) and streak == 1,
+              f"baris tidak diperbarui tidak menambah streak (streak {streak}, {sum(map(len, events))} alert)")
+
+    server, url = start_alert_sink(status=503)
+    try:
+        dispatcher = AlertDispatcher([url], retries=2, backoff=0.01)
+        dispatcher.submit(batch_payload([], 'retry'))
+        flushed = dispatcher.flush(5)
+        check(flushed and len(server.received) == 3, f"sink 503: 1 + 2 retry lalu menyerah ({len(server.received)} POST)")
+    finally:
+        server.shutdown()
+        server.server_close()
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Alert risiko per kota (evaluasi & webhook sink lokal)')
+    parser.add_argument('action', choices=('evaluate', 'sink', 'selfcheck'),
+                        help='evaluate: evaluasi snapshot terkini | sink: webhook lokal yang mencetak alert | '
+                             'selfcheck: uji debounce/cooldown/retry terhadap sink lokal')
+    parser.add_argument('--latest', default=DEDUP_CONFIG['latest_path'], help='Snapshot untuk evaluate')
+    parser.add_argument('--run-id', default=None, help='Run id evaluate (default: waktu sekarang)')
+    parser.add_argument('--dry-run', action='store_true', help='Evaluate tanpa menyimpan state & mengirim')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9110)
+    args = parser.parse_args(argv)
+
+    if args.action == 'sink':
+        def show(payload):
+            print(f"\n📨 Run {payload['run_id']}: {payload['count']} alert")
+            print_alerts(payload['alerts'])
+
+        server, url = start_alert_sink(args.host, args.port, on_payload=show)
+        print(f"📡 Alert sink: {url} (Ctrl+C untuk berhenti)")
+        print(f"   ALERT_WEBHOOKS={url} python src/etl_pipeline.py")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.shutdown()
+        return 0
+
+    if args.action == 'selfcheck':
+        print("\n🧪 Self-check alert → webhook sink lokal")
+        failures = selfcheck()
+        print(f"\n{'❌ ' + str(len(failures)) + ' cek gagal' if failures else '✅ Semua cek lolos'}")
+        return 1 if failures else 0
+
+    import pandas as pd
+
+    run_id = args.run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+    latest = pd.read_csv(args.latest)
+    if args.dry_run:
+        alerts = AlertEngine().evaluate(latest, run_id, save=False)
+    else:
+        alerts = notify(latest, run_id)
+    print(f"\n🔔 {len(alerts)} alert ({len(latest)} kota)")
+    print_alerts(alerts)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,312 @@
+"""
+Backfill riwayat polusi udara dari endpoint OpenWeatherMap air_pollution/history
+Chunk waktu besar per lokasi → transform batch → langsung ke history store,
+paralel antar lokasi dengan checkpoint supaya bisa dilanjutkan jika terhenti
+
+Contoh:
+    python src/backfill.py --start 2024-01-01 --end 2025-01-01
+    python src/backfill.py --start 2024-01-01 --end 2024-03-01 --cities Jakarta,Bandung --with-weather
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Tambahkan path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import (
+    OPENWEATHER_API_KEY,
+    WEATHERAPI_KEY,
+    OPENWEATHER_BASE_URL,
+    WEATHERAPI_BASE_URL,
+    OPENWEATHER_POLLUTION_HISTORY_PATH,
+    WEATHERAPI_HISTORY_PATH,
+    RATE_LIMITS,
+    RETRY_CONFIG,
+    BACKFILL_CONFIG,
+    VALIDATION_CONFIG
+)
+from config.rr_tables import INDONESIAN_CITIES, calculate_total_rr_batch
+from src.etl_pipeline import categorical_scores
+from src.history_store import HistoryStore, HISTORY_COLUMNS
+from src.rate_limit import ProviderClient, RetryBudget
+from src.validation import quarantine_path, validate, write_quarantine
+
+POLLUTANTS = {'pm2_5': 'pm2_5', 'pm10': 'pm10', 'no2': 'no2', 'so2': 'so2', 'o3': 'o3', 'co': 'co'}
+
+# Cuaca per jam (opsional, --with-weather) boleh kosong; riwayat polusi minimal punya PM2.5
+BACKFILL_REQUIRED = ['lat', 'lon', 'pm2_5']
+LOCAL_TZ = datetime.now().astimezone().tzinfo
+
+
+def _local_timestamp(value):
+    """Timestamp tanpa zona waktu dianggap waktu lokal (sama seperti timestamp pipeline)"""
+    ts = pd.Timestamp(value)
+    return ts.tz_localize(LOCAL_TZ) if ts.tzinfo is None else ts
+
+
+def transform_history(location, pollution_payload, weather_hours=None, quarantine=None):
+    """
+    Transform batch satu payload riwayat (banyak jam) menjadi DataFrame, satu baris per jam
+
+    Args:
+        location: Dict kota {'name', 'province', 'lat', 'lon'}
+        pollution_payload: Respons air_pollution/history ({'list': [{'dt', 'components'}, ...]})
+        weather_hours: Dict epoch awal jam -> data cuaca per jam WeatherAPI (opsional)
+        quarantine: File NDJSON untuk jam yang gagal validasi (None = hanya dibuang)
+
+    Returns:
+        DataFrame: kolom sama dengan output SimpleETL.transform. Polutan yang tidak ada
+        dan cuaca yang tidak tersedia bernilai NaN (RR cuaca = 1.00, kategori 'Unknown').
+        Jam yang gagal validasi (rentang fisik, PM2.5 kosong, dt di masa depan) dibuang.
+    """
+    items = pollution_payload.get('list', [])
+    n = len(items)
+    if n == 0:
+        return pd.DataFrame(columns=HISTORY_COLUMNS[:-1])
+
+    dt = np.fromiter((item['dt'] for item in items), dtype=np.int64, count=n)
+
+    def component(key):
+        return np.fromiter((item.get('components', {}).get(key, np.nan) for item in items), dtype=float, count=n)
+
+    def weather(key):
+        if not weather_hours:
+            return np.full(n, np.nan)
+        hours = dt - dt % 3600
+        return np.fromiter((weather_hours.get(int(h), {}).get(key, np.nan) for h in hours), dtype=float, count=n)
+
+    temperature = weather('temp_c')
+    humidity = weather('humidity')
+    wind_speed = weather('wind_kph') / 3.6  # Convert to m/s
+
+    # RR polusi memakai median konstan (sama seperti calculate_total_rr), cukup cuaca yang per jam
+    scores = categorical_scores(calculate_total_rr_batch(
+        {},
+        {'temp': temperature, 'humidity': humidity, 'wind_speed': wind_speed},
+        category_codes=True
+    ))
+
+    timestamps = pd.to_datetime(dt, unit='s', utc=True).tz_convert(LOCAL_TZ).strftime('%Y-%m-%dT%H:%M:%S')
+
+    df = pd.DataFrame({
+        'timestamp': timestamps,
+        'city': location['name'],
+        'province': location['province'],
+        'lat': location['lat'],
+        'lon': location['lon'],
+        **{column: component(key) for column, key in POLLUTANTS.items()},
+        'temperature': temperature,
+        'humidity': humidity,
+        'wind_speed': wind_speed,
+        'pressure': weather('pressure_mb'),
+        'cloud_cover': weather('cloud'),
+        **scores
+    })
+    df = df[HISTORY_COLUMNS[:-1]]
+
+    if VALIDATION_CONFIG['enabled']:
+        columns = {column: df[column].to_numpy(dtype=float) for column in VALIDATION_CONFIG['ranges']}
+        result = validate(columns, observed={'pollution': dt.astype(float)}, required=BACKFILL_REQUIRED)
+        if result.quarantined:
+            if quarantine:
+                write_quarantine(quarantine, result, lambda i: {
+                    'city': location['name'], 'timestamp': timestamps[i], 'source': 'backfill', 'item': items[i],
+                    'values': {column: None if np.isnan(values[i]) else float(values[i]) for column, values in columns.items()}
+                })
+            df = df[result.ok].reset_index(drop=True)
+    return df
+
+
+class Backfill:
+    """
+    Backfill riwayat untuk banyak lokasi × banyak bulan
+
+    Args:
+        start, end: Rentang waktu (string 'YYYY-MM-DD' atau datetime), end eksklusif
+        cities: List lokasi (default: INDONESIAN_CITIES)
+        chunk_days: Panjang rentang per request riwayat
+        workers: Jumlah lokasi yang diproses paralel
+        with_weather: Ambil juga cuaca per jam dari WeatherAPI history.json (1 request per hari)
+        store: HistoryStore tujuan
+        checkpoint_path: File checkpoint chunk yang sudah selesai
+    """
+
+    def __init__(self, start, end, cities=None, chunk_days=None, workers=None, with_weather=False,
+                 store=None, checkpoint_path=None, openweather_base_url=OPENWEATHER_BASE_URL,
+                 weatherapi_base_url=WEATHERAPI_BASE_URL):
+        self.start = _local_timestamp(start)
+        self.end = _local_timestamp(end)
+        if self.end <= self.start:
+            raise ValueError("end harus setelah start")
+        self.cities = cities if cities is not None else INDONESIAN_CITIES
+        self.chunk_days = chunk_days or BACKFILL_CONFIG['chunk_days']
+        self.workers = max(1, workers or BACKFILL_CONFIG['workers'])
+        self.with_weather = with_weather
+        self.store = store or HistoryStore()
+        self.checkpoint_path = str(checkpoint_path or BACKFILL_CONFIG['checkpoint'])
+        self.history_url = openweather_base_url.rstrip('/') + OPENWEATHER_POLLUTION_HISTORY_PATH
+        self.weather_history_url = weatherapi_base_url.rstrip('/') + WEATHERAPI_HISTORY_PATH
+
+        budget = RetryBudget(BACKFILL_CONFIG['retry_budget'])
+        self.clients = {
+            provider: ProviderClient(provider, RATE_LIMITS[provider], RETRY_CONFIG, budget, pool_size=self.workers)
+            for provider in ('openweather', 'weatherapi')
+        }
+        self._lock = threading.Lock()
+        self.done = self._load_checkpoint()
+        self.quarantine_path = quarantine_path(f"backfill_{datetime.now():%Y%m%d_%H%M%S}")
+
+    def chunks(self):
+        """
+        Returns:
+            list: (start_epoch, end_epoch) per chunk, end eksklusif
+        """
+        result = []
+        current = self.start
+        while current < self.end:
+            chunk_end = min(current + timedelta(days=self.chunk_days), self.end)
+            result.append((int(current.timestamp()), int(chunk_end.timestamp())))
+            current = chunk_end
+        return result
+
+    @staticmethod
+    def task_key(city, chunk):
+        return f"{city['name']}|{chunk[0]}|{chunk[1]}"
+
+    def _load_checkpoint(self):
+        if not os.path.exists(self.checkpoint_path):
+            return set()
+        with open(self.checkpoint_path, encoding='utf-8') as f:
+            return set(json.load(f).get('done', []))
+
+    def _mark_done(self, key):
+        with self._lock:
+            self.done.add(key)
+            os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+            tmp_path = self.checkpoint_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'updated': datetime.now().isoformat(), 'done': sorted(self.done)}, f)
+            os.replace(tmp_path, self.checkpoint_path)
+
+    def reset_checkpoint(self):
+        with self._lock:
+            self.done = set()
+            if os.path.exists(self.checkpoint_path):
+                os.remove(self.checkpoint_path)
+
+    def _fetch_weather_hours(self, city, chunk):
+        """Cuaca per jam dari WeatherAPI history.json untuk setiap hari dalam chunk"""
+        hours = {}
+        day = datetime.fromtimestamp(chunk[0], LOCAL_TZ).date()
+        last_day = datetime.fromtimestamp(chunk[1] - 1, LOCAL_TZ).date()
+        while day <= last_day:
+            url = f"{self.weather_history_url}?key={WEATHERAPI_KEY}&q={city['lat']},{city['lon']}&dt={day.isoformat()}"
+            payload = self.clients['weatherapi'].get_json(url)
+            for forecast_day in payload.get('forecast', {}).get('forecastday', []):
+                for hour in forecast_day.get('hour', []):
+                    hours[int(hour['time_epoch'])] = hour
+            day += timedelta(days=1)
+        return hours
+
+    def _process_chunk(self, city, chunk):
+        url = f"{self.history_url}?lat={city['lat']}&lon={city['lon']}&start={chunk[0]}&end={chunk[1]}&appid={OPENWEATHER_API_KEY}"
+        pollution = self.clients['openweather'].get_json(url)
+        weather_hours = self._fetch_weather_hours(city, chunk) if self.with_weather else None
+        df = transform_history(city, pollution, weather_hours, quarantine=self.quarantine_path)
+        return self.store.append(df, source='backfill')
+
+    def _process_city(self, city):
+        """Proses semua chunk satu lokasi secara berurutan (hanya satu chunk di memori)"""
+        stats = {'rows': 0, 'chunks': 0, 'skipped': 0, 'failed': 0}
+        for chunk in self.chunks():
+            key = self.task_key(city, chunk)
+            if key in self.done:
+                stats['skipped'] += 1
+                continue
+            label = (f"{datetime.fromtimestamp(chunk[0], LOCAL_TZ):%Y-%m-%d} → "
+                     f"{datetime.fromtimestamp(chunk[1], LOCAL_TZ):%Y-%m-%d}")
+            try:
+                rows = self._process_chunk(city, chunk)
+            except Exception as e:
+                stats['failed'] += 1
+                print(f"   ❌ {city['name']} {label}: {str(e)}")
+                continue
+            self._mark_done(key)
+            stats['rows'] += rows
+            stats['chunks'] += 1
+            print(f"   ✅ {city['name']} {label}: {rows} jam")
+        return stats
+
+    def run(self):
+        """
+        Jalankan backfill (chunk yang sudah ada di checkpoint dilewati)
+
+        Returns:
+            dict: total rows, chunks, skipped, failed
+        """
+        chunks = self.chunks()
+        print("\n" + "="*70)
+        print("🗄️  BACKFILL RIWAYAT POLUSI")
+        print("="*70)
+        print(f"📅 Rentang : {self.start:%Y-%m-%d} → {self.end:%Y-%m-%d} ({len(chunks)} chunk × {self.chunk_days} hari)")
+        print(f"📍 Lokasi  : {len(self.cities)} ({self.workers} paralel)")
+        print(f"🌤️  Cuaca   : {'WeatherAPI history' if self.with_weather else 'tidak (RR cuaca = 1.00)'}")
+        print(f"💾 Tujuan  : {self.store.root}")
+        print("="*70)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = list(executor.map(self._process_city, self.cities))
+
+        summary = {key: sum(r[key] for r in results) for key in ('rows', 'chunks', 'skipped', 'failed')}
+        elapsed = time.perf_counter() - started
+
+        print("\n" + "="*70)
+        print(f"✅ Backfill selesai dalam {elapsed:.1f}s")
+        print(f"   Rows ditulis   : {summary['rows']:,}")
+        print(f"   Chunk selesai  : {summary['chunks']} | dilewati (checkpoint): {summary['skipped']} | gagal: {summary['failed']}")
+        if summary['failed']:
+            print("   💡 Jalankan ulang perintah yang sama untuk melanjutkan chunk yang gagal")
+        print("="*70)
+        return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Backfill riwayat polusi ke history store')
+    parser.add_argument('--start', required=True, help='Tanggal awal (YYYY-MM-DD)')
+    parser.add_argument('--end', default=datetime.now().strftime('%Y-%m-%d'), help='Tanggal akhir, eksklusif (default: hari ini)')
+    parser.add_argument('--cities', help='Nama kota dipisah koma (default: semua INDONESIAN_CITIES)')
+    parser.add_argument('--chunk-days', type=int, default=BACKFILL_CONFIG['chunk_days'])
+    parser.add_argument('--workers', type=int, default=BACKFILL_CONFIG['workers'])
+    parser.add_argument('--with-weather', action='store_true', help='Ambil cuaca per jam dari WeatherAPI history')
+    parser.add_argument('--reset', action='store_true', help='Abaikan checkpoint lama dan mulai dari awal')
+    args = parser.parse_args(argv)
+
+    cities = INDONESIAN_CITIES
+    if args.cities:
+        names = {name.strip() for name in args.cities.split(',')}
+        cities = [city for city in INDONESIAN_CITIES if city['name'] in names]
+        unknown = names - {city['name'] for city in cities}
+        if unknown:
+            parser.error(f"Kota tidak dikenal: {sorted(unknown)}")
+
+    backfill = Backfill(args.start, args.end, cities=cities, chunk_days=args.chunk_days,
+                        workers=args.workers, with_weather=args.with_weather)
+    if args.reset:
+        backfill.reset_checkpoint()
+    summary = backfill.run()
+    sys.exit(1 if summary['failed'] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,449 @@
+"""
+Kalibrasi tabel RR terhadap kasus ISPA bulanan (Jawa Tengah)
+
+Kasus ISPA (data/processed/kasus_ispa_clean.csv) digabung dengan suhu, kelembaban dan
+kecepatan angin BPS (suhu_kelembaban_clean.csv, tekanan_angin_clean.csv) per bulan.
+Bulan yang tidak ada di data BPS diisi dari rata-rata bulanan history store kota-kota
+di provinsi yang sama; polutan dari history ikut sebagai faktor jika cukup banyak bulan
+yang overlap.
+
+Model: regresi Poisson (log link) kasus ~ efek tetap tahun + faktor risiko, sehingga
+exp(koefisien × increment) adalah RR per kenaikan `increment` satuan faktor. Fit memakai
+Newton/IRLS yang di-vectorize untuk banyak set bobot sekaligus: setiap replikasi bootstrap
+adalah bobot multinomial atas bulan, dan satu chunk replikasi di-fit bersamaan dengan
+einsum + np.linalg.solve bertumpuk. Chunk dibagi ke process pool.
+
+Hasil dibandingkan dengan tabel (POLLUTION_RR/WEATHER_RR) pada kontras persentil
+10 → 90 data: RR yang diprediksi tabel vs RR hasil fit beserta interval bootstrap.
+
+Contoh:
+    python src/calibration.py
+    python src/calibration.py --bootstrap 2000 --workers 4 --no-history
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Tambahkan path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import DATA_PATHS, CALIBRATION_CONFIG
+from config.rr_tables import INDONESIAN_CITIES, POLLUTION_RR, _weather_rr_batch
+from src.history_store import HistoryStore
+from src import fastjson
+
+# Faktor risiko: kolom dataset, increment untuk RR yang dilaporkan, satuan, key tabel RR.
+# RR polutan di POLLUTION_RR dibaca sebagai RR per kenaikan `increment`.
+FACTORS = {
+    'temperature': {'column': 'temperature', 'increment': 1.0, 'unit': '°C', 'table': 'weather'},
+    'humidity': {'column': 'humidity', 'increment': 10.0, 'unit': '%', 'table': 'weather'},
+    'wind_speed': {'column': 'wind_speed', 'increment': 1.0, 'unit': 'm/s', 'table': 'weather'},
+    'PM2.5': {'column': 'pm2_5', 'increment': 10.0, 'unit': 'µg/m³', 'table': 'pollution'},
+    'PM10': {'column': 'pm10', 'increment': 10.0, 'unit': 'µg/m³', 'table': 'pollution'},
+    'NO2': {'column': 'no2', 'increment': 10.0, 'unit': 'µg/m³', 'table': 'pollution'},
+    'SO2': {'column': 'so2', 'increment': 10.0, 'unit': 'µg/m³', 'table': 'pollution'},
+    'O3': {'column': 'o3', 'increment': 10.0, 'unit': 'µg/m³', 'table': 'pollution'}
+}
+WEATHER_FACTORS = ['temperature', 'humidity', 'wind_speed']
+POLLUTION_FACTORS = ['PM2.5', 'PM10', 'NO2', 'SO2', 'O3']
+
+# Tiga huruf pertama nama bulan (Indonesia/Inggris) -> nomor bulan
+MONTH_PREFIXES = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'mei': 5, 'may': 5, 'jun': 6, 'jul': 7,
+    'agu': 8, 'ags': 8, 'aug': 8, 'sep': 9, 'okt': 10, 'oct': 10, 'nov': 11, 'des': 12, 'dec': 12
+}
+
+
+def _month_number(label):
+    if not isinstance(label, str):
+        return None
+    return MONTH_PREFIXES.get(label.split('/')[0].strip().lower()[:3])
+
+
+def _number(values, thousands):
+    return pd.to_numeric(values.str.replace(thousands, '', regex=False).str.strip(), errors='coerce')
+
+
+def load_cases(path=None):
+    """
+    Kasus ISPA per bulan (kolom bulan; satu kolom per tahun; titik = pemisah ribuan)
+
+    Returns:
+        DataFrame: month ('YYYY-MM'), cases
+    """
+    path = path or os.path.join(DATA_PATHS['processed'], 'kasus_ispa_clean.csv')
+    raw = pd.read_csv(path, sep=';', dtype=str)
+    label = raw.columns[0]
+    raw = raw[raw[label].map(_month_number).notna()]
+
+    frames = []
+    for year in raw.columns[1:]:
+        frames.append(pd.DataFrame({
+            'month': [f"{int(year)}-{_month_number(m):02d}" for m in raw[label]],
+            'cases': _number(raw[year], '.').to_numpy()
+        }))
+    return pd.concat(frames, ignore_index=True).dropna().reset_index(drop=True)
+
+
+def _load_bps_table(path, blocks):
+    """
+    Tabel bulanan BPS: header bertingkat, baris bulan 'Januari/January', tiap blok
+    variabel berisi satu kolom per tahun (tahun dibaca dari baris header terakhir)
+
+    Args:
+        blocks: dict nama kolom -> (index kolom pertama blok, fungsi konversi)
+
+    Returns:
+        DataFrame: month ('YYYY-MM') + satu kolom per blok
+    """
+    raw = pd.read_csv(path, header=None, dtype=str)
+    months = raw[0].map(_month_number)
+    first = months.first_valid_index()
+    # Baris 'Sumber/Source' setelah Desember bukan bulan
+    rows = raw.loc[first:].loc[months.loc[first:].notna()].iloc[:12]
+    years_row = raw.loc[first - 1]
+
+    frames = []
+    for name, (start, convert) in blocks.items():
+        columns = []
+        for column in range(start, raw.shape[1]):
+            try:
+                year = int(float(years_row[column]))
+            except (TypeError, ValueError):
+                break
+            if columns and year <= columns[-1][0]:
+                break
+            columns.append((year, column))
+        for year, column in columns:
+            frames.append(pd.DataFrame({
+                'month': [f"{year}-{_month_number(m):02d}" for m in rows[0]],
+                'variable': name,
+                'value': convert(rows[column]).to_numpy()
+            }))
+    long = pd.concat(frames, ignore_index=True)
+    return long.pivot_table(index='month', columns='variable', values='value').reset_index().rename_axis(columns=None)
+
+
+def load_weather(processed_dir=None):
+    """
+    Cuaca bulanan BPS Jawa Tengah: rata-rata suhu (°C), kelembaban (%), tekanan (mb)
+    dan kecepatan angin (km/jam → m/s, satuan yang dipakai pipeline)
+
+    Returns:
+        DataFrame: month, temperature, humidity, pressure, wind_speed
+    """
+    processed_dir = processed_dir or DATA_PATHS['processed']
+    as_float = lambda values: _number(values, ',')
+    temperature = _load_bps_table(os.path.join(processed_dir, 'suhu_kelembaban_clean.csv'),
+                                  {'temperature': (4, as_float), 'humidity': (13, as_float)})
+    pressure = _load_bps_table(os.path.join(processed_dir, 'tekanan_angin_clean.csv'),
+                               {'pressure': (1, as_float), 'wind_speed': (4, lambda v: as_float(v) / 3.6)})
+    return temperature.merge(pressure, on='month', how='outer')
+
+
+def monthly_history(province, store=None):
+    """
+    Rata-rata bulanan history store untuk kota-kota di provinsi
+
+    Returns:
+        DataFrame: month + kolom polutan/cuaca (kosong jika belum ada history)
+    """
+    cities = [city['name'] for city in INDONESIAN_CITIES if city['province'] == province]
+    columns = [FACTORS[name]['column'] for name in WEATHER_FACTORS + POLLUTION_FACTORS]
+    df = (store or HistoryStore()).read(cities=cities, columns=columns)
+    if df.empty:
+        return pd.DataFrame(columns=['month'] + columns)
+    months = pd.to_datetime(df['timestamp'], format='ISO8601').dt.strftime('%Y-%m')
+    return df[columns].apply(pd.to_numeric, errors='coerce').groupby(months.rename('month')).mean().reset_index()
+
+
+def build_dataset(store=None, use_history=True, config=None):
+    """
+    Gabungkan kasus, cuaca BPS dan history pipeline per bulan
+
+    Returns:
+        tuple: (DataFrame per bulan dengan kolom year, cases + faktor, list faktor yang dipakai,
+            list catatan)
+    """
+    config = {**CALIBRATION_CONFIG, **(config or {})}
+    notes = []
+    df = load_cases().merge(load_weather(), on='month', how='left')
+
+    history = monthly_history(config['province'], store) if use_history else pd.DataFrame(columns=['month'])
+    if not history.empty:
+        df = df.merge(history, on='month', how='left', suffixes=('', '_history'))
+        for name in WEATHER_FACTORS:
+            column = FACTORS[name]['column']
+            filled = df[column].isna() & df[f"{column}_history"].notna()
+            if filled.any():
+                notes.append(f"{name}: {int(filled.sum())} bulan diisi dari history store")
+            df[column] = df[column].fillna(df[f"{column}_history"])
+        df = df.drop(columns=[c for c in df.columns if c.endswith('_history')])
+
+    factors = list(WEATHER_FACTORS)
+    df = df.dropna(subset=['cases'] + [FACTORS[name]['column'] for name in factors])
+
+    for name in POLLUTION_FACTORS:
+        column = FACTORS[name]['column']
+        months = int(df[column].notna().sum()) if column in df else 0
+        if months >= config['min_months']:
+            factors.append(name)
+        elif months:
+            notes.append(f"{name}: hanya {months} bulan overlap (< {config['min_months']}), tidak dipakai")
+    if len(factors) == len(WEATHER_FACTORS):
+        notes.append("Polutan tidak dipakai: history store belum mencakup bulan dengan data kasus")
+    else:
+        df = df.dropna(subset=[FACTORS[name]['column'] for name in factors])
+
+    df = df.sort_values('month').reset_index(drop=True)
+    df['year'] = df['month'].str[:4].astype(int)
+    return df, factors, notes
+
+
+def design_matrix(df, factors):
+    """
+    Matriks desain: intercept, dummy tahun (tahun pertama = referensi), faktor terstandardisasi
+
+    Returns:
+        tuple: (X (n, k), list nama kolom, array rata-rata & simpangan baku faktor)
+    """
+    years = sorted(df['year'].unique())
+    values = df[[FACTORS[name]['column'] for name in factors]].to_numpy(dtype=float)
+    mean, scale = values.mean(axis=0), values.std(axis=0)
+    scale[scale == 0] = 1.0
+
+    X = np.column_stack([
+        np.ones(len(df)),
+        (df['year'].to_numpy()[:, None] == np.array(years[1:])[None, :]).astype(float),
+        (values - mean) / scale
+    ])
+    names = ['intercept'] + [f"year_{year}" for year in years[1:]] + list(factors)
+    return X, names, mean, scale
+
+
+def fit_poisson(X, y, weights=None, beta=None, max_iter=50, tol=1e-10):
+    """
+    Regresi Poisson log link dengan Newton/IRLS, untuk banyak set bobot sekaligus
+
+    Args:
+        X: Matriks desain (n, k)
+        y: Jumlah kasus (n,)
+        weights: Bobot observasi (B, n); None = satu fit tanpa bobot
+        beta: Titik awal (k,) atau (B, k)
+
+    Returns:
+        tuple: (koefisien (B, k), array bool (B,) fit teridentifikasi & konvergen)
+    """
+    n, k = X.shape
+    weights = np.ones((1, n)) if weights is None else np.atleast_2d(weights).astype(float)
+    B = weights.shape[0]
+    if beta is None:
+        beta = np.zeros(k)
+        beta[0] = np.log(np.average(y, weights=weights.mean(axis=0)))
+    beta = np.array(np.broadcast_to(beta, (B, k)), dtype=float)
+
+    converged = np.zeros(B, dtype=bool)
+    ridge = 1e-9 * np.eye(k)
+    for _ in range(max_iter):
+        mu = np.exp(beta @ X.T)
+        gradient = (weights * (y - mu)) @ X
+        hessian = np.einsum('bn,ni,nj->bij', weights * mu, X, X)
+        step = np.linalg.solve(hessian + ridge * hessian.trace(axis1=1, axis2=2)[:, None, None],
+                               gradient[..., None])[..., 0]
+        # Batasi langkah supaya exp() tidak overflow di iterasi awal
+        size = np.abs(step).max(axis=1, keepdims=True)
+        step *= np.minimum(1.0, 2.0 / np.maximum(size, 1e-300))
+        beta[~converged] += step[~converged]
+        converged |= size[:, 0] < tol
+        if converged.all():
+            break
+
+    # Replikasi dengan kolom desain tanpa variasi (mis. semua bulan dari satu tahun) tidak teridentifikasi
+    identified = np.linalg.matrix_rank(np.einsum('bn,ni,nj->bij', weights, X, X)) == k
+    return beta, converged & identified
+
+
+def _bootstrap_chunk(task):
+    X, y, beta, seed, size = task
+    rng = np.random.default_rng(seed)
+    n = len(y)
+    weights = rng.multinomial(n, np.full(n, 1.0 / n), size=size).astype(float)
+    return fit_poisson(X, y, weights, beta)
+
+
+def bootstrap(X, y, beta, replicates, workers=1, chunk_size=None, seed=None):
+    """
+    Bootstrap resampling bulan (bobot multinomial), di-fit per chunk secara vectorized
+
+    Seed tiap chunk diturunkan dari SeedSequence(seed), jadi hasil sama berapa pun jumlah worker.
+
+    Returns:
+        tuple: (koefisien (replicates, k), array bool valid)
+    """
+    chunk_size = chunk_size or CALIBRATION_CONFIG['chunk_size']
+    seed = CALIBRATION_CONFIG['seed'] if seed is None else seed
+    sizes = [min(chunk_size, replicates - start) for start in range(0, replicates, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(X, y, beta, child, size) for child, size in zip(seeds, sizes)]
+
+    if workers > 1 and len(tasks) > 1:
+        context = mp.get_context('fork' if 'fork' in mp.get_all_start_methods() else 'spawn')
+        with context.Pool(processes=min(workers, len(tasks))) as pool:
+            results = pool.map(_bootstrap_chunk, tasks)
+    else:
+        results = [_bootstrap_chunk(task) for task in tasks]
+
+    return np.concatenate([r[0] for r in results]), np.concatenate([r[1] for r in results])
+
+
+def table_rr(name, values):
+    """RR menurut tabel untuk nilai-nilai faktor (polutan: median per increment)"""
+    factor = FACTORS[name]
+    values = np.asarray(values, dtype=float)
+    if factor['table'] == 'weather':
+        return _weather_rr_batch(name, values)[0]
+    return POLLUTION_RR[name]['median'] ** (values / factor['increment'])
+
+
+class Calibration:
+    """
+    Fit RR per faktor terhadap kasus ISPA bulanan + interval kepercayaan bootstrap
+
+    Args:
+        store: HistoryStore sumber polutan/cuaca tambahan (default: data/history)
+        use_history: Gabungkan history store (False = hanya data BPS)
+        config: Override CALIBRATION_CONFIG
+    """
+
+    def __init__(self, store=None, use_history=True, config=None):
+        self.config = {**CALIBRATION_CONFIG, **(config or {})}
+        self.store = store
+        self.use_history = use_history
+
+    def run(self):
+        """
+        Returns:
+            dict: laporan kalibrasi (dataset, fit, RR per faktor vs tabel, waktu)
+        """
+        started = time.perf_counter()
+        df, factors, notes = build_dataset(self.store, self.use_history, self.config)
+        if len(df) <= len(factors) + df['year'].nunique():
+            raise ValueError(f"Data tidak cukup untuk kalibrasi: {len(df)} bulan, {len(factors)} faktor")
+
+        X, names, mean, scale = design_matrix(df, factors)
+        y = df['cases'].to_numpy(dtype=float)
+        beta, ok = fit_poisson(X, y)
+        if not ok[0]:
+            raise ValueError("Regresi Poisson tidak konvergen")
+        beta = beta[0]
+        fitted_at = time.perf_counter()
+
+        replicates, valid = bootstrap(X, y, beta, self.config['bootstrap'], self.config['workers'],
+                                      self.config['chunk_size'], self.config['seed'])
+        replicates = replicates[valid]
+        bootstrapped_at = time.perf_counter()
+
+        mu = np.exp(X @ beta)
+        dispersion = float(((y - mu) ** 2 / mu).sum() / (len(y) - X.shape[1]))
+        alpha = (1 - self.config['confidence']) / 2
+
+        results = []
+        offset = len(names) - len(factors)
+        for i, name in enumerate(factors):
+            factor = FACTORS[name]
+            values = df[factor['column']].to_numpy(dtype=float)
+            low, high = np.percentile(values, [10, 90])
+            # Koefisien per satuan asli (faktor di matriks desain terstandardisasi)
+            per_unit = beta[offset + i] / scale[i]
+            samples = replicates[:, offset + i] / scale[i]
+            per_increment = np.exp(samples * factor['increment'])
+            contrast = np.exp(samples * (high - low))
+            table_low, table_high = table_rr(name, [low, high])
+            fitted_contrast = float(np.exp(per_unit * (high - low)))
+            ci = np.quantile(contrast, [alpha, 1 - alpha])
+            expected = float(table_high / table_low)
+            results.append({
+                'factor': name, 'unit': factor['unit'], 'increment': factor['increment'],
+                'rr_per_increment': float(np.exp(per_unit * factor['increment'])),
+                'rr_per_increment_ci': np.quantile(per_increment, [alpha, 1 - alpha]).tolist(),
+                'p10': float(low), 'p90': float(high),
+                'rr_p10_p90': fitted_contrast,
+                'rr_p10_p90_ci': ci.tolist(),
+                'table_rr_p10_p90': expected,
+                'verdict': 'konsisten' if ci[0] <= expected <= ci[1] else
+                           ('tabel terlalu tinggi' if expected > ci[1] else 'tabel terlalu rendah')
+            })
+
+        return {
+            'generated_at': datetime.now().isoformat(),
+            'province': self.config['province'],
+            'months': len(df), 'period': [df['month'].iloc[0], df['month'].iloc[-1]],
+            'factors': factors, 'notes': notes,
+            'model': {
+                'family': 'poisson', 'link': 'log', 'terms': names,
+                'coefficients': beta.tolist(), 'dispersion': dispersion
+            },
+            'bootstrap': {
+                'replicates': int(self.config['bootstrap']), 'valid': int(valid.sum()),
+                'workers': int(self.config['workers']), 'seed': int(self.config['seed']),
+                'confidence': self.config['confidence']
+            },
+            'results': results,
+            'timing': {'fit_s': fitted_at - started, 'bootstrap_s': bootstrapped_at - fitted_at}
+        }
+
+
+def print_report(report):
+    print("\n" + "="*70)
+    print(f"📐 KALIBRASI RR - {report['province']} ({report['months']} bulan, "
+          f"{report['period'][0]} s/d {report['period'][1]})")
+    print("="*70)
+    for note in report['notes']:
+        print(f"   ℹ️  {note}")
+    print(f"   Dispersi Pearson: {report['model']['dispersion']:.1f} "
+          f"(> 1: overdispersi, interval memakai bootstrap)")
+    print(f"   Bootstrap: {report['bootstrap']['valid']}/{report['bootstrap']['replicates']} replikasi valid\n")
+
+    level = int(report['bootstrap']['confidence'] * 100)
+    print(f"   {'Faktor':12s} {'RR/increment':>22s} {'RR p10→p90 (fit)':>18s} {f'CI {level}%':>17s} {'Tabel':>7s}  Status")
+    for result in report['results']:
+        per_increment = f"{result['rr_per_increment']:.3f} /{result['increment']:g} {result['unit']}"
+        ci = result['rr_p10_p90_ci']
+        print(f"   {result['factor']:12s} {per_increment:>22s} {result['rr_p10_p90']:18.3f} "
+              f"{f'[{ci[0]:.3f}, {ci[1]:.3f}]':>17s} {result['table_rr_p10_p90']:7.3f}  {result['verdict']}")
+
+    timing = report['timing']
+    print(f"\n   ⏱️  fit {timing['fit_s']:.2f}s, bootstrap {timing['bootstrap_s']:.2f}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Kalibrasi tabel RR terhadap kasus ISPA bulanan')
+    parser.add_argument('--bootstrap', type=int, default=CALIBRATION_CONFIG['bootstrap'], help='Jumlah replikasi bootstrap')
+    parser.add_argument('--workers', type=int, default=CALIBRATION_CONFIG['workers'], help='Jumlah proses bootstrap')
+    parser.add_argument('--seed', type=int, default=CALIBRATION_CONFIG['seed'])
+    parser.add_argument('--no-history', action='store_true', help='Hanya data BPS (tanpa history store)')
+    parser.add_argument('--output', default='output', help='Folder laporan JSON')
+    args = parser.parse_args(argv)
+
+    report = Calibration(use_history=not args.no_history, config={
+        'bootstrap': args.bootstrap, 'workers': max(1, args.workers), 'seed': args.seed
+    }).run()
+    print_report(report)
+
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"calibration_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, 'wb') as f:
+        f.write(fastjson.dumps(report))
+    print(f"   💾 {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
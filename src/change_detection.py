@@ -0,0 +1,127 @@
+"""
+Deteksi perubahan per kota: fingerprint nilai terukur setiap record dibandingkan dengan
+observasi terakhir yang sudah disimpan (output/risk_latest.csv), supaya load hanya
+menulis baris yang benar-benar berubah
+"""
+
+import json
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Tambahkan path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import DEDUP_CONFIG
+
+# Nilai hasil pengukuran API; kolom RR & kategori diturunkan dari nilai ini
+MEASURED_COLUMNS = [
+    'lat', 'lon',
+    'pm2_5', 'pm10', 'no2', 'so2', 'o3', 'co',
+    'temperature', 'humidity', 'wind_speed', 'pressure', 'cloud_cover'
+]
+
+
+def fingerprint(df):
+    """
+    Hash 64-bit nilai terukur per baris (timestamp tidak ikut)
+
+    Returns:
+        ndarray: uint64 per baris
+    """
+    measured = df[MEASURED_COLUMNS].astype(float).round(DEDUP_CONFIG['decimals'])
+    return pd.util.hash_pandas_object(measured, index=False).to_numpy()
+
+
+class ChangeDetector:
+    """
+    Snapshot observasi terakhir per kota + fingerprint dan run_id yang menulisnya
+
+    File snapshot sekaligus menjadi tampilan "data terkini" lengkap untuk dashboard,
+    karena output per run hanya berisi kota yang berubah.
+
+    Args:
+        path: File snapshot (default: DEDUP_CONFIG['latest_path'])
+    """
+
+    def __init__(self, path=None):
+        self.path = str(path or DEDUP_CONFIG['latest_path'])
+        self.latest = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return pd.DataFrame(columns=['city', 'fingerprint', 'run_id']).set_index('city')
+        latest = pd.read_csv(self.path, dtype={'fingerprint': 'uint64', 'run_id': str})
+        return latest.set_index('city', drop=False).rename_axis(None)
+
+    def detect(self, df, run_id):
+        """
+        Bandingkan record run ini dengan observasi terakhir per kota
+
+        Args:
+            df: DataFrame hasil transform
+            run_id: Run saat ini (kota yang sudah ditulis oleh run yang sama, misal sebelum
+                    retry_failed, tetap dihitung sebagai bagian output run ini)
+
+        Returns:
+            tuple: (fingerprint array, mask berubah, mask output run ini)
+        """
+        prints = fingerprint(df)
+        # Lookup per kota lewat dict: uint64 tidak aman lewat reindex (NaN mengubahnya ke float)
+        previous = dict(zip(self.latest.index, self.latest['fingerprint'].tolist()))
+        previous_run = dict(zip(self.latest.index, self.latest['run_id'].tolist()))
+
+        cities = df['city'].tolist()
+        changed = np.fromiter((previous.get(city) != int(p) for city, p in zip(cities, prints)),
+                              dtype=bool, count=len(cities))
+        same_run = np.fromiter((previous_run.get(city) == run_id for city in cities),
+                               dtype=bool, count=len(cities))
+        return prints, changed, changed | same_run
+
+    def update(self, df, prints, run_id):
+        """Simpan baris yang berubah sebagai observasi terakhir kota tersebut"""
+        if len(df) == 0:
+            return
+        rows = df.assign(fingerprint=prints, run_id=run_id).set_index('city', drop=False).rename_axis(None)
+        self.latest = rows if self.latest.empty else pd.concat([self.latest.drop(rows.index, errors='ignore'), rows])
+        self.save()
+
+    def save(self):
+        """Tulis snapshot ke file secara atomik"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        self.latest.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, self.path)
+
+    def last_seen(self, cities):
+        """
+        Returns:
+            dict: kota -> {'run_id', 'timestamp'} observasi terakhir yang tersimpan
+        """
+        latest = self.latest.reindex(cities)
+        return {
+            city: {'run_id': row['run_id'], 'timestamp': row['timestamp'] if pd.notna(row.get('timestamp')) else None}
+            for city, row in latest.iterrows() if pd.notna(row['run_id'])
+        }
+
+
+def write_manifest(path, run_id, changed_cities, unchanged_cities, files, last_seen):
+    """Manifest run: kota yang ditulis, kota yang tidak berubah (dan kapan terakhir ditulis), file output"""
+    manifest = {
+        'run_id': run_id,
+        'created': datetime.now().isoformat(),
+        'changed': sorted(changed_cities),
+        'unchanged': [
+            {'city': city, **last_seen.get(city, {})}
+            for city in sorted(unchanged_cities)
+        ],
+        'files': files
+    }
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return manifest
@@ -0,0 +1,91 @@
+"""
+Entry point tunggal untuk pipeline, scheduler, API dan dashboard
+
+Modul subcommand (beserta pandas/plotly/streamlit) baru di-import setelah subcommand
+dipilih, jadi `python src/cli.py run` dari cron langsung mulai fetch.
+
+Contoh:
+    python src/cli.py run --format ndjson
+    python src/cli.py backfill --start 2024-01-01 --end 2024-03-01
+    python src/cli.py schedule
+    python src/cli.py serve --port 8080
+    python src/cli.py bench --quick
+    python src/cli.py run --help              # argumen tiap subcommand
+"""
+
+import argparse
+import importlib
+import importlib.util
+import os
+import subprocess
+import sys
+
+# Tambahkan path
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+
+def _module_main(module):
+    def run(argv):
+        return importlib.import_module(module).main(argv)
+    return run
+
+
+def _schedule(argv):
+    if argv:
+        raise SystemExit("schedule tidak menerima argumen (atur lewat environment variable)")
+    from src.scheduler import main
+    return main()
+
+
+def _bench(argv):
+    # benchmarks/ bukan package; muat langsung dari path file
+    path = os.path.join(ROOT_DIR, 'benchmarks', 'run_benchmarks.py')
+    spec = importlib.util.spec_from_file_location('run_benchmarks', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.main(argv)
+
+
+def _dashboard(argv):
+    path = os.path.join(ROOT_DIR, 'src', 'dashboard_simple.py')
+    return subprocess.call([sys.executable, '-m', 'streamlit', 'run', path, *argv])
+
+
+# Subcommand -> (handler(argv), deskripsi)
+COMMANDS = {
+    'run': (_module_main('src.etl_pipeline'), 'Jalankan ETL sekali (extract → transform → load)'),
+    'forecast': (_module_main('src.forecast'), 'Forecast risiko per jam (24-72 jam)'),
+    'backfill': (_module_main('src.backfill'), 'Backfill riwayat polusi ke history store'),
+    'schedule': (_schedule, 'Scheduler: ETL tiap jam + maintenance harian + risk API'),
+    'serve': (_module_main('src.risk_api'), 'Risk API read-only'),
+    'maintenance': (_module_main('src.maintenance'), 'Compaction, downsampling & retensi'),
+    'recompute': (_module_main('src.recompute'), 'Hitung ulang skor history setelah tabel RR berubah'),
+    'calibrate': (_module_main('src.calibration'), 'Kalibrasi tabel RR terhadap kasus ISPA bulanan'),
+    'scenarios': (_module_main('src.scenarios'), 'Scenario & sensitivity sweep tabel RR terhadap history'),
+    'alerts': (_module_main('src.alerts'), 'Evaluasi alert per kota / webhook sink lokal'),
+    'report': (_module_main('src.report'), 'Laporan statis HTML/JSON dari snapshot terkini'),
+    'profile': (_module_main('src.profiling'), 'Ringkasan profil run (PROFILE_ENABLED=1 / run --profile)'),
+    'cube': (_module_main('src.cube'), 'Cube agregat history: build / query per wilayah, provinsi, waktu'),
+    'bench': (_bench, 'Benchmark suite'),
+    'dashboard': (_dashboard, 'Dashboard Streamlit')
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='cli.py',
+        description='ETL Pipeline Risk Ratio ISPA',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='Subcommand:\n' + '\n'.join(f"  {name:12s} {description}" for name, (_, description) in COMMANDS.items())
+    )
+    parser.add_argument('command', choices=COMMANDS, metavar='command', help='Lihat daftar di bawah')
+    parser.add_argument('args', nargs=argparse.REMAINDER, help='Argumen subcommand (lihat <command> --help)')
+    args = parser.parse_args(argv)
+
+    handler, _ = COMMANDS[args.command]
+    return handler(args.args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
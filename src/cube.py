@@ -0,0 +1,563 @@
+"""
+Cube agregat history untuk slicing wilayah / provinsi / kota / waktu / kategori
+
+Dimensi: region (pulau, config.rr_tables.REGIONS), province, city, month, day, hour (jam
+0-23) dan category (risk_category). Measure per kolom CUBE_CONFIG['measures'] (rr_total +
+polutan) disimpan aditif: count, sum, sum of squares, min, max, sehingga mean/std/min/max di
+level agregasi mana pun dihitung dari gabungan sel tanpa membaca record history.
+
+Disimpan per partisi bulan history (<history>/_cube/YYYY-MM.npz), masing-masing berisi dua
+cuboid yang sudah diagregasi:
+- base : (kota, hari, jam, kategori)
+- daily: (kota, hari, kategori), dipakai jika query tidak menyentuh jam (±24× lebih sedikit sel)
+Provinsi & wilayah diturunkan dari tabel lokasi kota. HistoryStore memperbarui cube setiap kali
+partisi ditulis (append saat load/backfill, write_partition saat maintenance/recompute), jadi
+isinya selalu sama dengan partisi (termasuk duplikat yang belum di-compact).
+
+Contoh:
+    python src/cube.py build                                   # sekali untuk history yang sudah ada
+    python src/cube.py query --by region --from 2025-01-01
+    python src/cube.py query --by province,month --region Jawa --measures rr_total,pm2_5
+"""
+
+import argparse
+import glob
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Tambahkan path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import CUBE_CONFIG, DATA_PATHS
+from config.rr_tables import CATEGORY_LEVELS, PROVINCE_REGIONS, UNKNOWN_REGION
+
+GEOGRAPHY = ('region', 'province', 'city')
+TIME = ('month', 'day', 'hour')
+# Hierarki roll-up / drill-down (kasar -> halus)
+HIERARCHIES = {'geography': GEOGRAPHY, 'time': TIME, 'category': ('category',)}
+DIMENSIONS = GEOGRAPHY + TIME + ('category',)
+
+STATS = ('count', 'sum', 'sumsq', 'min', 'max')
+LEVELS = {'base': ('loc', 'day', 'hour', 'cat'), 'daily': ('loc', 'day', 'cat')}
+CATEGORIES = list(CATEGORY_LEVELS['risk_category'])
+UNKNOWN_CATEGORY = CATEGORIES.index('Unknown')
+LOCAL_TZ = datetime.now().astimezone().tzinfo
+
+
+def _split(value):
+    """'a,b' / list / None -> list string"""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(',') if item.strip()]
+    return [str(item) for item in value]
+
+
+def _dimensions(by):
+    by = _split(by)
+    unknown = [dim for dim in by if dim not in DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Dimensi tidak dikenal: {', '.join(unknown)} (pilihan: {', '.join(DIMENSIONS)})")
+    return tuple(dict.fromkeys(by))
+
+
+def _hierarchy(name):
+    if name in HIERARCHIES:
+        return HIERARCHIES[name]
+    for levels in HIERARCHIES.values():
+        if name in levels:
+            return levels
+    raise ValueError(f"Hierarki tidak dikenal: {name} (pilihan: {', '.join(HIERARCHIES)} atau nama dimensi)")
+
+
+def drill_down(by, dimension):
+    """
+    Turun satu level di hierarki `dimension` (region → province → city, month → day → hour)
+
+    Level induk tetap ada di hasil (drill_down(['region'], 'geography') -> ('region', 'province'));
+    jika belum ada level hierarki tersebut, level teratasnya yang ditambahkan.
+    """
+    by = list(_dimensions(by))
+    levels = _hierarchy(dimension)
+    present = [level for level in levels if level in by]
+    if not present:
+        return tuple(by + [levels[0]])
+    i = levels.index(present[-1])
+    if i + 1 == len(levels):
+        raise ValueError(f"{present[-1]} sudah level terendah hierarki")
+    by.insert(by.index(present[-1]) + 1, levels[i + 1])
+    return tuple(by)
+
+
+def roll_up(by, dimension):
+    """Naik satu level: buang level terhalus hierarki `dimension` dari `by` (level teratas -> total)"""
+    by = list(_dimensions(by))
+    present = [level for level in _hierarchy(dimension) if level in by]
+    if not present:
+        raise ValueError(f"Tidak ada level hierarki {dimension} di {by}")
+    by.remove(present[-1])
+    return tuple(by)
+
+
+def _epoch_days(timestamps):
+    """Timestamp ISO (tanpa zona = lokal) -> (hari sejak epoch, jam), baris invalid = -1"""
+    ts = pd.to_datetime(pd.Series(timestamps, dtype=object), format='ISO8601', errors='coerce', utc=False)
+    if ts.dt.tz is not None:
+        ts = ts.dt.tz_convert(LOCAL_TZ).dt.tz_localize(None)
+    valid = ts.notna().to_numpy()
+    values = ts.to_numpy(dtype='datetime64[ns]')
+    day = np.where(valid, values.astype('datetime64[D]').astype(np.int64), -1)
+    hour = np.where(valid, ts.dt.hour.fillna(0).to_numpy(dtype=np.int64), -1)
+    return day, hour, valid
+
+
+def _key(columns, cards, n):
+    """Gabungkan kolom kode (0..card-1) menjadi satu key int64"""
+    key = np.zeros(n, dtype=np.int64)
+    for column, card in zip(columns, cards):
+        key = key * card + column
+    return key
+
+
+def _group(key, size):
+    """
+    Returns:
+        tuple: (key unik urut, index grup per sel)
+    """
+    if size <= max(4 * len(key), 1 << 16):
+        # Ruang key kecil: bincount langsung (O(n), tanpa sort)
+        present = np.bincount(key, minlength=size) > 0
+        return np.flatnonzero(present), (np.cumsum(present) - 1)[key]
+    return np.unique(key, return_inverse=True)
+
+
+def _reduce(cells, inverse, n):
+    """
+    Gabungkan measure sel per grup: count/sum/sumsq dijumlah (bincount), min/max lewat
+    reduceat atas sel yang diurutkan per grup (jauh lebih cepat dari ufunc.at)
+
+    Args:
+        cells: records (sel,) dan STATS berbentuk (measure, sel)
+        inverse: Index grup 0..n-1 per sel (setiap grup punya minimal satu sel)
+    """
+    m = len(cells['count'])
+    out = {'records': np.bincount(inverse, weights=cells['records'], minlength=n)}
+    for stat in ('count', 'sum', 'sumsq'):
+        out[stat] = np.empty((m, n))
+        for j in range(m):
+            out[stat][j] = np.bincount(inverse, weights=cells[stat][j], minlength=n)
+    if n == 0:
+        out['min'], out['max'] = np.empty((m, 0)), np.empty((m, 0))
+        return out
+    # Index grup < 65536 diurutkan dengan radix sort (kind='stable' untuk uint16)
+    order = np.argsort(inverse.astype(np.uint16) if n <= 1 << 16 else inverse, kind='stable')
+    grouped = inverse[order]
+    starts = np.flatnonzero(np.r_[True, grouped[1:] != grouped[:-1]])
+    for stat, ufunc in (('min', np.minimum), ('max', np.maximum)):
+        out[stat] = ufunc.reduceat(cells[stat][:, order], starts, axis=1)
+    return out
+
+
+def _row_cells(df, measures):
+    """
+    Record history -> sel mentah (satu sel per record)
+
+    Returns:
+        tuple: (tabel lokasi [region, province, city], dict kolom dimensi, dict measure)
+    """
+    day, hour, valid = _epoch_days(df['timestamp'])
+    df = df[valid]
+    day, hour = day[valid], hour[valid]
+
+    province = df['province'].fillna('').astype(str)
+    city = df['city'].astype(str)
+    region = province.map(PROVINCE_REGIONS).fillna(UNKNOWN_REGION)
+    loc, uniques = pd.factorize(region + '\x1f' + province + '\x1f' + city)
+    locations = np.array([value.split('\x1f') for value in uniques], dtype=str).reshape(-1, 3)
+
+    cat = pd.Categorical(df['risk_category'].astype(object), categories=CATEGORIES).codes.astype(np.int64)
+    cat[cat < 0] = UNKNOWN_CATEGORY
+
+    values = np.array([pd.to_numeric(df[m], errors='coerce').to_numpy(dtype=float) if m in df.columns
+                       else np.full(len(df), np.nan) for m in measures]).reshape(len(measures), len(df))
+    present = ~np.isnan(values)
+    cells = {
+        'records': np.ones(len(df)),
+        'count': present.astype(float),
+        'sum': np.where(present, values, 0.0),
+        'sumsq': np.where(present, values * values, 0.0),
+        'min': np.where(present, values, np.inf),
+        'max': np.where(present, values, -np.inf)
+    }
+    return locations, {'loc': loc.astype(np.int64), 'day': day, 'hour': hour, 'cat': cat}, cells
+
+
+def _build(locations, dims, cells, measures):
+    """Sel mentah (dalam satu tabel lokasi) -> partisi cube (cuboid base + daily)"""
+    n = len(dims['loc'])
+    day0 = int(dims['day'].min()) if n else 0
+    span = int(dims['day'].max()) - day0 + 1 if n else 1
+    cards = {'loc': max(len(locations), 1), 'day': span, 'hour': 24, 'cat': len(CATEGORIES)}
+    codes = {**dims, 'day': dims['day'] - day0}
+
+    partition = {'locations': locations, 'measures': np.array(measures, dtype=str)}
+    for level, names in LEVELS.items():
+        size = int(np.prod([cards[name] for name in names]))
+        keys, inverse = _group(_key([codes[name] for name in names], [cards[name] for name in names], n), size)
+        parts = np.unravel_index(keys, [cards[name] for name in names])
+        for name, values in zip(names, parts):
+            partition[f"{level}_{name}"] = (values + day0 if name == 'day' else values).astype(
+                np.int32 if name in ('loc', 'day') else np.int8)
+        out = _reduce(cells, inverse, len(keys))
+        partition[f"{level}_records"] = out['records'].astype(np.int64)
+        for stat in STATS:
+            partition[f"{level}_{stat}"] = out[stat]
+    return partition
+
+
+def _partition_cells(partition):
+    """Cuboid base partisi -> (dims, cells) untuk digabung ulang"""
+    dims = {name: partition[f"base_{name}"].astype(np.int64) for name in LEVELS['base']}
+    cells = {'records': partition['base_records'].astype(float),
+             **{stat: partition[f"base_{stat}"] for stat in STATS}}
+    return dims, cells
+
+
+class RiskCube:
+    """
+    Cube agregat history (partisi per bulan) + query roll-up / drill-down
+
+    Args:
+        root: Folder history store (cube di <root>/CUBE_CONFIG['dir_name'])
+        measures: Kolom yang diagregasi (default: CUBE_CONFIG['measures'])
+
+    Partisi di disk dimuat sekali lalu hanya partisi yang berubah (mtime) yang dibaca ulang,
+    jadi satu instance bisa dipakai terus di proses panjang (risk API, dashboard).
+    """
+
+    def __init__(self, root=None, measures=None):
+        self.history_root = str(root or DATA_PATHS['history'])
+        self.root = os.path.join(self.history_root, CUBE_CONFIG['dir_name'])
+        self.measures = list(measures or CUBE_CONFIG['measures'])
+        self._lock = threading.Lock()
+        self._loaded = {}
+        self._data = {}
+
+    def partition_path(self, month):
+        return os.path.join(self.root, f"{month}.npz")
+
+    def months(self):
+        return sorted(os.path.basename(path)[:-4]
+                      for path in glob.glob(os.path.join(self.root, '[0-9][0-9][0-9][0-9]-[0-9][0-9].npz')))
+
+    def read_partition(self, month, level=None):
+        """Isi file cube satu bulan (level: hanya array cuboid tersebut + tabel lokasi)"""
+        with np.load(self.partition_path(month), allow_pickle=False) as data:
+            names = [name for name in data.files
+                     if level is None or name in ('locations', 'measures') or name.startswith(f"{level}_")]
+            return {name: data[name] for name in names}
+
+    def _write(self, month, partition):
+        os.makedirs(self.root, exist_ok=True)
+        path = self.partition_path(month)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **partition)
+        os.replace(tmp_path, path)
+
+    # --- sisi tulis (dipanggil HistoryStore di bawah lock-nya) ---
+
+    def rebuild_month(self, month, df):
+        """Bangun ulang cube satu bulan dari seluruh isi partisi history"""
+        locations, dims, cells = _row_cells(df, self.measures)
+        self._write(month, _build(locations, dims, cells, self.measures))
+
+    def update(self, month, rows, partition_path=None):
+        """
+        Tambahkan record baru ke cube bulan `month`
+
+        Args:
+            rows: DataFrame record yang baru di-append ke partisi
+            partition_path: CSV partisi history (sudah berisi rows); dipakai untuk membangun
+                ulang jika cube bulan ini belum ada atau measures-nya berbeda dari konfigurasi
+        """
+        path = self.partition_path(month)
+        existing = self.read_partition(month) if os.path.exists(path) else None
+        if existing is not None and list(existing['measures']) != self.measures:
+            existing = None
+        if existing is None:
+            if partition_path is not None and os.path.exists(partition_path):
+                return self.rebuild_month(month, pd.read_csv(partition_path))
+            return self.rebuild_month(month, rows)
+
+        locations, dims, cells = _row_cells(rows, self.measures)
+        # Satukan tabel lokasi: lokasi lama tetap di kodenya, lokasi baru ditambahkan di belakang
+        index = {tuple(location): i for i, location in enumerate(existing['locations'].tolist())}
+        merged = list(existing['locations'].tolist())
+        remap = np.empty(len(locations), dtype=np.int64)
+        for i, location in enumerate(locations.tolist()):
+            remap[i] = index.setdefault(tuple(location), len(merged))
+            if remap[i] == len(merged):
+                merged.append(location)
+        dims['loc'] = remap[dims['loc']] if len(dims['loc']) else dims['loc']
+
+        old_dims, old_cells = _partition_cells(existing)
+        dims = {name: np.concatenate([old_dims[name], dims[name]]) for name in dims}
+        cells = {name: np.concatenate([old_cells[name], cells[name]], axis=-1) for name in cells}
+        self._write(month, _build(np.array(merged, dtype=str).reshape(-1, 3), dims, cells, self.measures))
+
+    def remove_month(self, month):
+        try:
+            os.remove(self.partition_path(month))
+        except FileNotFoundError:
+            pass
+
+    def build(self, store, months=None):
+        """
+        Bangun ulang cube dari partisi history (sekali untuk history yang sudah ada)
+
+        Returns:
+            dict: bulan -> jumlah record
+        """
+        built = {}
+        for month in months or store.months():
+            df = store.read_partition(month)
+            self.rebuild_month(month, df)
+            built[month] = len(df)
+        for month in set(self.months()) - set(store.months()):
+            self.remove_month(month)
+        return built
+
+    # --- sisi baca ---
+
+    def refresh(self, level='daily'):
+        """
+        Muat partisi yang baru / berubah sejak query terakhir
+
+        Args:
+            level: Cuboid yang dimuat ('daily' atau 'base'); base (per jam, ±24× lebih besar)
+                baru dibaca saat ada query per jam
+        """
+        with self._lock:
+            current = {}
+            for month in self.months():
+                try:
+                    current[month] = os.path.getmtime(self.partition_path(month))
+                except FileNotFoundError:
+                    continue
+            loaded = self._loaded.setdefault(level, {})
+            if level in self._data and current == {month: mtime for month, (mtime, _) in loaded.items()}:
+                return False
+
+            fresh = {}
+            for month, mtime in current.items():
+                cached = loaded.get(month)
+                if cached is not None and cached[0] == mtime:
+                    fresh[month] = cached
+                    continue
+                partition = self.read_partition(month, level)
+                if list(partition['measures']) != self.measures:
+                    print(f"⚠️  Cube {month} memakai measures lama, jalankan python src/cube.py build")
+                    continue
+                fresh[month] = (mtime, partition)
+            self._loaded[level] = fresh
+            self._data[level] = self._combine(level, [partition for _, partition in fresh.values()])
+            return True
+
+    def _combine(self, level, partitions):
+        """Gabungkan partisi ke satu tabel lokasi global + array cuboid"""
+        index = {}
+        locations = []
+        remaps = []
+        for partition in partitions:
+            remap = np.empty(len(partition['locations']), dtype=np.int64)
+            for i, location in enumerate(partition['locations'].tolist()):
+                key = tuple(location)
+                if key not in index:
+                    index[key] = len(locations)
+                    locations.append(key)
+                remap[i] = index[key]
+            remaps.append(remap)
+
+        data = {'geo': {}}
+        for i, dim in enumerate(GEOGRAPHY):
+            codes, names = pd.factorize(pd.Series([location[i] for location in locations], dtype=object))
+            data['geo'][dim] = (codes.astype(np.int64), np.asarray(names, dtype=object))
+        for name in LEVELS[level]:
+            parts = [partition[f"{level}_{name}"].astype(np.int64) for partition in partitions]
+            if name == 'loc':
+                parts = [remap[part] for remap, part in zip(remaps, parts)]
+            data[name] = np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+        data['records'] = np.concatenate([p[f"{level}_records"] for p in partitions]) if partitions else np.empty(0)
+        for stat in STATS:
+            data[stat] = np.concatenate([p[f"{level}_{stat}"] for p in partitions], axis=1) if partitions \
+                else np.empty((len(self.measures), 0))
+        data['month'] = data['day'].astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+        return data
+
+    def query(self, by=(), start=None, end=None, measures=None, region=None, province=None, city=None,
+              category=None, hour=None):
+        """
+        Agregasi cube per kombinasi dimensi `by`
+
+        Args:
+            by: Dimensi grup (list atau 'region,day'); kosong = total
+            start, end: Batas hari inklusif (string/datetime)
+            measures: Subset CUBE_CONFIG['measures'] (default: semua)
+            region, province, city, category: Filter (nilai tunggal atau list)
+            hour: Filter jam 0-23 (int atau list)
+
+        Returns:
+            DataFrame: kolom `by`, records, lalu per measure <m>_count/_mean/_std/_min/_max
+        """
+        by = _dimensions(by)
+        measures = _split(measures) or list(self.measures)
+        unknown = [m for m in measures if m not in self.measures]
+        if unknown:
+            raise ValueError(f"Measure tidak ada di cube: {', '.join(unknown)}")
+        columns = [self.measures.index(m) for m in measures]
+        try:
+            hours = [int(h) for h in _split(hour)] if hour is not None else None
+        except ValueError:
+            raise ValueError(f"Jam harus bilangan 0-23: {hour}") from None
+
+        level = 'base' if 'hour' in by or hours is not None else 'daily'
+        self.refresh(level)
+        cube = self._data[level]
+        mask = None
+
+        def restrict(condition):
+            nonlocal mask
+            mask = condition if mask is None else mask & condition
+
+        if start is not None:
+            restrict(cube['day'] >= np.datetime64(pd.Timestamp(start).date(), 'D').astype(np.int64))
+        if end is not None:
+            restrict(cube['day'] <= np.datetime64(pd.Timestamp(end).date(), 'D').astype(np.int64))
+        loc_mask = None
+        for dim, values in (('region', region), ('province', province), ('city', city)):
+            if values is not None:
+                codes, names = cube['geo'][dim]
+                selected = np.isin(names, _split(values))[codes] if len(codes) else np.zeros(0, dtype=bool)
+                loc_mask = selected if loc_mask is None else loc_mask & selected
+        if loc_mask is not None:
+            restrict(loc_mask[cube['loc']])
+        if category is not None:
+            wanted = _split(category)
+            unknown = [c for c in wanted if c not in CATEGORIES]
+            if unknown:
+                raise ValueError(f"Kategori tidak dikenal: {', '.join(unknown)}")
+            restrict(np.isin(cube['cat'], [CATEGORIES.index(c) for c in wanted]))
+        if hours is not None:
+            restrict(np.isin(cube['hour'], hours))
+
+        # Tanpa filter: array cuboid dipakai langsung (tanpa salinan)
+        idx = None if mask is None else np.flatnonzero(mask)
+        n = len(cube['loc']) if idx is None else len(idx)
+
+        def take(values):
+            return values if idx is None else values[idx]
+
+        codes, cards, decode = [], [], []
+        for dim in by:
+            if dim in GEOGRAPHY:
+                geo_codes, names = cube['geo'][dim]
+                values = geo_codes[take(cube['loc'])]
+                cards.append(max(len(names), 1))
+                decode.append(lambda v, names=names: names[v])
+            elif dim in ('day', 'month'):
+                raw = take(cube[dim])
+                offset = int(raw.min()) if n else 0
+                values = raw - offset
+                cards.append(int(values.max()) + 1 if n else 1)
+                unit = 'D' if dim == 'day' else 'M'
+                decode.append(lambda v, offset=offset, unit=unit:
+                              np.datetime_as_string((v + offset).astype(f'datetime64[{unit}]'), unit=unit))
+            elif dim == 'hour':
+                values = take(cube['hour'])
+                cards.append(24)
+                decode.append(lambda v: v)
+            else:
+                values = take(cube['cat'])
+                cards.append(len(CATEGORIES))
+                decode.append(lambda v: np.asarray(CATEGORIES, dtype=object)[v])
+            codes.append(values)
+
+        cells = {'records': take(cube['records'])}
+        for stat in STATS:
+            values = cube[stat] if len(columns) == len(self.measures) else cube[stat][columns]
+            cells[stat] = values if idx is None else values[:, idx]
+        keys, inverse = _group(_key(codes, cards, n), int(np.prod(cards)) if cards else 1)
+        out = _reduce(cells, inverse, len(keys))
+
+        result = {}
+        for dim, values, fn in zip(by, np.unravel_index(keys, cards) if cards else (), decode):
+            result[dim] = fn(values)
+        result['records'] = out['records'].astype(np.int64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for j, measure in enumerate(measures):
+                count, total, sumsq = out['count'][j], out['sum'][j], out['sumsq'][j]
+                empty = count == 0
+                variance = np.maximum(sumsq - total * total / count, 0) / (count - 1)
+                result[f"{measure}_count"] = count.astype(np.int64)
+                result[f"{measure}_mean"] = np.where(empty, np.nan, total / count)
+                result[f"{measure}_std"] = np.where(count > 1, np.sqrt(variance), np.nan)
+                result[f"{measure}_min"] = np.where(empty, np.nan, out['min'][j])
+                result[f"{measure}_max"] = np.where(empty, np.nan, out['max'][j])
+        df = pd.DataFrame(result)
+        return df.sort_values(list(by), kind='stable', ignore_index=True) if by else df
+
+    def drill_down(self, by, dimension, **kwargs):
+        """query() satu level lebih halus di hierarki `dimension` (lihat drill_down)"""
+        return self.query(drill_down(by, dimension), **kwargs)
+
+    def roll_up(self, by, dimension, **kwargs):
+        """query() satu level lebih kasar di hierarki `dimension` (lihat roll_up)"""
+        return self.query(roll_up(by, dimension), **kwargs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Cube agregat history (wilayah/provinsi/kota × waktu × kategori)')
+    sub = parser.add_subparsers(dest='action', required=True)
+    sub.add_parser('build', help='Bangun ulang cube dari semua partisi history')
+    q = sub.add_parser('query', help='Agregasi cube')
+    q.add_argument('--by', default='region', help=f"Dimensi dipisah koma ({', '.join(DIMENSIONS)})")
+    q.add_argument('--from', dest='start', help='Hari awal (inklusif)')
+    q.add_argument('--to', dest='end', help='Hari akhir (inklusif)')
+    q.add_argument('--measures', default='rr_total', help='Measure dipisah koma')
+    for dim in ('region', 'province', 'city', 'category', 'hour'):
+        q.add_argument(f'--{dim}', help=f'Filter {dim} (dipisah koma)')
+    q.add_argument('--limit', type=int, default=50, help='Jumlah baris yang dicetak')
+    args = parser.parse_args(argv)
+
+    from src.history_store import HistoryStore
+
+    store = HistoryStore()
+    cube = RiskCube(store.root)
+    if args.action == 'build':
+        start = time.perf_counter()
+        built = cube.build(store)
+        print(f"✅ Cube dibangun: {len(built)} bulan, {sum(built.values()):,} record "
+              f"({time.perf_counter() - start:.1f} s) → {cube.root}")
+        return 0
+
+    cube.refresh('base' if 'hour' in _split(args.by) or args.hour else 'daily')
+    start = time.perf_counter()
+    df = cube.query(args.by, start=args.start, end=args.end, measures=args.measures,
+                    region=args.region, province=args.province, city=args.city,
+                    category=args.category, hour=args.hour)
+    elapsed = time.perf_counter() - start
+    with pd.option_context('display.width', 200, 'display.max_columns', 30):
+        print(df.head(args.limit).to_string(index=False))
+    print(f"\n⏱️  {len(df):,} grup dalam {elapsed * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
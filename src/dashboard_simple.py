@@ -4,6 +4,7 @@ Fokus: Extract → Transform → Load + Visualisasi Risk Ratio
 """
 
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
@@ -22,6 +23,9 @@ st.set_page_config(
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.rr_tables import RISK_CATEGORIES, POLLUTION_RR, WEATHER_RR
+from config.config import GRID_CONFIG, REPORT_CONFIG
+from src.interpolation import read_tile
+from src.cube import RiskCube
 
 # Title
 st.title("🏥 Dashboard Analisis Risk Ratio ISPA")
@@ -45,9 +49,12 @@ def run_etl_pipeline():
         etl = SimpleETL()
         df = etl.run(output_format='csv')  # Run full ETL pipeline
         
-        # Dapatkan file CSV terbaru
+        # Dapatkan file CSV terbaru (snapshot lengkap jika deteksi perubahan aktif)
         import glob
         output_dir = os.path.join(script_dir, 'output')
+        latest_snapshot = os.path.join(output_dir, 'risk_latest.csv')
+        if os.path.exists(latest_snapshot):
+            return latest_snapshot, None
         csv_files = glob.glob(os.path.join(output_dir, 'risk_analysis_*.csv'))
         if csv_files:
             latest_file = max(csv_files, key=lambda x: os.path.basename(x))
@@ -141,9 +148,12 @@ with st.sidebar:
             else:
                 st.error(f"❌ Error ETL: {error}")
     
-    # Auto-load logic: prioritaskan file terbaru dari output folder
+    # Auto-load logic: prioritaskan snapshot lengkap (risk_latest.csv), lalu file terbaru dari output folder
+    # (output per run hanya berisi kota yang berubah sejak run sebelumnya)
     auto_loaded_file = None
-    if os.path.exists(output_dir):
+    if os.path.exists(os.path.join(output_dir, 'risk_latest.csv')):
+        auto_loaded_file = os.path.join(output_dir, 'risk_latest.csv')
+    elif os.path.exists(output_dir):
         csv_files = [f for f in os.listdir(output_dir) if f.endswith('.csv')]
         if csv_files:
             # Urutkan berdasarkan timestamp di nama file atau modification time
@@ -191,6 +201,12 @@ with st.sidebar:
             file_time = datetime.fromtimestamp(mtime)
             st.caption(f"📅 Diperbarui: {file_time.strftime('%Y-%m-%d %H:%M:%S')}")
     
+    # Laporan statis per run (src/report.py) untuk pembaca yang tidak perlu eksplorasi interaktif
+    latest_report = os.path.join(REPORT_CONFIG['root'], 'latest', 'index.html')
+    if os.path.exists(latest_report):
+        st.caption(f"📄 Laporan statis: {latest_report} "
+                   f"(python -m http.server --directory {REPORT_CONFIG['root']})")
+    
     st.markdown("---")
     st.markdown("###  Metodologi")
     st.markdown("""
@@ -225,6 +241,17 @@ def load_data(file_path):
     except Exception as e:
         return None, str(e)
 
+@st.cache_resource
+def load_cube():
+    """Satu RiskCube per proses dashboard (partisi yang berubah dibaca ulang saat query)"""
+    return RiskCube()
+
+@st.cache_data
+def load_grid(path, mtime):
+    """Load tile grid interpolasi (mtime ikut jadi key cache supaya tile baru terbaca)"""
+    header, lats, lons, layers = read_tile(path)
+    return header, lats, lons, layers
+
 df = None
 error_msg = None
 
@@ -272,6 +299,16 @@ if df is not None and len(df) > 0:
         if 'temperature' in df.columns:
             map_hover_data['temperature'] = ':.1f'
         
+        # Layer heatmap dari tile grid interpolasi IDW (output/risk_grid_latest.rrgt)
+        grid_layer = None
+        if os.path.exists(GRID_CONFIG['tile_path']):
+            col_grid, col_layer = st.columns([1, 3])
+            with col_grid:
+                show_grid = st.checkbox("Heatmap interpolasi (IDW)", value=True)
+            if show_grid:
+                with col_layer:
+                    grid_layer = st.selectbox("Layer heatmap:", list(GRID_CONFIG['layers']))
+        
         fig_map = px.scatter_geo(
             df,
             lat='lat',
@@ -298,6 +335,26 @@ if df is not None and len(df) > 0:
             countrycolor="lightgray"
         )
         
+        if grid_layer:
+            header, lats, lons, layers = load_grid(GRID_CONFIG['tile_path'], os.path.getmtime(GRID_CONFIG['tile_path']))
+            grid_lat, grid_lon = np.meshgrid(lats, lons, indexing='ij')
+            values = layers[grid_layer]
+            mask = ~np.isnan(values)
+            fig_map.add_trace(go.Scattergeo(
+                lat=grid_lat[mask],
+                lon=grid_lon[mask],
+                mode='markers',
+                marker=dict(symbol='square', size=5, color=values[mask], colorscale='YlOrRd', opacity=0.45,
+                            colorbar=dict(title=grid_layer, x=1.02)),
+                hovertemplate=f"{grid_layer}: %{{marker.color:.3f}}<extra>IDW</extra>",
+                name=f"Grid {grid_layer}",
+                showlegend=False
+            ))
+            # Grid di bawah titik kota
+            fig_map.data = (fig_map.data[-1],) + fig_map.data[:-1]
+            st.caption(f"Grid {header['nlat']}×{header['nlon']} sel ({header['step']}°), "
+                       f"{header['stations']} kota, run {header['run_id']}")
+        
         st.plotly_chart(fig_map, use_container_width=True)
     
     # TAB 2: Analisis Kota
@@ -532,6 +589,25 @@ if df is not None and len(df) > 0:
         )
         st.plotly_chart(fig_box, use_container_width=True)
         
+        # Agregat history per wilayah (cube, 30 hari terakhir)
+        st.subheader("🏝️ RR per Wilayah (30 Hari Terakhir)")
+        cube = load_cube()
+        since = (pd.Timestamp.now() - pd.Timedelta(days=30)).date()
+        df_region = cube.query('region', start=since, measures='rr_total') if cube.months() else pd.DataFrame()
+        if len(df_region) > 0:
+            fig_region = px.bar(
+                df_region,
+                x='region',
+                y='rr_total_mean',
+                error_y='rr_total_std',
+                hover_data=['records', 'rr_total_min', 'rr_total_max'],
+                title='Rata-rata RR per Wilayah (± std, dari history)',
+                labels={'region': 'Wilayah', 'rr_total_mean': 'RR Rata-rata'}
+            )
+            st.plotly_chart(fig_region, use_container_width=True)
+        else:
+            st.info("Cube history belum tersedia. Jalankan: python src/cube.py build")
+        
         # Statistik deskriptif
         st.subheader("📊 Statistik Deskriptif")
         stats = df['rr_total'].describe()
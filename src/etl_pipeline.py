@@ -1,213 +1,611 @@
 """
 ETL Pipeline Sederhana dengan Metodologi Multiplikatif
 Extract → Transform → Load
+
+pandas (dan modul yang memakainya) baru di-import saat transform/load, supaya proses
+singkat (cron, container) bisa mulai fetch tanpa menunggu import library berat.
 """
 
-import pandas as pd
-import requests
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime
-import json
 import sys
 import os
 
 # Tambahkan path config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config.config import OPENWEATHER_API_KEY, WEATHERAPI_KEY
+from config.config import (
+    OPENWEATHER_API_KEY,
+    WEATHERAPI_KEY,
+    OPENWEATHER_BASE_URL,
+    WEATHERAPI_BASE_URL,
+    OPENWEATHER_POLLUTION_PATH,
+    WEATHERAPI_CURRENT_PATH,
+    RATE_LIMITS,
+    RETRY_CONFIG,
+    EXTRACT_CONFIG,
+    TRANSFORM_CONFIG,
+    DATA_PATHS,
+    HISTORY_CONFIG,
+    DEDUP_CONFIG,
+    GRID_CONFIG,
+    REPORT_CONFIG,
+    VALIDATION_CONFIG,
+    ALERT_CONFIG,
+    PROFILE_CONFIG
+)
 from config.rr_tables import (
     INDONESIAN_CITIES, 
-    calculate_total_rr,
-    RISK_CATEGORIES
+    calculate_total_rr_batch,
+    CATEGORY_LEVELS
 )
+from src.metrics import STAGE_DURATION, RECORDS_LOADED, ACHIEVED_RPS
+from src.providers import SourceStrategy
+from src.rate_limit import ProviderClient, RetryBudget
+from src import fastjson
+
+# Sumber data per kota -> provider API (polusi bisa juga dari WeatherAPI, lihat src/providers.py)
+SOURCES = {'pollution': 'openweather', 'weather': 'weatherapi'}
+
+OUTPUT_FORMATS = ('csv', 'json', 'ndjson', 'both')
+
+# Callback (snapshot terkini, run_id) yang dipanggil setelah load selesai, misal risk API in-process
+LOAD_LISTENERS = []
+
+# Kolom output transform -> key di payload API
+POLLUTANT_KEYS = {'pm2_5': 'pm2_5', 'pm10': 'pm10', 'no2': 'no2', 'so2': 'so2', 'o3': 'o3', 'co': 'co'}
+WEATHER_KEYS = {'temperature': 'temp_c', 'humidity': 'humidity', 'wind_kph': 'wind_kph',
+                'pressure': 'pressure_mb', 'cloud_cover': 'cloud'}
+
+# Epoch observasi provider per sumber (untuk cek data basi, tidak masuk output)
+OBSERVED_COLUMNS = ['pollution_dt', 'weather_dt']
+
+TEXT_COLUMNS = ['timestamp', 'city', 'province']
+NUMERIC_COLUMNS = ['lat', 'lon'] + list(POLLUTANT_KEYS) + list(WEATHER_KEYS) + OBSERVED_COLUMNS
+
+TRANSFORM_COLUMNS = [
+    'timestamp', 'city', 'province', 'lat', 'lon',
+    'pm2_5', 'pm10', 'no2', 'so2', 'o3', 'co',
+    'temperature', 'humidity', 'wind_speed', 'pressure', 'cloud_cover',
+    'rr_total', 'risk_category',
+    'rr_pm2_5', 'rr_pm10', 'rr_no2', 'rr_so2', 'rr_o3',
+    'rr_temperature', 'rr_humidity', 'rr_wind',
+    'temp_category', 'humidity_category', 'wind_category',
+    'rr_version'
+]
+
+
+def categorical_scores(scores):
+    """Kode kategori dari calculate_total_rr_batch(category_codes=True) -> pd.Categorical"""
+    import pandas as pd
+    
+    for column, levels in CATEGORY_LEVELS.items():
+        scores[column] = pd.Categorical.from_codes(scores[column], categories=levels)
+    return scores
+
+
+def score_frame(df):
+    """
+    Hitung ulang RR & kategori dari kolom terukur DataFrame (history, snapshot) dengan
+    tabel RR saat ini
+
+    Returns:
+        dict: kolom skor calculate_total_rr_batch (kategori sebagai pd.Categorical)
+    """
+    return categorical_scores(calculate_total_rr_batch(
+        {'PM2.5': df['pm2_5'].to_numpy(), 'PM10': df['pm10'].to_numpy(), 'NO2': df['no2'].to_numpy(),
+         'SO2': df['so2'].to_numpy(), 'O3': df['o3'].to_numpy(), 'CO': df['co'].to_numpy()},
+        {'temp': df['temperature'].to_numpy(dtype=float), 'humidity': df['humidity'].to_numpy(dtype=float),
+         'wind_speed': df['wind_speed'].to_numpy(dtype=float)},
+        category_codes=True
+    ))
+
+
+def _payload(value):
+    # Payload bisa berupa dict (hasil response.json()) atau teks JSON mentah
+    return fastjson.loads(value) if isinstance(value, (str, bytes)) else value
+
+
+def fill_numeric(record, numeric, i):
+    """
+    Tulis kolom numerik satu record mentah ke numeric[:, i]
+    
+    Args:
+        record: Record hasil extract (pollution/weather berupa dict atau teks JSON)
+        numeric: Array float64 (len(NUMERIC_COLUMNS), n), baris sesuai NUMERIC_COLUMNS
+    
+    Nilai yang tidak ada di payload menjadi NaN (dicek src/validation.py), bukan 0.
+    """
+    pollution = _payload(record['pollution'])['list'][0]
+    components = pollution['components']
+    current = _payload(record['weather'])['current']
+    numeric[:, i] = (
+        record['lat'], record['lon'],
+        *(components.get(key, np.nan) for key in POLLUTANT_KEYS.values()),
+        *(current.get(key, np.nan) for key in WEATHER_KEYS.values()),
+        pollution.get('dt', np.nan), current.get('last_updated_epoch', np.nan)
+    )
+
+
+def validation_columns(numeric):
+    """
+    View kolom hasil parse untuk src/validation.py (satuan sama dengan output transform)
+    
+    Returns:
+        tuple: (dict kolom -> array, dict sumber -> epoch observasi)
+    """
+    columns = dict(zip(NUMERIC_COLUMNS, numeric))
+    columns['wind_speed'] = columns.pop('wind_kph') / 3.6
+    observed = {'pollution': columns.pop('pollution_dt'), 'weather': columns.pop('weather_dt')}
+    return columns, observed
+
+
+def _quarantine_record(record, columns, i, run_id):
+    def raw(value):
+        try:
+            return _payload(value)
+        except Exception:
+            return value.decode('utf-8', 'replace') if isinstance(value, bytes) else value
+    
+    return {
+        'run_id': run_id,
+        'city': record.get('city'),
+        'province': record.get('province'),
+        'timestamp': record.get('timestamp'),
+        'values': {column: None if np.isnan(values[i]) else float(values[i]) for column, values in columns.items()},
+        'pollution': raw(record.get('pollution')),
+        'weather': raw(record.get('weather'))
+    }
+
+
+def build_table(text, numeric, valid):
+    """
+    Gabungkan kolom teks + blok numerik hasil parse, buang record invalid, lalu hitung RR
+    untuk semua record sekaligus
+    
+    Returns:
+        dict: nama kolom -> array (urutan TRANSFORM_COLUMNS)
+    """
+    if not valid.all():
+        text = {column: values[valid] for column, values in text.items()}
+        numeric = numeric[:, valid]
+    columns = dict(zip(NUMERIC_COLUMNS, numeric))
+    columns['wind_speed'] = columns.pop('wind_kph') / 3.6  # Convert to m/s
+    
+    # Hitung Risk Ratio menggunakan model multiplikatif (semua record sekaligus)
+    scores = categorical_scores(calculate_total_rr_batch(
+        {'PM2.5': columns['pm2_5'], 'PM10': columns['pm10'], 'NO2': columns['no2'],
+         'SO2': columns['so2'], 'O3': columns['o3'], 'CO': columns['co']},
+        {'temp': columns['temperature'], 'humidity': columns['humidity'], 'wind_speed': columns['wind_speed']},
+        category_codes=True
+    ))
+    
+    table = {**text, **columns, **scores}
+    return {column: table[column] for column in TRANSFORM_COLUMNS}
 
 
 class SimpleETL:
     """Pipeline ETL sederhana untuk kualitas udara dan risiko ISPA"""
     
-    def __init__(self):
+    def __init__(self, cities=None, openweather_base_url=OPENWEATHER_BASE_URL,
+                 weatherapi_base_url=WEATHERAPI_BASE_URL, pollution_strategy=None, profile=None):
+        """
+        Args:
+            cities: List lokasi {'name', 'lat', 'lon', 'province'} (default: INDONESIAN_CITIES)
+            openweather_base_url: Base URL OpenWeatherMap (bisa diarahkan ke mock server)
+            weatherapi_base_url: Base URL WeatherAPI (bisa diarahkan ke mock server)
+            pollution_strategy: 'separate', 'bundled' atau 'hedged'
+                (default: POLLUTION_SOURCE_CONFIG['strategy'], lihat src/providers.py)
+            profile: 'sampling' atau 'cprofile' untuk mem-profile run() & retry_failed()
+                (default: PROFILE_CONFIG['mode'] jika PROFILE_ENABLED=1, lihat src/profiling.py)
+        """
         self.openweather_key = OPENWEATHER_API_KEY
         self.weatherapi_key = WEATHERAPI_KEY
+        self.cities = cities if cities is not None else INDONESIAN_CITIES
+        self.openweather_base_url = openweather_base_url.rstrip('/')
+        self.weatherapi_base_url = weatherapi_base_url.rstrip('/')
+        self.pollution_url = self.openweather_base_url + OPENWEATHER_POLLUTION_PATH
+        self.weather_url = self.weatherapi_base_url + WEATHERAPI_CURRENT_PATH
         self.data = []
+        self.raw = {}
+        self.run_id = None
+        self.clients = {}
+        self.validation = None
+        self.pollution_strategy = pollution_strategy
+        self.strategy = None
+        self.profile = profile if profile is not None else (PROFILE_CONFIG['mode'] if PROFILE_CONFIG['enabled'] else None)
+    
+    def _profiled(self, name):
+        """Context profiling run (no-op jika profiling tidak aktif)"""
+        if not self.profile:
+            return nullcontext()
+        from src.profiling import profiled
+        return profiled(name, self.profile)
+    
+    def _source_url(self, source, city):
+        if source == 'pollution':
+            return f"{self.pollution_url}?lat={city['lat']}&lon={city['lon']}&appid={self.openweather_key}"
+        return f"{self.weather_url}?key={self.weatherapi_key}&q={city['lat']},{city['lon']}&aqi=yes"
+    
+    def _extract_city(self, name, sources=SOURCES):
+        """
+        Fetch sumber data (polusi/cuaca) untuk satu kota (dijalankan paralel di thread pool)
+        
+        Setiap sumber dicatat terpisah: jika satu gagal, hasil sumber lain tetap disimpan
+        di self.raw sehingga retry_failed() cukup mengambil ulang yang gagal saja. Provider
+        polusi (OpenWeatherMap / blok air_quality WeatherAPI) dipilih oleh self.strategy.
+        """
+        entry = self.raw[name]
+        errors = self.strategy.fetch(entry, sources)
+        
+        missing = [source for source in SOURCES if entry[source] is None]
+        if not missing:
+            print(f"   ✅ {name}, {entry['province']}: data berhasil diambil")
+        elif len(missing) < len(SOURCES):
+            print(f"   ⚠️  {name}: data parsial, error {'; '.join(errors)}")
+        else:
+            print(f"   ❌ {name}: error {'; '.join(errors)}")
+    
+    def _init_clients(self):
+        """Buat client per provider dengan rate limit dan retry budget baru untuk satu run"""
+        self.max_workers = max(1, EXTRACT_CONFIG['max_workers'])
+        self.budget = RetryBudget(RETRY_CONFIG['retry_budget'])
+        self.clients = {
+            provider: ProviderClient(provider, RATE_LIMITS[provider], RETRY_CONFIG, self.budget,
+                                     pool_size=self.max_workers)
+            for provider in SOURCES.values()
+        }
+        self.strategy = SourceStrategy(self.clients, self._source_url, SOURCES, self.pollution_strategy,
+                                       workers=self.max_workers)
+    
+    def _fetch(self, tasks):
+        """Jalankan list (nama kota, sources) secara paralel"""
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                list(executor.map(lambda task: self._extract_city(*task), tasks))
+        finally:
+            self.strategy.close()
+    
+    def _print_throughput(self):
+        print("\n🚦 Throughput API:")
+        for provider, client in self.clients.items():
+            stats = client.summary()
+            ACHIEVED_RPS.set(stats['achieved_rps'] or 0, provider=provider)
+            achieved = f"{stats['achieved_rps']:.2f}" if stats['achieved_rps'] is not None else '-'
+            limit = f"{stats['configured_rps']:.2f}" if stats['configured_rps'] else '∞'
+            print(f"   {provider:12s}: {stats['requests']:3d} request | {achieved} req/s (limit {limit} req/s)"
+                  f" | retry {stats['retries']} | 429: {stats['throttled']} | gagal {stats['failed']}")
+        print(f"   Sisa retry budget: {self.budget.remaining}/{RETRY_CONFIG['retry_budget']}")
+        sources = self.strategy.summary()
+        if sources:
+            print(f"   Sumber polusi ({self.strategy.strategy}): "
+                  + " | ".join(f"{key} {count}" for key, count in sorted(sources.items())))
+    
+    def _complete_records(self):
+        """Record yang kedua sumbernya lengkap, urut sesuai urutan kota"""
+        return [entry for entry in self.raw.values() if all(entry[source] is not None for source in SOURCES)]
+    
+    def failed_pairs(self):
+        """
+        Returns:
+            list: pasangan (nama kota, sumber) yang belum berhasil di-fetch pada run ini
+        """
+        return [(name, source) for name, entry in self.raw.items() for source in SOURCES if entry[source] is None]
+    
+    def _state_path(self, run_id=None):
+        return os.path.join(DATA_PATHS['raw'], f"extract_{run_id or self.run_id}.json")
+    
+    def save_state(self):
+        """Simpan hasil extract (termasuk hasil parsial) supaya bisa dilengkapi proses lain"""
+        path = self._state_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(fastjson.dumps({'run_id': self.run_id, 'cities': self.raw}))
+        os.replace(tmp_path, path)
+        return path
+    
+    def load_state(self, run_id):
+        """Muat hasil extract run sebelumnya dari data/raw/extract_<run_id>.json"""
+        with open(self._state_path(run_id), 'rb') as f:
+            state = fastjson.loads(f.read())
+        self.run_id = state['run_id']
+        self.raw = state['cities']
+        self.data = self._complete_records()
     
     def extract(self):
         """
         STEP 1: EXTRACT
         Mengambil data real-time dari API untuk kota-kota besar Indonesia
+        
+        Request berjalan paralel (EXTRACT_CONFIG['max_workers']) dengan rate limit
+        token bucket per provider dan retry budget bersama untuk satu run.
+        Status per (kota, sumber) disimpan ke data/raw/extract_<run_id>.json.
         """
         print("\n" + "="*70)
         print("📥 STEP 1: EXTRACT DATA")
         print("="*70)
         
-        for city in INDONESIAN_CITIES:
-            try:
-                print(f"\n🌆 Fetching data untuk {city['name']}, {city['province']}...")
-                
-                # 1. Ambil data polusi udara
-                pollution_url = f"http://api.openweathermap.org/data/2.5/air_pollution?lat={city['lat']}&lon={city['lon']}&appid={self.openweather_key}"
-                pollution_response = requests.get(pollution_url, timeout=10)
-                
-                if pollution_response.status_code == 200:
-                    pollution_data = pollution_response.json()
-                    
-                    # 2. Ambil data cuaca
-                    weather_url = f"http://api.weatherapi.com/v1/current.json?key={self.weatherapi_key}&q={city['lat']},{city['lon']}&aqi=yes"
-                    weather_response = requests.get(weather_url, timeout=10)
-                    
-                    if weather_response.status_code == 200:
-                        weather_data = weather_response.json()
-                        
-                        # Simpan data mentah
-                        self.data.append({
-                            'city': city['name'],
-                            'province': city['province'],
-                            'lat': city['lat'],
-                            'lon': city['lon'],
-                            'pollution': pollution_data,
-                            'weather': weather_data,
-                            'timestamp': datetime.now().isoformat()
-                        })
-                        
-                        print(f"   ✅ Data berhasil diambil")
-                    else:
-                        print(f"   ❌ Error cuaca: {weather_response.status_code}")
-                else:
-                    print(f"   ❌ Error polusi: {pollution_response.status_code}")
-                    
-            except Exception as e:
-                print(f"   ❌ Error: {str(e)}")
+        if self.run_id is None:
+            self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._init_clients()
+        
+        for city in self.cities:
+            self.raw[city['name']] = {
+                'city': city['name'],
+                'province': city['province'],
+                'lat': city['lat'],
+                'lon': city['lon'],
+                'pollution': None,
+                'weather': None,
+                'timestamp': datetime.now().isoformat()
+            }
+        
+        print(f"\n🌆 Fetching data untuk {len(self.cities)} kota ({self.max_workers} worker)...")
+        self._fetch([(city['name'], tuple(SOURCES)) for city in self.cities])
+        
+        self.data = self._complete_records()
+        self.save_state()
         
         print(f"\n✅ Extract selesai: {len(self.data)} kota berhasil")
+        failed = self.failed_pairs()
+        if failed:
+            print(f"⚠️  {len(failed)} pasangan (kota, sumber) gagal → bisa dilengkapi dengan retry_failed()")
+        
+        self._print_throughput()
+        
         return self.data
     
-    def transform(self):
+    def retry_failed(self, run_id=None, output_format='both'):
+        """
+        Fetch ulang hanya pasangan (kota, sumber) yang gagal, lalu tulis ulang output run yang sama
+        
+        Args:
+            run_id: Jika diberikan, state dimuat dari data/raw/extract_<run_id>.json
+                    (misal dari proses lain); default: run terakhir objek ini
+            output_format: 'csv', 'json', 'ndjson', atau 'both' (csv + json)
+        
+        Returns:
+            DataFrame hasil run yang sudah dilengkapi, atau None jika tidak ada yang diperbaiki
+        """
+        with self._profiled(lambda: f"{self.run_id}_retry"):
+            return self._retry_failed(run_id, output_format)
+    
+    def _retry_failed(self, run_id, output_format):
+        print("\n" + "="*70)
+        print("🔁 RETRY FAILED FETCHES")
+        print("="*70)
+        
+        if run_id is not None:
+            self.load_state(run_id)
+        
+        pending = {}
+        for name, source in self.failed_pairs():
+            pending.setdefault(name, []).append(source)
+        
+        if not pending:
+            print("\n✅ Tidak ada data yang perlu di-fetch ulang")
+            return None
+        
+        print(f"\n🌆 Fetch ulang {sum(len(v) for v in pending.values())} pasangan dari {len(pending)} kota...")
+        complete_before = len(self._complete_records())
+        self._init_clients()
+        self._fetch([(name, tuple(sources)) for name, sources in pending.items()])
+        self.save_state()
+        self._print_throughput()
+        
+        self.data = self._complete_records()
+        recovered = len(self.data) - complete_before
+        print(f"\n✅ {recovered} kota dilengkapi, sisa gagal: {len(self.failed_pairs())} pasangan")
+        
+        if recovered == 0:
+            return None
+        
+        # Transform ulang & tulis ke file output run yang sama
+        transformed_data = self.transform()
+        if not transformed_data:
+            return None
+        return self.load(transformed_data, output_format)
+    
+    def transform(self, workers=None):
         """
         STEP 2: TRANSFORM
         Membersihkan data dan menghitung Risk Ratio berdasarkan tabel metodologi
+        
+        Nilai ditulis langsung ke array kolom bertipe yang dialokasikan di awal (bukan dict
+        per record), lalu RR dihitung sekaligus dengan calculate_total_rr_batch. Kolom
+        kategori disimpan sebagai kode (pd.Categorical). Data besar (>= parallel_min_records)
+        di-parse paralel di process pool (lihat src/parallel_transform.py).
+        
+        Args:
+            workers: Jumlah proses parse (default: TRANSFORM_CONFIG['workers'])
+        
+        Returns:
+            dict: nama kolom -> array (urutan TRANSFORM_COLUMNS), kosong jika tidak ada record valid
         """
         print("\n" + "="*70)
         print("🔄 STEP 2: TRANSFORM & CALCULATE RISK RATIO")
         print("="*70)
         
-        transformed_data = []
+        n = len(self.data)
+        workers = workers or TRANSFORM_CONFIG['workers']
         
-        for record in self.data:
-            try:
-                city = record['city']
-                print(f"\n🔧 Processing {city}...")
-                
-                # Extract komponen polusi
-                components = record['pollution']['list'][0]['components']
-                pollution = {
-                    'PM2.5': components.get('pm2_5', 0),
-                    'PM10': components.get('pm10', 0),
-                    'NO2': components.get('no2', 0),
-                    'SO2': components.get('so2', 0),
-                    'O3': components.get('o3', 0),
-                    'CO': components.get('co', 0)
-                }
-                
-                # Extract parameter cuaca
-                weather = {
-                    'temp': record['weather']['current']['temp_c'],
-                    'humidity': record['weather']['current']['humidity'],
-                    'wind_speed': record['weather']['current']['wind_kph'] / 3.6,  # Convert to m/s
-                    'pressure': record['weather']['current']['pressure_mb'],
-                    'cloud': record['weather']['current']['cloud']
-                }
-                
-                # Hitung Risk Ratio menggunakan model multiplikatif
-                risk_result = calculate_total_rr(pollution, weather)
-                
-                # Buat record yang sudah ditransformasi
-                transformed_record = {
-                    'timestamp': record['timestamp'],
-                    'city': city,
-                    'province': record['province'],
-                    'lat': record['lat'],
-                    'lon': record['lon'],
-                    
-                    # Data Polusi (µg/m³)
-                    'pm2_5': pollution['PM2.5'],
-                    'pm10': pollution['PM10'],
-                    'no2': pollution['NO2'],
-                    'so2': pollution['SO2'],
-                    'o3': pollution['O3'],
-                    'co': pollution['CO'],
-                    
-                    # Data Cuaca
-                    'temperature': weather['temp'],
-                    'humidity': weather['humidity'],
-                    'wind_speed': weather['wind_speed'],
-                    'pressure': weather['pressure'],
-                    'cloud_cover': weather['cloud'],
-                    
-                    # Risk Ratio
-                    'rr_total': risk_result['rr_total'],
-                    'risk_category': risk_result['category'],
-                    
-                    # Breakdown RR
-                    'rr_pm2_5': risk_result['breakdown']['pollution']['PM2.5'],
-                    'rr_pm10': risk_result['breakdown']['pollution']['PM10'],
-                    'rr_no2': risk_result['breakdown']['pollution']['NO2'],
-                    'rr_so2': risk_result['breakdown']['pollution']['SO2'],
-                    'rr_o3': risk_result['breakdown']['pollution']['O3'],
-                    'rr_temperature': risk_result['breakdown']['weather']['temperature']['rr'],
-                    'rr_humidity': risk_result['breakdown']['weather']['humidity']['rr'],
-                    'rr_wind': risk_result['breakdown']['weather']['wind_speed']['rr'],
-                    
-                    # Kategori Cuaca
-                    'temp_category': risk_result['breakdown']['weather']['temperature']['category'],
-                    'humidity_category': risk_result['breakdown']['weather']['humidity']['category'],
-                    'wind_category': risk_result['breakdown']['weather']['wind_speed']['category']
-                }
-                
-                transformed_data.append(transformed_record)
-                
-                print(f"   📊 PM2.5: {pollution['PM2.5']:.1f} µg/m³")
-                print(f"   🌡️  Suhu: {weather['temp']:.1f}°C ({transformed_record['temp_category']})")
-                print(f"   💧 Kelembapan: {weather['humidity']}% ({transformed_record['humidity_category']})")
-                print(f"   🎯 RR Total: {risk_result['rr_total']:.4f} → {risk_result['category']}")
-                
-            except Exception as e:
-                print(f"   ❌ Error processing {record['city']}: {str(e)}")
+        if workers > 1 and n >= TRANSFORM_CONFIG['parallel_min_records']:
+            from src.parallel_transform import parse_parallel
+            print(f"\n⚙️  Parse paralel: {n:,} records, {workers} proses")
+            numeric, valid, errors = parse_parallel(self.data, workers)
+        else:
+            numeric = np.empty((len(NUMERIC_COLUMNS), n), dtype=np.float64)
+            valid = np.ones(n, dtype=bool)
+            errors = []
+            for i, record in enumerate(self.data):
+                try:
+                    fill_numeric(record, numeric, i)
+                except Exception as e:
+                    valid[i] = False
+                    errors.append((i, str(e)))
+        
+        for i, message in errors[:20]:
+            print(f"   ❌ Error processing {self.data[i].get('city')}: {message}")
+        if len(errors) > 20:
+            print(f"   ❌ ... dan {len(errors) - 20} error lainnya")
+        
+        # Validasi batch (mask vectorized); baris gagal ke output/quarantine/ beserta alasannya
+        if VALIDATION_CONFIG['enabled'] and n > 0:
+            from src.validation import validate, write_quarantine, quarantine_path
+            
+            numeric[:, ~valid] = np.nan
+            columns, observed = validation_columns(numeric)
+            result = validate(columns, [record.get('timestamp') for record in self.data], observed, errors)
+            valid = result.ok
+            self.validation = result.summary()
+            result.print_report()
+            if result.quarantined:
+                run_id = self.run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+                path = quarantine_path(run_id)
+                write_quarantine(path, result, lambda i: _quarantine_record(self.data[i], columns, i, run_id))
+                print(f"   📁 Quarantine: {path}")
+        
+        text = {column: np.empty(n, dtype=object) for column in TEXT_COLUMNS}
+        for i, record in enumerate(self.data):
+            if valid[i]:
+                text['timestamp'][i] = record['timestamp']
+                text['city'][i] = record['city']
+                text['province'][i] = record['province']
         
-        print(f"\n✅ Transform selesai: {len(transformed_data)} records")
-        return transformed_data
+        table = build_table(text, numeric, valid)
+        
+        if len(table['city']) <= TRANSFORM_CONFIG['verbose_max_records']:
+            for i in range(len(table['city'])):
+                print(f"\n🔧 {table['city'][i]}")
+                print(f"   📊 PM2.5: {table['pm2_5'][i]:.1f} µg/m³")
+                print(f"   🌡️  Suhu: {table['temperature'][i]:.1f}°C ({table['temp_category'][i]})")
+                print(f"   💧 Kelembapan: {table['humidity'][i]:g}% ({table['humidity_category'][i]})")
+                print(f"   🎯 RR Total: {table['rr_total'][i]:.4f} → {table['risk_category'][i]}")
+        
+        print(f"\n✅ Transform selesai: {len(table['city'])} records")
+        return table if len(table['city']) else {}
+    
     
     def load(self, transformed_data, output_format='both'):
         """
         STEP 3: LOAD
         Menyimpan data hasil transformasi ke CSV dan JSON
         
+        Dengan DEDUP_CONFIG['enabled'], hanya kota yang nilai terukurnya berubah sejak
+        observasi terakhir yang ditulis (output & history); kota lain dicatat di
+        output/manifest_<run_id>.json dan snapshot lengkap ada di output/risk_latest.csv.
+        
         Args:
-            transformed_data: List of dict hasil transform
-            output_format: 'csv', 'json', atau 'both'
+            transformed_data: Dict kolom hasil transform (list of dict juga diterima)
+            output_format: 'csv', 'json', 'ndjson', atau 'both' (csv + json)
         """
         print("\n" + "="*70)
         print("💾 STEP 3: LOAD DATA")
         print("="*70)
         
+        import pandas as pd
+        from src.history_store import HistoryStore
+        from src.change_detection import ChangeDetector, write_manifest
+        from src.interpolation import write_latest_grid
+        
         # Buat folder output jika belum ada
         os.makedirs('output', exist_ok=True)
         
-        # Convert ke DataFrame
-        df = pd.DataFrame(transformed_data)
+        # Convert ke DataFrame (langsung dari array kolom, tanpa dict per record)
+        df = pd.DataFrame(transformed_data, copy=False)
+        
+        # Nama file memakai run_id supaya retry_failed() menulis ulang output run yang sama
+        timestamp = self.run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        
+        # Deteksi perubahan: hanya kota yang nilai terukurnya berubah yang ditulis
+        written = df
+        changed = np.ones(len(df), dtype=bool)
+        if DEDUP_CONFIG['enabled']:
+            detector = ChangeDetector()
+            prints, changed, in_run = detector.detect(df, timestamp)
+            written = df[in_run]
+            print(f"\n🔍 Berubah: {int(changed.sum())} kota | tidak berubah: {int((~in_run).sum())} kota")
+        
+        files = []
+        if len(written) > 0:
+            # Save ke CSV
+            if output_format in ['csv', 'both']:
+                csv_path = f'output/risk_analysis_{timestamp}.csv'
+                written.to_csv(csv_path, index=False)
+                files.append(csv_path)
+                print(f"\n✅ CSV saved: {csv_path}")
+                print(f"   📄 {len(written)} rows × {len(written.columns)} columns")
+            
+            # Save ke JSON
+            if output_format in ['json', 'both']:
+                json_path = f'output/risk_analysis_{timestamp}.json'
+                fastjson.write_records(written, json_path)
+                files.append(json_path)
+                print(f"\n✅ JSON saved: {json_path}")
+            
+            # Save ke NDJSON (satu record per baris, bisa dibaca streaming)
+            if output_format == 'ndjson':
+                ndjson_path = f'output/risk_analysis_{timestamp}.ndjson'
+                fastjson.write_records(written, ndjson_path, lines=True)
+                files.append(ndjson_path)
+                print(f"\n✅ NDJSON saved: {ndjson_path}")
+        else:
+            print("\n⏭️  Tidak ada kota yang berubah, file output tidak ditulis")
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Tambahkan ke history store (partisi per bulan), hanya observasi baru
+        if HISTORY_CONFIG['enabled'] and changed.any():
+            store = HistoryStore()
+            store.append(df[changed], source='live')
+            print(f"\n✅ History updated: {store.root}")
         
-        # Save ke CSV
-        if output_format in ['csv', 'both']:
-            csv_path = f'output/risk_analysis_{timestamp}.csv'
-            df.to_csv(csv_path, index=False)
-            print(f"\n✅ CSV saved: {csv_path}")
-            print(f"   📄 {len(df)} rows × {len(df.columns)} columns")
+        if DEDUP_CONFIG['enabled']:
+            unchanged = df.loc[~in_run, 'city'].tolist()
+            last_seen = detector.last_seen(unchanged)
+            detector.update(df[changed], prints[changed], timestamp)
+            manifest_path = f'output/manifest_{timestamp}.json'
+            write_manifest(manifest_path, timestamp, written['city'].tolist(), unchanged, files, last_seen)
+            print(f"\n✅ Manifest saved: {manifest_path} (snapshot terkini: {detector.path})")
         
-        # Save ke JSON
-        if output_format in ['json', 'both']:
-            json_path = f'output/risk_analysis_{timestamp}.json'
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(transformed_data, f, indent=2, ensure_ascii=False)
-            print(f"\n✅ JSON saved: {json_path}")
+        # Snapshot lengkap (termasuk kota yang tidak berubah) untuk grid & konsumen in-process
+        latest = detector.latest if DEDUP_CONFIG['enabled'] else df
+        
+        # Interpolasi IDW ke grid peta (matriks bobot di-cache, tiap run hanya perkalian matriks)
+        if GRID_CONFIG['enabled'] and len(latest) > 0:
+            try:
+                with STAGE_DURATION.time(stage='interpolate'):
+                    tile_path = write_latest_grid(latest, timestamp)
+                print(f"\n✅ Grid interpolasi saved: {tile_path}")
+            except Exception as e:
+                print(f"\n⚠️  Grid interpolasi gagal: {str(e)}")
+        
+        # Laporan statis HTML/JSON (dibuat sekali per run, disajikan sebagai file biasa)
+        if REPORT_CONFIG['enabled'] and len(latest) > 0:
+            try:
+                from src.report import write_report
+                with STAGE_DURATION.time(stage='report'):
+                    report_path = write_report(latest, timestamp)
+                print(f"\n✅ Laporan statis saved: {report_path}")
+            except Exception as e:
+                print(f"\n⚠️  Laporan statis gagal: {str(e)}")
+        
+        for listener in LOAD_LISTENERS:
+            try:
+                listener(latest, timestamp)
+            except Exception as e:
+                print(f"\n⚠️  Load listener gagal: {str(e)}")
+        
+        # Alert per kota (state ringkas, O(kota)); webhook dikirim thread background
+        if ALERT_CONFIG['enabled'] and len(latest) > 0:
+            try:
+                from src.alerts import notify, print_alerts
+                alerts = notify(latest, timestamp)
+                print(f"\n🔔 Alert: {len(alerts)} event")
+                print_alerts(alerts)
+            except Exception as e:
+                print(f"\n⚠️  Evaluasi alert gagal: {str(e)}")
         
         # Summary statistik
         print("\n" + "="*70)
@@ -219,6 +617,7 @@ class SimpleETL:
         
         print("\n🎯 Risk Category Distribution:")
         risk_dist = df['risk_category'].value_counts()
+        risk_dist = risk_dist[risk_dist > 0]  # kategori kosong ikut terhitung pada kolom Categorical
         for category, count in risk_dist.items():
             percentage = (count / len(df)) * 100
             print(f"   {category:15s}: {count:2d} kota ({percentage:5.1f}%)")
@@ -243,31 +642,41 @@ class SimpleETL:
         Menjalankan full ETL pipeline
         
         Args:
-            output_format: 'csv', 'json', atau 'both'
+            output_format: 'csv', 'json', 'ndjson', atau 'both' (csv + json)
         """
+        with self._profiled(lambda: self.run_id):
+            return self._run(output_format)
+    
+    def _run(self, output_format):
         print("\n" + "="*70)
         print("🚀 MEMULAI ETL PIPELINE")
         print("="*70)
-        print(f"📍 Target: {len(INDONESIAN_CITIES)} kota besar di Indonesia")
+        print(f"📍 Target: {len(self.cities)} kota besar di Indonesia")
         print(f"📊 Metodologi: Model Multiplikatif Risk Ratio")
         print("="*70)
         
+        self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        
         # Extract
-        raw_data = self.extract()
+        with STAGE_DURATION.time(stage='extract'):
+            raw_data = self.extract()
         
         if not raw_data:
             print("\n❌ Tidak ada data yang berhasil di-extract!")
             return None
         
         # Transform
-        transformed_data = self.transform()
+        with STAGE_DURATION.time(stage='transform'):
+            transformed_data = self.transform()
         
         if not transformed_data:
             print("\n❌ Transform gagal!")
             return None
         
         # Load
-        df = self.load(transformed_data, output_format)
+        with STAGE_DURATION.time(stage='load'):
+            df = self.load(transformed_data, output_format)
+        RECORDS_LOADED.set(len(df))
         
         print("\n" + "="*70)
         print("✅ ETL PIPELINE SELESAI!")
@@ -276,11 +685,30 @@ class SimpleETL:
         return df
 
 
-if __name__ == "__main__":
+def main(argv=None):
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='ETL Pipeline Risk Ratio ISPA')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='both',
+                        help="Format output (default: both = csv + json)")
+    parser.add_argument('--retry-failed', metavar='RUN_ID',
+                        help='Fetch ulang hanya kota/sumber yang gagal pada run RUN_ID (YYYYMMDD_HHMMSS)')
+    parser.add_argument('--profile', nargs='?', const=PROFILE_CONFIG['mode'], choices=('sampling', 'cprofile'),
+                        help='Profile run ke output/profiles/ (default mode: PROFILE_MODE / sampling)')
+    args = parser.parse_args(argv)
+    
     # Jalankan pipeline
-    etl = SimpleETL()
-    result = etl.run(output_format='both')
+    etl = SimpleETL(profile=args.profile)
+    if args.retry_failed:
+        result = etl.retry_failed(run_id=args.retry_failed, output_format=args.format)
+    else:
+        result = etl.run(output_format=args.format)
     
     if result is not None:
         print("\n🎉 Pipeline berhasil dijalankan!")
         print(f"📁 Hasil tersimpan di folder 'output/'")
+    return 0 if result is not None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Backend JSON: orjson jika terpasang (opsional, pip install orjson), fallback ke stdlib json
+Dipakai untuk parse payload API, file state extract, dan output JSON/NDJSON
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - tergantung environment
+    orjson = None
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+
+def loads(data):
+    """Parse JSON dari bytes/str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj):
+    """Serialize ke bytes JSON compact (UTF-8, tanpa escape non-ASCII)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _column_values(series):
+    # NaN -> null (stdlib json menulis NaN yang bukan JSON valid)
+    if series.dtype.kind == 'f' and series.isna().any():
+        return [None if value != value else value for value in series.tolist()]
+    return series.tolist()
+
+
+def _rows(df):
+    # Nilai Python (float shortest repr, kategori -> str), dict per baris dibuat bergiliran
+    names = list(df.columns)
+    columns = [_column_values(df[name]) for name in names]
+    return (dict(zip(names, values)) for values in zip(*columns))
+
+
+def to_records(df):
+    """List dict per baris dengan nilai Python (NaN -> None), siap untuk dumps()"""
+    return list(_rows(df))
+
+
+def write_records(df, path, lines=False):
+    """
+    Tulis DataFrame sebagai array JSON (indent 2) atau NDJSON (satu record compact per baris)
+
+    NDJSON ditulis baris per baris sehingga tidak perlu menyimpan seluruh output di memori.
+    """
+    if lines:
+        with open(path, 'wb') as f:
+            f.writelines(dumps(row) + b'\n' for row in _rows(df))
+    elif orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(list(_rows(df)), option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(list(_rows(df)), f, indent=2, ensure_ascii=False)
+
+
+def read_records(path):
+    """Baca NDJSON per baris (streaming, tidak memuat seluruh file sekaligus)"""
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                yield loads(line)
@@ -0,0 +1,311 @@
+"""
+Forecast risiko ISPA per jam (24-72 jam ke depan)
+Satu request forecast per kota per provider → skor semua (kota × jam) sekaligus
+dengan calculate_total_rr_batch → tabel risiko ke depan
+
+Contoh:
+    python src/forecast.py
+    python src/forecast.py --hours 24 --cities Jakarta,Bandung
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Tambahkan path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import (
+    OPENWEATHER_BASE_URL,
+    WEATHERAPI_BASE_URL,
+    OPENWEATHER_POLLUTION_FORECAST_PATH,
+    WEATHERAPI_FORECAST_PATH,
+    DATA_PATHS,
+    FORECAST_CONFIG,
+    VALIDATION_CONFIG
+)
+from config.rr_tables import INDONESIAN_CITIES, calculate_total_rr_batch
+from src.etl_pipeline import SimpleETL, categorical_scores, OUTPUT_FORMATS
+from src.metrics import STAGE_DURATION
+from src import fastjson
+
+POLLUTANTS = ['pm2_5', 'pm10', 'no2', 'so2', 'o3', 'co']
+WEATHER_FIELDS = {'temperature': 'temp_c', 'humidity': 'humidity', 'wind_kph': 'wind_kph',
+                  'pressure': 'pressure_mb', 'cloud_cover': 'cloud'}
+
+FORECAST_COLUMNS = [
+    'forecast_time', 'lead_hours', 'city', 'province', 'lat', 'lon',
+    'pm2_5', 'pm10', 'no2', 'so2', 'o3', 'co',
+    'temperature', 'humidity', 'wind_speed', 'pressure', 'cloud_cover',
+    'rr_total', 'risk_category',
+    'rr_pm2_5', 'rr_pm10', 'rr_no2', 'rr_so2', 'rr_o3',
+    'rr_temperature', 'rr_humidity', 'rr_wind',
+    'temp_category', 'humidity_category', 'wind_category',
+    'rr_version', 'issued_at'
+]
+
+
+class ForecastETL(SimpleETL):
+    """
+    Pipeline forecast: extract paralel (rate limit, retry, retry_failed) sama dengan SimpleETL,
+    hanya endpoint, transform dan output yang berbeda
+
+    Args:
+        hours: Jumlah jam forecast ke depan (default: FORECAST_CONFIG['hours'])
+    """
+
+    def __init__(self, cities=None, hours=None, openweather_base_url=OPENWEATHER_BASE_URL,
+                 weatherapi_base_url=WEATHERAPI_BASE_URL):
+        super().__init__(cities, openweather_base_url, weatherapi_base_url)
+        self.hours = hours or FORECAST_CONFIG['hours']
+        if self.hours < 1:
+            raise ValueError("hours minimal 1")
+        self.pollution_url = self.openweather_base_url + OPENWEATHER_POLLUTION_FORECAST_PATH
+        self.weather_url = self.weatherapi_base_url + WEATHERAPI_FORECAST_PATH
+
+    def _forecast_days(self):
+        # WeatherAPI menghitung hari mulai hari ini (waktu lokal), jam sekarang ikut terpakai
+        days = math.ceil((datetime.now().hour + self.hours) / 24)
+        return max(1, min(FORECAST_CONFIG['max_days'], days))
+
+    def _source_url(self, source, city):
+        if source == 'pollution':
+            return f"{self.pollution_url}?lat={city['lat']}&lon={city['lon']}&appid={self.openweather_key}"
+        return (f"{self.weather_url}?key={self.weatherapi_key}&q={city['lat']},{city['lon']}"
+                f"&days={self._forecast_days()}&aqi=no&alerts=no")
+
+    def _state_path(self, run_id=None):
+        return os.path.join(DATA_PATHS['raw'], f"forecast_{run_id or self.run_id}.json")
+
+    def transform(self):
+        """
+        STEP 2: TRANSFORM
+        Gabungkan jam forecast polusi & cuaca per kota, lalu hitung RR untuk semua
+        (kota × jam) dalam satu panggilan batch
+
+        Returns:
+            dict: kolom FORECAST_COLUMNS -> array (kosong jika tidak ada jam yang cocok)
+        """
+        print("\n" + "="*70)
+        print("🔄 STEP 2: TRANSFORM & CALCULATE RISK RATIO (FORECAST)")
+        print("="*70)
+
+        now = int(time.time())
+        first_hour = now - now % 3600
+        last_hour = first_hour + self.hours * 3600
+
+        rows = {column: [] for column in ['dt', 'city', 'province', 'lat', 'lon'] + POLLUTANTS + list(WEATHER_FIELDS)}
+
+        for record in self.data:
+            try:
+                weather_hours = {
+                    hour['time_epoch'] - hour['time_epoch'] % 3600: hour
+                    for day in record['weather']['forecast']['forecastday']
+                    for hour in day['hour']
+                }
+                matched = 0
+                for item in record['pollution']['list']:
+                    dt = item['dt']
+                    weather = weather_hours.get(dt)
+                    if weather is None or not first_hour <= dt < last_hour:
+                        continue
+                    rows['dt'].append(dt)
+                    rows['city'].append(record['city'])
+                    rows['province'].append(record['province'])
+                    rows['lat'].append(record['lat'])
+                    rows['lon'].append(record['lon'])
+                    for key in POLLUTANTS:
+                        rows[key].append(item['components'].get(key, np.nan))
+                    for column, key in WEATHER_FIELDS.items():
+                        rows[column].append(weather.get(key, np.nan))
+                    matched += 1
+                print(f"   🔧 {record['city']}: {matched} jam forecast")
+            except Exception as e:
+                print(f"   ❌ Error processing {record['city']}: {str(e)}")
+
+        if not rows['dt']:
+            print("\n❌ Tidak ada jam forecast yang cocok antara polusi & cuaca")
+            return {}
+
+        dt = np.array(rows['dt'], dtype=np.int64)
+        text = {key: np.array(rows[key]) for key in ['city', 'province']}
+        columns = {key: np.array(rows[key], dtype=float) for key in ['lat', 'lon'] + POLLUTANTS + list(WEATHER_FIELDS)}
+        columns['wind_speed'] = columns.pop('wind_kph') / 3.6  # Convert to m/s
+
+        # Validasi sama dengan SimpleETL.transform (wajib + rentang fisik); cek waktu dilewati
+        # karena jam forecast memang di depan. Baris gagal ke output/quarantine/quarantine_forecast_<run_id>.ndjson
+        if VALIDATION_CONFIG['enabled']:
+            from src.validation import validate, write_quarantine, quarantine_path
+
+            result = validate(columns)
+            self.validation = result.summary()
+            result.print_report()
+            if result.quarantined:
+                run_id = self.run_id or datetime.fromtimestamp(now).strftime("%Y%m%d_%H%M%S")
+                path = quarantine_path(f"forecast_{run_id}")
+                write_quarantine(path, result, lambda i: {
+                    'run_id': run_id,
+                    'city': text['city'][i],
+                    'province': text['province'][i],
+                    'forecast_time': datetime.fromtimestamp(dt[i]).isoformat(),
+                    'values': {column: None if np.isnan(values[i]) else float(values[i])
+                               for column, values in columns.items()}
+                })
+                print(f"   📁 Quarantine: {path}")
+
+                dt = dt[result.ok]
+                text = {key: values[result.ok] for key, values in text.items()}
+                columns = {key: values[result.ok] for key, values in columns.items()}
+                if not len(dt):
+                    print("\n❌ Semua jam forecast gagal validasi")
+                    return {}
+
+        # Satu panggilan batch untuk semua (kota × jam)
+        scores = categorical_scores(calculate_total_rr_batch(
+            {'PM2.5': columns['pm2_5'], 'PM10': columns['pm10'], 'NO2': columns['no2'],
+             'SO2': columns['so2'], 'O3': columns['o3'], 'CO': columns['co']},
+            {'temp': columns['temperature'], 'humidity': columns['humidity'], 'wind_speed': columns['wind_speed']},
+            category_codes=True
+        ))
+
+        table = {
+            'forecast_time': np.array([datetime.fromtimestamp(t).isoformat() for t in dt]),
+            'lead_hours': (dt - first_hour) // 3600,
+            **text,
+            **columns,
+            **scores,
+            'issued_at': np.full(len(dt), datetime.fromtimestamp(now).isoformat())
+        }
+        table = {column: table[column] for column in FORECAST_COLUMNS}
+
+        print(f"\n✅ Transform selesai: {len(dt)} records ({len(self.data)} kota × ≤{self.hours} jam)")
+        return table
+
+    def load(self, transformed_data, output_format='both'):
+        """
+        STEP 3: LOAD
+        Simpan tabel risiko ke depan ke output/risk_forecast_<run_id>.csv/json/ndjson
+
+        Args:
+            transformed_data: Dict kolom hasil transform
+            output_format: 'csv', 'json', 'ndjson', atau 'both' (csv + json)
+        """
+        print("\n" + "="*70)
+        print("💾 STEP 3: LOAD DATA (FORECAST)")
+        print("="*70)
+
+        os.makedirs('output', exist_ok=True)
+        df = pd.DataFrame(transformed_data, copy=False)
+        timestamp = self.run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        if output_format in ['csv', 'both']:
+            csv_path = f'output/risk_forecast_{timestamp}.csv'
+            df.to_csv(csv_path, index=False)
+            print(f"\n✅ CSV saved: {csv_path}")
+            print(f"   📄 {len(df)} rows × {len(df.columns)} columns")
+
+        if output_format in ['json', 'both']:
+            json_path = f'output/risk_forecast_{timestamp}.json'
+            fastjson.write_records(df, json_path)
+            print(f"\n✅ JSON saved: {json_path}")
+
+        if output_format == 'ndjson':
+            ndjson_path = f'output/risk_forecast_{timestamp}.ndjson'
+            fastjson.write_records(df, ndjson_path, lines=True)
+            print(f"\n✅ NDJSON saved: {ndjson_path}")
+
+        print("\n" + "="*70)
+        print("📊 FORECAST SUMMARY")
+        print("="*70)
+
+        print(f"\n🌆 Total Kota: {df['city'].nunique()} | Jam forecast: {df['lead_hours'].max() + 1}")
+        print(f"📅 Diterbitkan: {df['issued_at'].iloc[0]}")
+
+        print("\n🎯 Risk Category Distribution (kota × jam):")
+        risk_dist = df['risk_category'].value_counts()
+        for category, count in risk_dist[risk_dist > 0].items():
+            print(f"   {category:15s}: {count:5d} ({count / len(df) * 100:5.1f}%)")
+
+        print("\n🏙️ Top 5 Kota dengan Puncak RR Tertinggi:")
+        peaks = df.loc[df.groupby('city')['rr_total'].idxmax()].nlargest(5, 'rr_total')
+        for _, row in peaks.iterrows():
+            print(f"   {row['city']:15s}: {row['rr_total']:.4f} - {row['risk_category']} "
+                  f"pada {row['forecast_time']} (+{row['lead_hours']} jam)")
+
+        print("\n" + "="*70)
+
+        return df
+
+    def run(self, output_format='both'):
+        """
+        Menjalankan pipeline forecast (extract → transform → load)
+
+        Args:
+            output_format: 'csv', 'json', 'ndjson', atau 'both' (csv + json)
+        """
+        print("\n" + "="*70)
+        print("🔮 MEMULAI FORECAST PIPELINE")
+        print("="*70)
+        print(f"📍 Target: {len(self.cities)} kota × {self.hours} jam ke depan")
+        print("="*70)
+
+        self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        with STAGE_DURATION.time(stage='forecast_extract'):
+            raw_data = self.extract()
+
+        if not raw_data:
+            print("\n❌ Tidak ada data forecast yang berhasil di-extract!")
+            return None
+
+        with STAGE_DURATION.time(stage='forecast_transform'):
+            table = self.transform()
+
+        if not table:
+            print("\n❌ Transform gagal!")
+            return None
+
+        with STAGE_DURATION.time(stage='forecast_load'):
+            df = self.load(table, output_format)
+
+        print("\n" + "="*70)
+        print("✅ FORECAST PIPELINE SELESAI!")
+        print("="*70)
+
+        return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Forecast risiko ISPA per jam')
+    parser.add_argument('--hours', type=int, default=FORECAST_CONFIG['hours'], help='Jumlah jam ke depan (24-72)')
+    parser.add_argument('--cities', help='Nama kota dipisah koma (default: semua INDONESIAN_CITIES)')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='both',
+                        help="Format output (default: both = csv + json)")
+    parser.add_argument('--retry-failed', metavar='RUN_ID',
+                        help='Fetch ulang hanya kota/sumber yang gagal pada run forecast RUN_ID')
+    args = parser.parse_args(argv)
+
+    cities = INDONESIAN_CITIES
+    if args.cities:
+        names = {name.strip() for name in args.cities.split(',')}
+        cities = [city for city in INDONESIAN_CITIES if city['name'] in names]
+        unknown = names - {city['name'] for city in cities}
+        if unknown:
+            parser.error(f"Kota tidak dikenal: {sorted(unknown)}")
+
+    forecast = ForecastETL(cities=cities, hours=args.hours)
+    if args.retry_failed:
+        result = forecast.retry_failed(run_id=args.retry_failed, output_format=args.format)
+    else:
+        result = forecast.run(output_format=args.format)
+    sys.exit(0 if result is not None else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+History store: riwayat hasil transform dalam partisi CSV per bulan
+data/history/YYYY-MM.csv (append saat load/backfill, ditulis ulang oleh src/maintenance.py)
+
+data/history/_rr_versions.json mencatat versi tabel RR (kolom rr_version) yang ada di
+setiap partisi, supaya src/recompute.py hanya membaca partisi yang berisi versi lama.
+data/history/_cube/ berisi agregat per partisi (src/cube.py), diperbarui bersama partisinya.
+"""
+
+import glob
+import json
+import os
+import sys
+import threading
+
+import pandas as pd
+
+# Tambahkan path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import DATA_PATHS, CUBE_CONFIG
+
+# Skema kolom (urutan sama dengan output SimpleETL.transform) + asal data
+HISTORY_COLUMNS = [
+    'timestamp', 'city', 'province', 'lat', 'lon',
+    'pm2_5', 'pm10', 'no2', 'so2', 'o3', 'co',
+    'temperature', 'humidity', 'wind_speed', 'pressure', 'cloud_cover',
+    'rr_total', 'risk_category',
+    'rr_pm2_5', 'rr_pm10', 'rr_no2', 'rr_so2', 'rr_o3',
+    'rr_temperature', 'rr_humidity', 'rr_wind',
+    'temp_category', 'humidity_category', 'wind_category',
+    'rr_version', 'source'
+]
+
+VERSIONS_FILE = '_rr_versions.json'
+
+
+def _row_versions(df):
+    # '' = record tanpa versi (ditulis sebelum tabel RR diberi versi)
+    if 'rr_version' not in df.columns:
+        return {''}
+    return set(df['rr_version'].fillna('').astype(str).unique())
+
+
+class HistoryStore:
+    """
+    Penyimpanan riwayat time-partitioned (satu file CSV per bulan)
+
+    Args:
+        root: Folder partisi (default: DATA_PATHS['history'])
+    """
+
+    def __init__(self, root=None):
+        self.root = str(root or DATA_PATHS['history'])
+        self._lock = threading.Lock()
+        self._schema_checked = set()
+        self.cube = None
+        if CUBE_CONFIG['enabled']:
+            from src.cube import RiskCube
+            self.cube = RiskCube(self.root)
+
+    def partition_path(self, month):
+        return os.path.join(self.root, f"{month}.csv")
+
+    def partitions(self, start=None, end=None):
+        """
+        List file partisi yang overlap dengan rentang [start, end]
+
+        Returns:
+            list: path partisi, urut berdasarkan bulan
+        """
+        paths = sorted(glob.glob(os.path.join(self.root, '[0-9][0-9][0-9][0-9]-[0-9][0-9].csv')))
+        start_month = pd.Timestamp(start).strftime('%Y-%m') if start is not None else None
+        end_month = pd.Timestamp(end).strftime('%Y-%m') if end is not None else None
+        selected = []
+        for path in paths:
+            month = os.path.basename(path)[:-4]
+            if start_month and month < start_month:
+                continue
+            if end_month and month > end_month:
+                continue
+            selected.append(path)
+        return selected
+
+    def months(self):
+        """
+        Returns:
+            list: bulan ('YYYY-MM') yang punya partisi, urut
+        """
+        return [os.path.basename(path)[:-4] for path in self.partitions()]
+
+    def read_partition(self, month):
+        """Isi mentah satu partisi (tanpa filter & dedupe)"""
+        return pd.read_csv(self.partition_path(month))
+
+    def write_partition(self, month, df):
+        """Tulis ulang satu partisi secara atomik (dipakai compaction/downsampling/recompute)"""
+        df = df.reindex(columns=HISTORY_COLUMNS)
+        path = self.partition_path(month)
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            tmp_path = path + '.tmp'
+            df.to_csv(tmp_path, index=False)
+            os.replace(tmp_path, path)
+            self._schema_checked.add(path)
+            self._update_versions({month: _row_versions(df)}, replace=True)
+            self._update_cube(month, lambda: self.cube.rebuild_month(month, df))
+
+    def remove_partition(self, month):
+        with self._lock:
+            os.remove(self.partition_path(month))
+            self._update_versions({month: None})
+            self._update_cube(month, lambda: self.cube.remove_month(month))
+
+    def versions(self):
+        """
+        Returns:
+            dict: bulan -> list rr_version yang ada di partisi ('' = record tanpa versi).
+                Partisi yang tidak tercatat (ditulis sebelum ada catatan versi) belum diketahui isinya.
+        """
+        try:
+            with open(os.path.join(self.root, VERSIONS_FILE), encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def set_versions(self, month, versions):
+        """Catat isi versi partisi setelah diperiksa penuh (mis. oleh recompute)"""
+        with self._lock:
+            self._update_versions({month: set(versions)}, replace=True)
+
+    def _update_versions(self, updates, replace=False):
+        # Dipanggil dengan self._lock sudah dipegang
+        versions = self.versions()
+        for month, found in updates.items():
+            if found is None:
+                versions.pop(month, None)
+            else:
+                versions[month] = sorted(set(found) if replace else set(versions.get(month, [])) | set(found))
+        path = os.path.join(self.root, VERSIONS_FILE)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(versions, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def _update_cube(self, month, action):
+        # Dipanggil dengan self._lock sudah dipegang. Cube hanya turunan partisi: jika gagal,
+        # cube bulan itu dihapus (bukan dibiarkan basi) dan tulis history tetap berhasil
+        if self.cube is None:
+            return
+        try:
+            action()
+        except Exception as e:
+            self.cube.remove_month(month)
+            print(f"⚠️  Cube {month} gagal diperbarui ({str(e)}), jalankan python src/cube.py build")
+
+    def _ensure_schema(self, path):
+        """
+        Partisi dengan header lama (mis. sebelum kolom rr_version) ditulis ulang ke skema
+        HISTORY_COLUMNS sebelum di-append, supaya kolom baris baru tetap sejajar
+        """
+        if path in self._schema_checked or not os.path.exists(path):
+            return
+        with open(path, encoding='utf-8') as f:
+            header = f.readline().rstrip('\r\n')
+        if header != ','.join(HISTORY_COLUMNS):
+            tmp_path = path + '.tmp'
+            pd.read_csv(path).reindex(columns=HISTORY_COLUMNS).to_csv(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        self._schema_checked.add(path)
+
+    def append(self, df, source='live'):
+        """
+        Tambahkan record ke partisi bulanannya
+
+        Args:
+            df: DataFrame dengan kolom HISTORY_COLUMNS (kolom yang tidak ada diisi kosong)
+            source: Asal data ('live', 'backfill', ...) jika df belum punya kolom 'source'
+
+        Returns:
+            int: jumlah record yang ditulis
+        """
+        if df is None or len(df) == 0:
+            return 0
+        df = df.copy()
+        if 'source' not in df.columns:
+            df['source'] = source
+        df = df.reindex(columns=HISTORY_COLUMNS)
+        months = pd.to_datetime(df['timestamp'], format='ISO8601').dt.strftime('%Y-%m')
+
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            recorded = self.versions()
+            updates = {}
+            for month, part in df.groupby(months, sort=True):
+                path = self.partition_path(month)
+                exists = os.path.exists(path)
+                self._ensure_schema(path)
+                part.to_csv(path, mode='a', header=not exists, index=False)
+                self._update_cube(month, lambda: self.cube.update(month, part, path if exists else None))
+                # Partisi lama yang belum tercatat tetap "belum diketahui" sampai diperiksa penuh
+                if month in recorded or not exists:
+                    updates[month] = _row_versions(part)
+            if updates:
+                self._update_versions(updates)
+        return len(df)
+
+    def read(self, start=None, end=None, cities=None, columns=None, dedupe=True):
+        """
+        Baca riwayat dalam rentang waktu
+
+        Args:
+            start, end: Batas waktu inklusif (string/datetime, opsional)
+            cities: List nama kota (opsional)
+            columns: Subset kolom (opsional; timestamp & city selalu ikut)
+            dedupe: Buang duplikat (city, timestamp), simpan yang terakhir ditulis
+
+        Returns:
+            DataFrame: riwayat urut (timestamp, city)
+        """
+        usecols = None
+        if columns is not None:
+            usecols = list(dict.fromkeys(['timestamp', 'city'] + list(columns)))
+
+        frames = [pd.read_csv(path, usecols=usecols) for path in self.partitions(start, end)]
+        if not frames:
+            return pd.DataFrame(columns=usecols or HISTORY_COLUMNS)
+
+        df = pd.concat(frames, ignore_index=True)
+        ts = pd.to_datetime(df['timestamp'], format='ISO8601')
+        mask = pd.Series(True, index=df.index)
+        if start is not None:
+            mask &= ts >= pd.Timestamp(start)
+        if end is not None:
+            mask &= ts <= pd.Timestamp(end)
+        if cities is not None:
+            mask &= df['city'].isin(cities)
+        df = df[mask]
+
+        if dedupe:
+            df = df.drop_duplicates(subset=['city', 'timestamp'], keep='last')
+        return df.sort_values(['timestamp', 'city']).reset_index(drop=True)
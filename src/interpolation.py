@@ -0,0 +1,206 @@
+"""
+Interpolasi spasial skor per kota ke grid rapat (inverse distance weighting)
+
+Posisi kota tetap, jadi matriks bobot IDW (sel grid × kota) dihitung sekali lalu
+di-cache di memori dan di data/processed/idw_weights_<key>.npy; setiap run hanya
+perkalian matriks. Kota yang tidak punya nilai pada run ini (NaN) dikeluarkan dengan
+normalisasi ulang bobot, tanpa menghitung ulang matriks.
+
+Hasil disimpan sebagai tile biner (.rrgt) yang bisa dibaca cepat oleh dashboard:
+    b'RRGT' | versi (u8) | panjang header (u32 LE) | header JSON | layer uint16 LE × n
+Nilai layer = offset + q × scale, q = 65535 berarti kosong (NaN).
+"""
+
+import hashlib
+import os
+import struct
+import sys
+
+import numpy as np
+
+# Tambahkan path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import DATA_PATHS, GRID_CONFIG
+from src import fastjson
+
+TILE_MAGIC = b'RRGT'
+TILE_VERSION = 1
+TILE_EMPTY = 65535
+
+EARTH_RADIUS_KM = 6371.0088
+
+_weights_cache = {}
+
+
+def grid_axes(config=None):
+    """
+    Returns:
+        tuple: (array lat, array lon) titik tengah sel, dari selatan/barat
+    """
+    config = config or GRID_CONFIG
+    step = config['step_deg']
+    lats = np.arange(config['lat_range'][0], config['lat_range'][1] + step / 2, step)
+    lons = np.arange(config['lon_range'][0], config['lon_range'][1] + step / 2, step)
+    return lats, lons
+
+
+def _haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+class GridInterpolator:
+    """
+    IDW dari titik kota ke grid GRID_CONFIG
+
+    Args:
+        lat, lon: Koordinat kota (urutan sama dengan nilai yang nanti diinterpolasi)
+        config: Override GRID_CONFIG
+        cache_dir: Folder cache matriks bobot (None = hanya cache memori)
+    """
+
+    def __init__(self, lat, lon, config=None, cache_dir=DATA_PATHS['processed']):
+        self.config = {**GRID_CONFIG, **(config or {})}
+        self.lat = np.asarray(lat, dtype=float)
+        self.lon = np.asarray(lon, dtype=float)
+        self.lats, self.lons = grid_axes(self.config)
+        self.shape = (len(self.lats), len(self.lons))
+        self.cache_dir = cache_dir
+        self.weights = self._weights()
+
+    def _key(self):
+        params = (self.config['lat_range'], self.config['lon_range'], self.config['step_deg'],
+                  self.config['power'], self.config['max_distance_km'])
+        digest = hashlib.blake2b(repr(params).encode(), digest_size=8)
+        digest.update(np.round(np.column_stack([self.lat, self.lon]), 4).tobytes())
+        return digest.hexdigest()
+
+    def _weights(self):
+        """Matriks bobot (sel × kota) float32; sel di luar max_distance_km bernilai 0"""
+        key = self._key()
+        if key in _weights_cache:
+            return _weights_cache[key]
+
+        path = os.path.join(str(self.cache_dir), f"idw_weights_{key}.npy") if self.cache_dir else None
+        if path and os.path.exists(path):
+            weights = np.load(path)
+        else:
+            grid_lat, grid_lon = np.meshgrid(self.lats, self.lons, indexing='ij')
+            distance = _haversine_km(grid_lat.reshape(-1, 1), grid_lon.reshape(-1, 1),
+                                     self.lat[None, :], self.lon[None, :])
+            # Sel yang berimpit dengan kota memakai jarak minimum agar bobot tetap terhingga
+            weights = 1.0 / np.maximum(distance, 1e-3) ** self.config['power']
+            weights[distance > self.config['max_distance_km']] = 0.0
+            weights = weights.astype(np.float32)
+            if path:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                np.save(path, weights)
+
+        _weights_cache[key] = weights
+        return weights
+
+    def interpolate(self, values):
+        """
+        Args:
+            values: Nilai per kota (NaN = tidak ada data)
+
+        Returns:
+            ndarray: grid (n_lat, n_lon); NaN untuk sel tanpa kota dalam jangkauan
+        """
+        values = np.asarray(values, dtype=np.float32)
+        valid = ~np.isnan(values)
+        numerator = self.weights @ np.where(valid, values, 0).astype(np.float32)
+        denominator = self.weights @ valid.astype(np.float32)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            grid = numerator / denominator
+        grid[denominator == 0] = np.nan
+        return grid.reshape(self.shape)
+
+
+def interpolate_frame(df, layers=None, config=None):
+    """
+    Interpolasi kolom-kolom DataFrame per kota (kolom lat, lon) ke grid
+
+    Returns:
+        tuple: (GridInterpolator, dict nama layer -> grid 2D)
+    """
+    layers = layers or GRID_CONFIG['layers']
+    df = df.sort_values('city')
+    interpolator = GridInterpolator(df['lat'].to_numpy(), df['lon'].to_numpy(), config)
+    return interpolator, {name: interpolator.interpolate(df[name].to_numpy(dtype=float)) for name in layers}
+
+
+def write_tile(path, layers, lats, lons, meta=None):
+    """Tulis layer grid ke tile biner (atomik)"""
+    names = list(layers)
+    header = {
+        'lat0': float(lats[0]), 'lon0': float(lons[0]),
+        'step': float(lats[1] - lats[0]) if len(lats) > 1 else 0.0,
+        'nlat': len(lats), 'nlon': len(lons),
+        'layers': [],
+        **(meta or {})
+    }
+    blocks = []
+    for name in names:
+        grid = np.asarray(layers[name], dtype=np.float64)
+        finite = grid[np.isfinite(grid)]
+        offset = float(finite.min()) if finite.size else 0.0
+        span = float(finite.max()) - offset if finite.size else 0.0
+        scale = span / (TILE_EMPTY - 1) if span > 0 else 1.0
+        q = np.full(grid.shape, TILE_EMPTY, dtype='<u2')
+        mask = np.isfinite(grid)
+        q[mask] = np.round((grid[mask] - offset) / scale).astype('<u2')
+        header['layers'].append({'name': name, 'offset': offset, 'scale': scale})
+        blocks.append(q.tobytes())
+
+    header_bytes = fastjson.dumps(header)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(TILE_MAGIC + struct.pack('<BI', TILE_VERSION, len(header_bytes)) + header_bytes)
+        for block in blocks:
+            f.write(block)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_tile(path):
+    """
+    Returns:
+        tuple: (header dict, array lat, array lon, dict nama layer -> grid 2D float32)
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:4] != TILE_MAGIC:
+        raise ValueError(f"Bukan file tile RRGT: {path}")
+    version, header_len = struct.unpack_from('<BI', data, 4)
+    if version != TILE_VERSION:
+        raise ValueError(f"Versi tile tidak didukung: {version}")
+    start = 4 + struct.calcsize('<BI')
+    header = fastjson.loads(data[start:start + header_len])
+
+    shape = (header['nlat'], header['nlon'])
+    offset = start + header_len
+    size = shape[0] * shape[1]
+    layers = {}
+    for layer in header['layers']:
+        q = np.frombuffer(data, dtype='<u2', count=size, offset=offset).reshape(shape)
+        grid = (q * np.float32(layer['scale']) + np.float32(layer['offset'])).astype(np.float32)
+        grid[q == TILE_EMPTY] = np.nan
+        layers[layer['name']] = grid
+        offset += size * 2
+
+    lats = header['lat0'] + header['step'] * np.arange(shape[0])
+    lons = header['lon0'] + header['step'] * np.arange(shape[1])
+    return header, lats, lons, layers
+
+
+def write_latest_grid(df, run_id=None, path=None):
+    """Interpolasi snapshot terkini ke GRID_CONFIG['tile_path']"""
+    path = str(path or GRID_CONFIG['tile_path'])
+    interpolator, layers = interpolate_frame(df)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    return write_tile(path, layers, interpolator.lats, interpolator.lons,
+                      meta={'run_id': run_id, 'stations': len(df), 'method': 'idw',
+                            'power': interpolator.config['power']})
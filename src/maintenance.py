@@ -0,0 +1,296 @@
+"""
+Maintenance job (dijalankan harian off-peak oleh scheduler):
+1. Compaction: file output per run (output/risk_analysis_<run_id>.*) yang sudah lewat
+   beberapa hari dihapus; hanya record yang belum ada di history store (run lama / run
+   dengan HISTORY_ENABLED=0) yang digabung dulu ke partisi bulanannya
+2. Downsampling: riwayat lebih tua dari N hari diringkas ke rata-rata per jam,
+   lebih tua lagi ke rata-rata per hari (RR & kategori dihitung ulang dari rata-rata)
+3. Recompute: record yang dihitung dengan versi tabel RR lama dihitung ulang (src/recompute.py)
+4. Retensi: partisi history, manifest, forecast & file state yang kadaluarsa dihapus;
+   data/processed/batch_* hanya disimpan beberapa file terbaru per jenis
+
+Contoh:
+    python src/maintenance.py --dry-run
+    python src/maintenance.py
+"""
+
+import argparse
+import glob
+import os
+import re
+import sys
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+# Tambahkan path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import DATA_PATHS, MAINTENANCE_CONFIG
+from src.change_detection import MEASURED_COLUMNS
+from src.etl_pipeline import score_frame
+from src.history_store import HistoryStore
+from src.recompute import Recompute
+from src import fastjson
+
+RUN_FILE_PATTERN = re.compile(r'^(?P<kind>risk_analysis|risk_forecast|manifest)_(?P<run_id>\d{8}_\d{6})\.(?P<ext>csv|json|ndjson)$')
+BATCH_FILE_PATTERN = re.compile(r'^(?P<kind>batch_[a-z_]+)_(?P<run_id>\d{8}_\d{6})\.csv$')
+STATE_FILE_PATTERN = re.compile(r'^(?:extract|forecast)_(?P<run_id>\d{8}_\d{6})\.json$')
+
+
+def _run_time(run_id):
+    return datetime.strptime(run_id, "%Y%m%d_%H%M%S")
+
+
+def _read_run_file(path):
+    # Timestamp dibiarkan sebagai string ISO (pd.read_json mengubahnya ke datetime)
+    if path.endswith('.csv'):
+        return pd.read_csv(path)
+    if path.endswith('.ndjson'):
+        return pd.DataFrame(list(fastjson.read_records(path)))
+    with open(path, 'rb') as f:
+        return pd.DataFrame(fastjson.loads(f.read()))
+
+
+def _bucket_keys(df, hourly_before, daily_before):
+    """
+    Key (kota, timestamp) setelah dipetakan ke bucket downsampling yang sama dengan downsample(),
+    supaya record run yang history-nya sudah diringkas tetap dikenali sebagai "sudah ada"
+
+    Returns:
+        tuple: (Series bulan 'YYYY-MM', Series key string) sejajar dengan df
+    """
+    ts = pd.to_datetime(df['timestamp'], format='ISO8601')
+    bucket = ts.where(ts >= hourly_before, ts.dt.floor('h'))
+    bucket = bucket.where(ts >= daily_before, ts.dt.floor('D'))
+    keys = df['city'].astype(str) + '\x1f' + bucket.dt.strftime('%Y-%m-%dT%H:%M:%S')
+    return ts.dt.strftime('%Y-%m'), keys
+
+
+def downsample(df, hourly_before, daily_before):
+    """
+    Ringkas record lama ke rata-rata per (kota, jam) atau (kota, hari)
+
+    Record yang sudah diringkas tetap sama jika diringkas ulang (rata-rata satu baris),
+    sehingga aman dijalankan berulang kali pada partisi yang sama.
+
+    Args:
+        df: Isi partisi history
+        hourly_before: Record sebelum waktu ini diringkas per jam
+        daily_before: Record sebelum waktu ini diringkas per hari
+
+    Returns:
+        DataFrame: record terbaru apa adanya + record lama yang sudah diringkas
+    """
+    ts = pd.to_datetime(df['timestamp'], format='ISO8601')
+    daily = (ts < daily_before).to_numpy()
+    hourly = (ts < hourly_before).to_numpy() & ~daily
+    if not (daily | hourly).any():
+        return df
+
+    old = df[daily | hourly].copy()
+    bucket = ts[daily | hourly].dt.floor('h')
+    bucket[daily[daily | hourly]] = bucket[daily[daily | hourly]].dt.floor('D')
+    old['timestamp'] = bucket.dt.strftime('%Y-%m-%dT%H:%M:%S')
+
+    aggregations = {column: 'mean' for column in MEASURED_COLUMNS}
+    aggregations.update({'province': 'first', 'source': 'first'})
+    summary = old.groupby(['city', 'timestamp'], sort=False).agg(aggregations).reset_index()
+
+    summary = summary.assign(**score_frame(summary))
+    return pd.concat([summary, df[~(daily | hourly)]], ignore_index=True)
+
+
+class Maintenance:
+    """
+    Compaction, downsampling & retensi untuk output, history store dan data/processed
+
+    Args:
+        store: HistoryStore tujuan compaction (default: data/history)
+        output_dir: Folder output per run
+        processed_dir: Folder hasil batch processing (batch_*)
+        raw_dir: Folder file state extract/forecast
+        config: Override MAINTENANCE_CONFIG
+        dry_run: Hanya laporkan apa yang akan dilakukan, tanpa menulis/menghapus
+        now: Waktu acuan (default: sekarang)
+    """
+
+    def __init__(self, store=None, output_dir='output', processed_dir=None, raw_dir=None,
+                 config=None, dry_run=False, now=None):
+        self.store = store or HistoryStore()
+        self.output_dir = output_dir
+        self.processed_dir = processed_dir or DATA_PATHS['processed']
+        self.raw_dir = raw_dir or DATA_PATHS['raw']
+        self.config = {**MAINTENANCE_CONFIG, **(config or {})}
+        self.dry_run = dry_run
+        self.now = now or datetime.now()
+        self.summary = {'compacted_runs': 0, 'rows_compacted': 0, 'rows_in_history': 0, 'rows_reduced': 0,
+                        'partitions_rewritten': 0, 'rows_rescored': 0, 'files_removed': 0, 'bytes_freed': 0}
+
+    def _cutoff(self, key):
+        return self.now - timedelta(days=self.config[key])
+
+    def _remove(self, path, remove=os.remove):
+        size = os.path.getsize(path)
+        if not self.dry_run:
+            remove(path)
+        self.summary['files_removed'] += 1
+        self.summary['bytes_freed'] += size
+        print(f"   🗑️  {path} ({size / 1024:.1f} KB)")
+
+    def _run_files(self):
+        """Returns: dict (kind, run_id) -> list path"""
+        runs = {}
+        for path in glob.glob(os.path.join(self.output_dir, '*')):
+            match = RUN_FILE_PATTERN.match(os.path.basename(path))
+            if match:
+                runs.setdefault((match['kind'], match['run_id']), []).append(path)
+        return runs
+
+    def compact_outputs(self):
+        """
+        Hapus output per run yang lebih tua dari compact_after_days (csv, json, ndjson)
+
+        SimpleETL.load sudah menambahkan record yang berubah ke history store, jadi isi file
+        per run biasanya sudah ada di sana. Hanya record yang belum ada (run sebelum history
+        store, atau run dengan HISTORY_ENABLED=0) yang di-append sebelum file dihapus.
+        """
+        print("\n📦 Compaction output per run → history store")
+        cutoff = self._cutoff('compact_after_days')
+        hourly_before = pd.Timestamp(self._cutoff('hourly_after_days'))
+        daily_before = pd.Timestamp(self._cutoff('daily_after_days'))
+        runs = sorted((run_id, paths) for (kind, run_id), paths in self._run_files().items()
+                      if kind == 'risk_analysis' and _run_time(run_id) < cutoff)
+
+        known = {}
+        for run_id, paths in runs:
+            # Satu format cukup (isi sama); csv paling murah dibaca
+            source = sorted(paths, key=lambda path: ['csv', 'ndjson', 'json'].index(path.rsplit('.', 1)[1]))[0]
+            try:
+                df = _read_run_file(source)
+            except Exception as e:
+                print(f"   ❌ {source}: {str(e)}")
+                continue
+
+            months, keys = _bucket_keys(df, hourly_before, daily_before)
+            missing = pd.Series(False, index=df.index)
+            for month in months.unique():
+                if month not in known:
+                    path = self.store.partition_path(month)
+                    known[month] = set(_bucket_keys(pd.read_csv(path, usecols=['timestamp', 'city']),
+                                                    hourly_before, daily_before)[1]) \
+                        if os.path.exists(path) else set()
+                in_month = months == month
+                missing |= in_month & ~keys.isin(known[month])
+                known[month].update(keys[in_month])
+
+            if missing.any() and not self.dry_run:
+                self.store.append(df[missing], source='live')
+            self.summary['compacted_runs'] += 1
+            self.summary['rows_compacted'] += int(missing.sum())
+            self.summary['rows_in_history'] += int((~missing).sum())
+            for path in paths:
+                self._remove(path)
+
+        print(f"   ✅ {self.summary['compacted_runs']} run, {self.summary['rows_compacted']} records baru ke history "
+              f"({self.summary['rows_in_history']} sudah ada)")
+
+    def compact_history(self):
+        """
+        Tulis ulang partisi history: dedupe (kota, timestamp), downsampling record lama,
+        urut (timestamp, city). Partisi yang sudah rapi tidak ditulis ulang.
+        """
+        print("\n🗜️  Compaction & downsampling history store")
+        hourly_before = pd.Timestamp(self._cutoff('hourly_after_days'))
+        daily_before = pd.Timestamp(self._cutoff('daily_after_days'))
+
+        for month in self.store.months():
+            df = self.store.read_partition(month)
+            compacted = df.drop_duplicates(subset=['city', 'timestamp'], keep='last')
+            compacted = downsample(compacted, hourly_before, daily_before)
+            compacted = compacted.sort_values(['timestamp', 'city']).reset_index(drop=True)
+
+            if len(compacted) == len(df) and df['timestamp'].equals(compacted['timestamp']):
+                continue
+
+            removed = len(df) - len(compacted)
+            self.summary['rows_reduced'] += removed
+            self.summary['partitions_rewritten'] += 1
+            print(f"   🔧 {month}: {len(df)} → {len(compacted)} records")
+            if not self.dry_run:
+                before = os.path.getsize(self.store.partition_path(month))
+                self.store.write_partition(month, compacted)
+                self.summary['bytes_freed'] += before - os.path.getsize(self.store.partition_path(month))
+
+    def apply_retention(self):
+        """Hapus file yang melewati kebijakan retensi"""
+        print("\n🧹 Retensi")
+
+        # Partisi history yang seluruh bulannya lebih tua dari retensi (lewat store supaya
+        # cube bulan itu & catatan _rr_versions.json ikut terhapus)
+        oldest_month = self._cutoff('history_retention_days').strftime('%Y-%m')
+        for month in self.store.months():
+            if month < oldest_month:
+                self._remove(self.store.partition_path(month), lambda path, month=month: self.store.remove_partition(month))
+
+        # Manifest, forecast per run & file state extract/forecast
+        cutoff = self._cutoff('file_retention_days')
+        for (kind, run_id), paths in self._run_files().items():
+            if kind != 'risk_analysis' and _run_time(run_id) < cutoff:
+                for path in paths:
+                    self._remove(path)
+        for path in glob.glob(os.path.join(self.raw_dir, '*.json')):
+            match = STATE_FILE_PATTERN.match(os.path.basename(path))
+            if match and _run_time(match['run_id']) < cutoff:
+                self._remove(path)
+
+        # data/processed/batch_*: simpan N file terbaru per jenis
+        batches = {}
+        for path in glob.glob(os.path.join(self.processed_dir, 'batch_*.csv')):
+            match = BATCH_FILE_PATTERN.match(os.path.basename(path))
+            if match:
+                batches.setdefault(match['kind'], []).append((match['run_id'], path))
+        for kind, files in batches.items():
+            for _, path in sorted(files, reverse=True)[self.config['keep_batch_files']:]:
+                self._remove(path)
+
+    def run(self):
+        """
+        Jalankan compaction → downsampling → recompute → retensi
+
+        Returns:
+            dict: ringkasan (run/record yang di-compact, file dihapus, byte dibebaskan)
+        """
+        print("\n" + "="*70)
+        print(f"🧰 MAINTENANCE{' (DRY RUN)' if self.dry_run else ''} - {self.now.strftime('%Y-%m-%d %H:%M:%S')}")
+        print("="*70)
+
+        self.compact_outputs()
+        self.compact_history()
+
+        # Output yang baru di-compact bisa berasal dari tabel RR lama
+        recompute = Recompute(store=self.store, dry_run=self.dry_run)
+        recompute.recompute_history()
+        recompute.recompute_snapshot()
+        self.summary['rows_rescored'] = recompute.summary['rows_rescored']
+
+        self.apply_retention()
+
+        print("\n" + "="*70)
+        print(f"✅ Maintenance selesai: {self.summary['files_removed']} file dihapus, "
+              f"{self.summary['rows_reduced']} records diringkas, "
+              f"{self.summary['bytes_freed'] / 1024 / 1024:.2f} MB dibebaskan")
+        print("="*70)
+        return self.summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compaction, downsampling & retensi output/history')
+    parser.add_argument('--dry-run', action='store_true', help='Tampilkan aksi tanpa menulis/menghapus file')
+    args = parser.parse_args(argv)
+
+    Maintenance(dry_run=args.dry_run).run()
+
+
+if __name__ == "__main__":
+    main()
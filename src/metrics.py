@@ -0,0 +1,260 @@
+"""
+Metrics sederhana format Prometheus (text exposition) untuk scheduler
+Counter, Gauge, Histogram + HTTP endpoint /metrics
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Bucket default (detik) untuk durasi stage & request
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape_label(value):
+    """Escape nilai label sesuai format exposition Prometheus"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    pairs = list(zip(labelnames, labelvalues))
+    if extra:
+        pairs.extend(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape_label(v)}"' for k, v in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Basis metric dengan label opsional"""
+
+    metric_type = 'untyped'
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _init_unlabeled(self, value):
+        # Metric tanpa label langsung diekspos dengan nilai awal (bukan hilang)
+        if not self.labelnames:
+            self._values[()] = value
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Label {self.name} harus {self.labelnames}, bukan {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _render_samples(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} {self.metric_type}"
+        ]
+        lines.extend(self._render_samples())
+        return lines
+
+
+class Counter(_Metric):
+    """Counter yang hanya bisa naik"""
+
+    metric_type = 'counter'
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._init_unlabeled(0)
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError("Counter tidak boleh berkurang")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _render_samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+
+class Gauge(_Metric):
+    """Gauge yang bisa di-set ke nilai apa pun"""
+
+    metric_type = 'gauge'
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._init_unlabeled(0)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _render_samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+
+class Histogram(_Metric):
+    """Histogram kumulatif dengan bucket tetap"""
+
+    metric_type = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._init_unlabeled(self._new_state())
+
+    def _new_state(self):
+        return {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = self._new_state()
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['counts'][i] += 1
+            state['sum'] += value
+            state['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Context manager untuk mengukur durasi blok kode"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _render_samples(self):
+        with self._lock:
+            items = sorted((key, dict(state, counts=list(state['counts']))) for key, state in self._values.items())
+        lines = []
+        for key, state in items:
+            for bound, count in zip(self.buckets, state['counts']):
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state['sum'])}")
+            lines.append(f"{self.name}_count{labels} {state['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """Kumpulan metric yang dirender bersama di endpoint /metrics"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} sudah terdaftar")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self):
+        """Render semua metric ke format text exposition"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+# Metric ETL pipeline
+RUNS_STARTED = REGISTRY.counter('etl_runs_started_total', 'Jumlah run ETL yang dimulai')
+RUNS_SUCCEEDED = REGISTRY.counter('etl_runs_succeeded_total', 'Jumlah run ETL yang berhasil')
+RUNS_FAILED = REGISTRY.counter('etl_runs_failed_total', 'Jumlah run ETL yang gagal')
+RUN_DURATION = REGISTRY.histogram('etl_run_duration_seconds', 'Durasi satu run ETL penuh')
+STAGE_DURATION = REGISTRY.histogram('etl_stage_duration_seconds', 'Durasi per stage ETL', ('stage',))
+CITIES_FETCHED = REGISTRY.counter('etl_cities_fetched_total', 'Jumlah kota berhasil di-fetch per provider', ('provider',))
+CITIES_FAILED = REGISTRY.counter('etl_cities_failed_total', 'Jumlah kota gagal di-fetch per provider', ('provider',))
+HTTP_REQUESTS = REGISTRY.counter('etl_http_requests_total', 'Request HTTP ke API per provider dan status', ('provider', 'status'))
+HTTP_RETRIES = REGISTRY.counter('etl_http_retries_total', 'Retry request HTTP per provider dan alasan', ('provider', 'reason'))
+ACHIEVED_RPS = REGISTRY.gauge('etl_achieved_requests_per_second', 'Requests/detik yang dicapai pada extract terakhir', ('provider',))
+RECORDS_LOADED = REGISTRY.gauge('etl_last_run_records', 'Jumlah record pada run terakhir')
+LAST_SUCCESS = REGISTRY.gauge('etl_last_success_timestamp_seconds', 'Unix timestamp run ETL terakhir yang berhasil')
+API_REQUESTS = REGISTRY.counter('risk_api_requests_total', 'Request ke risk API per endpoint dan status HTTP', ('endpoint', 'status'))
+CACHE_REQUESTS = REGISTRY.counter('etl_cache_requests_total', 'Lookup cache per nama cache dan hasil (hit/miss)', ('cache', 'result'))
+POLLUTION_SOURCES = REGISTRY.counter('etl_pollution_source_total', 'Sumber data polusi per kota (provider, alasan: direct/bundled/fallback/hedge_sent/hedge_won)', ('provider', 'reason'))
+ALERTS_EMITTED = REGISTRY.counter('etl_alerts_total', 'Alert per aturan dan event (fired/resolved)', ('rule', 'event'))
+ALERT_DELIVERIES = REGISTRY.counter('etl_alert_deliveries_total', 'Pengiriman batch alert ke webhook per hasil', ('status',))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Handler HTTP: GET /metrics"""
+
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Jangan penuhi scheduler.log dengan access log scraper
+        pass
+
+
+def start_metrics_server(host='127.0.0.1', port=9108, registry=REGISTRY):
+    """
+    Menjalankan HTTP server metrics di background thread
+
+    Args:
+        host: Alamat bind (default hanya lokal)
+        port: Port HTTP
+        registry: MetricsRegistry yang dirender
+
+    Returns:
+        ThreadingHTTPServer: server yang sedang berjalan (panggil shutdown() untuk stop)
+    """
+    handler = type('MetricsHandler', (_MetricsHandler,), {'registry': registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True)
+    thread.start()
+    return server
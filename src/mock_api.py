@@ -0,0 +1,417 @@
+"""
+Mock API server lokal untuk OpenWeatherMap & WeatherAPI
+Replay respons yang sudah direkam (atau sintetis untuk lat/lon sembarang),
+dengan latency, error rate dan rate limit yang bisa diatur
+
+Contoh:
+    python src/mock_api.py --latency 0.05 --error-rate 0.02 --rate-limit 60
+    python src/mock_api.py --latency 0.02 --slow-rate 0.03 --slow-latency 0.5   # ekor latency
+    python src/mock_api.py --mode record    # proxy ke API asli + simpan respons
+
+    OPENWEATHER_BASE_URL=http://127.0.0.1:8765 WEATHERAPI_BASE_URL=http://127.0.0.1:8765 \\
+        python src/etl_pipeline.py
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque, Counter
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Tambahkan path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from config.config import (
+    MOCK_API_CONFIG,
+    OPENWEATHER_UPSTREAM_URL,
+    WEATHERAPI_UPSTREAM_URL,
+    OPENWEATHER_POLLUTION_PATH,
+    OPENWEATHER_POLLUTION_HISTORY_PATH,
+    OPENWEATHER_POLLUTION_FORECAST_PATH,
+    WEATHERAPI_CURRENT_PATH,
+    WEATHERAPI_HISTORY_PATH,
+    WEATHERAPI_FORECAST_PATH
+)
+from src.synthetic_data import (
+    make_pollution_payload,
+    make_weather_payload,
+    make_pollution_history_payload,
+    make_weather_history_payload,
+    make_pollution_forecast_payload,
+    make_weather_forecast_payload
+)
+
+MODES = ('replay', 'synthesize', 'record')
+
+UPSTREAM_URLS = {
+    'openweather': OPENWEATHER_UPSTREAM_URL,
+    'weatherapi': WEATHERAPI_UPSTREAM_URL
+}
+
+
+def _coords_openweather(query):
+    return float(query['lat'][0]), float(query['lon'][0])
+
+
+def _coords_weatherapi(query):
+    lat, lon = query['q'][0].split(',')
+    return float(lat), float(lon)
+
+
+def _refresh_pollution(payload, now):
+    for item in payload.get('list', []):
+        item['dt'] = now
+    return payload
+
+
+def _refresh_weather(payload, now):
+    payload.get('current', {})['last_updated_epoch'] = now
+    payload.get('location', {})['localtime_epoch'] = now
+    return payload
+
+
+def _refresh_pollution_forecast(payload, now):
+    # Geser semua jam supaya forecast rekaman mulai dari jam sekarang
+    items = payload.get('list', [])
+    if items:
+        shift = (now - now % 3600) - items[0]['dt']
+        for item in items:
+            item['dt'] += shift
+    return payload
+
+
+def _refresh_weather_forecast(payload, now):
+    days = payload.get('forecast', {}).get('forecastday', [])
+    if days:
+        # Hari pertama rekaman menjadi hari ini (tengah malam waktu lokal)
+        midnight = datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0)
+        shift = int(midnight.timestamp()) - days[0]['date_epoch']
+        for day in days:
+            day['date_epoch'] += shift
+            day['date'] = datetime.fromtimestamp(day['date_epoch']).strftime('%Y-%m-%d')
+            for hour in day.get('hour', []):
+                hour['time_epoch'] += shift
+                hour['time'] = datetime.fromtimestamp(hour['time_epoch']).strftime('%Y-%m-%d %H:%M')
+    return payload
+
+
+def _keep_timestamps(payload, now):
+    # Endpoint riwayat: timestamp rekaman tidak diganti
+    return payload
+
+
+# path -> konfigurasi route: provider, nama endpoint, parser koordinat, pembuat payload sintetis,
+# refresher timestamp (mode replay), dan variant (pembeda rekaman untuk lokasi yang sama)
+ROUTES = {
+    OPENWEATHER_POLLUTION_PATH: {
+        'provider': 'openweather',
+        'endpoint': 'air_pollution',
+        'coords': _coords_openweather,
+        'synthesize': lambda lat, lon, query: make_pollution_payload(lat, lon),
+        'refresh': _refresh_pollution,
+        'variant': None
+    },
+    WEATHERAPI_CURRENT_PATH: {
+        'provider': 'weatherapi',
+        'endpoint': 'current',
+        'coords': _coords_weatherapi,
+        'synthesize': lambda lat, lon, query: make_weather_payload(lat, lon),
+        'refresh': _refresh_weather,
+        'variant': None
+    },
+    OPENWEATHER_POLLUTION_HISTORY_PATH: {
+        'provider': 'openweather',
+        'endpoint': 'air_pollution_history',
+        'coords': _coords_openweather,
+        'synthesize': lambda lat, lon, query: make_pollution_history_payload(
+            lat, lon, int(query['start'][0]), int(query['end'][0])),
+        'refresh': _keep_timestamps,
+        'variant': lambda query: f"{query['start'][0]}-{query['end'][0]}"
+    },
+    WEATHERAPI_HISTORY_PATH: {
+        'provider': 'weatherapi',
+        'endpoint': 'history',
+        'coords': _coords_weatherapi,
+        'synthesize': lambda lat, lon, query: make_weather_history_payload(lat, lon, query['dt'][0]),
+        'refresh': _keep_timestamps,
+        'variant': lambda query: query['dt'][0]
+    },
+    OPENWEATHER_POLLUTION_FORECAST_PATH: {
+        'provider': 'openweather',
+        'endpoint': 'air_pollution_forecast',
+        'coords': _coords_openweather,
+        'synthesize': lambda lat, lon, query: make_pollution_forecast_payload(lat, lon),
+        'refresh': _refresh_pollution_forecast,
+        'variant': None
+    },
+    WEATHERAPI_FORECAST_PATH: {
+        'provider': 'weatherapi',
+        'endpoint': 'forecast',
+        'coords': _coords_weatherapi,
+        'synthesize': lambda lat, lon, query: make_weather_forecast_payload(
+            lat, lon, int(query.get('days', ['1'])[0])),
+        'refresh': _refresh_weather_forecast,
+        'variant': lambda query: f"{query.get('days', ['1'])[0]}d"
+    }
+}
+
+
+class MockAPIState:
+    """Konfigurasi + state bersama (rate limit window, statistik) untuk semua request"""
+
+    def __init__(self, mode='replay', latency=0.0, jitter=0.0, error_rate=0.0,
+                 slow_rate=0.0, slow_latency=0.0, rate_limit=None, rate_window=60.0, strict=False,
+                 refresh_timestamps=True, recordings_dir=None, seed=None):
+        if mode not in MODES:
+            raise ValueError(f"Mode harus salah satu dari {MODES}")
+        self.mode = mode
+        self.latency = latency
+        self.jitter = jitter
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.strict = strict
+        self.refresh_timestamps = refresh_timestamps
+        self.recordings_dir = str(recordings_dir or MOCK_API_CONFIG['recordings_dir'])
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.windows = {}
+        self.stats = Counter()
+
+    def recording_path(self, route, lat, lon, query):
+        name = f"{route['endpoint']}_{lat:.4f}_{lon:.4f}"
+        if route['variant'] is not None:
+            # Variant berasal dari query string: buang karakter path supaya tidak keluar dari recordings_dir
+            name += "_" + re.sub(r'[^A-Za-z0-9_.-]', '_', route['variant'](query))
+        return os.path.join(self.recordings_dir, route['provider'], f"{name}.json")
+
+    def delay(self):
+        with self.lock:
+            jitter = self.rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+            # Ekor latency: sebagian kecil request jauh lebih lambat (untuk mengukur hedging)
+            if self.slow_rate and self.rng.random() < self.slow_rate:
+                jitter += self.slow_latency
+        return max(0.0, self.latency + jitter)
+
+    def should_fail(self):
+        if not self.error_rate:
+            return False
+        with self.lock:
+            return self.rng.random() < self.error_rate
+
+    def acquire(self, provider):
+        """
+        Sliding window rate limit per provider
+
+        Returns:
+            float: 0 jika request diizinkan, atau detik yang harus ditunggu (untuk Retry-After)
+        """
+        if not self.rate_limit:
+            return 0.0
+        now = time.monotonic()
+        with self.lock:
+            window = self.windows.setdefault(provider, deque())
+            while window and now - window[0] >= self.rate_window:
+                window.popleft()
+            if len(window) >= self.rate_limit:
+                return self.rate_window - (now - window[0])
+            window.append(now)
+            return 0.0
+
+    def count(self, provider, status):
+        with self.lock:
+            self.stats[f"{provider}:{status}"] += 1
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    state = None
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        state = self.state
+
+        if url.path == '/__mock__/stats':
+            with state.lock:
+                stats = dict(state.stats)
+            self._send_json(200, stats)
+            return
+
+        route = ROUTES.get(url.path)
+        if route is None:
+            self._send_json(404, {'message': f'Unknown endpoint {url.path}'})
+            return
+        provider = route['provider']
+        query = parse_qs(url.query)
+
+        try:
+            lat, lon = route['coords'](query)
+            recording = state.recording_path(route, lat, lon, query)
+        except (KeyError, ValueError):
+            state.count(provider, 400)
+            self._send_json(400, {'message': 'Invalid or missing coordinates'})
+            return
+
+        retry_after = state.acquire(provider)
+        if retry_after:
+            state.count(provider, 429)
+            self._send_json(429, {'message': 'Rate limit exceeded'},
+                            {'Retry-After': str(max(1, math.ceil(retry_after)))})
+            return
+
+        time.sleep(state.delay())
+
+        if state.should_fail():
+            status = 503 if state.rng.random() < 0.5 else 500
+            state.count(provider, status)
+            self._send_json(status, {'message': 'Injected upstream error'})
+            return
+
+        if state.mode == 'record':
+            self._proxy(provider, recording, url)
+            return
+
+        payload = None
+        if state.mode == 'replay':
+            if os.path.exists(recording):
+                with open(recording, encoding='utf-8') as f:
+                    payload = json.load(f)
+                if state.refresh_timestamps:
+                    payload = route['refresh'](payload, int(time.time()))
+            elif state.strict:
+                state.count(provider, 404)
+                self._send_json(404, {'message': f'No recording for {lat},{lon}'})
+                return
+
+        if payload is None:
+            payload = route['synthesize'](lat, lon, query)
+
+        state.count(provider, 200)
+        self._send_json(200, payload)
+
+    def _proxy(self, provider, recording, url):
+        """Mode record: teruskan ke API asli dan simpan respons sukses"""
+        state = self.state
+        upstream = f"{UPSTREAM_URLS[provider]}{url.path}?{url.query}"
+        try:
+            response = requests.get(upstream, timeout=10)
+        except requests.RequestException as e:
+            state.count(provider, 502)
+            self._send_json(502, {'message': f'Upstream error: {e}'})
+            return
+
+        if response.status_code == 200:
+            os.makedirs(os.path.dirname(recording), exist_ok=True)
+            with open(recording, 'w', encoding='utf-8') as f:
+                json.dump(response.json(), f, indent=2)
+
+        state.count(provider, response.status_code)
+        headers = {'Retry-After': response.headers['Retry-After']} if 'Retry-After' in response.headers else None
+        self._send_json(response.status_code, response.json() if response.content else {}, headers)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_server(host='127.0.0.1', port=0, **settings):
+    """
+    Menjalankan mock server di background thread
+
+    Args:
+        host, port: Alamat bind (port 0 = pilih port bebas)
+        **settings: Argumen MockAPIState (mode, latency, error_rate, rate_limit, ...)
+
+    Returns:
+        tuple: (server, base_url); state ada di server.state
+    """
+    state = MockAPIState(**settings)
+    handler = type('MockHandler', (_MockHandler,), {'state': state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.state = state
+    threading.Thread(target=server.serve_forever, name='mock-api', daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock API server (OpenWeatherMap & WeatherAPI)')
+    parser.add_argument('--host', default=MOCK_API_CONFIG['host'])
+    parser.add_argument('--port', type=int, default=MOCK_API_CONFIG['port'])
+    parser.add_argument('--mode', choices=MODES, default='replay',
+                        help='replay: rekaman lalu sintetis | synthesize: selalu sintetis | record: proxy + simpan')
+    parser.add_argument('--recordings-dir', default=str(MOCK_API_CONFIG['recordings_dir']))
+    parser.add_argument('--strict', action='store_true', help='Replay: 404 jika rekaman tidak ada')
+    parser.add_argument('--no-refresh-timestamps', action='store_true',
+                        help='Replay: jangan ganti timestamp rekaman dengan waktu sekarang')
+    parser.add_argument('--latency', type=float, default=0.0, help='Latency per request (detik)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Jitter latency ± (detik)')
+    parser.add_argument('--slow-rate', type=float, default=0.0, help='Probabilitas request lambat (ekor latency)')
+    parser.add_argument('--slow-latency', type=float, default=0.0, help='Latency tambahan request lambat (detik)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Probabilitas respons 500/503')
+    parser.add_argument('--rate-limit', type=int, default=None, help='Maks request per window per provider')
+    parser.add_argument('--rate-window', type=float, default=60.0, help='Panjang window rate limit (detik)')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    server, base_url = start_mock_server(
+        host=args.host,
+        port=args.port,
+        mode=args.mode,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        slow_rate=args.slow_rate,
+        slow_latency=args.slow_latency,
+        rate_limit=args.rate_limit,
+        rate_window=args.rate_window,
+        strict=args.strict,
+        refresh_timestamps=not args.no_refresh_timestamps,
+        recordings_dir=args.recordings_dir,
+        seed=args.seed
+    )
+
+    print("\n" + "="*70)
+    print("🧪 MOCK API SERVER")
+    print("="*70)
+    print(f"🌐 Base URL : {base_url}")
+    print(f"🎛️  Mode     : {args.mode}")
+    print(f"⏱️  Latency  : {args.latency}s ± {args.jitter}s | Error rate: {args.error_rate:.1%}")
+    if args.slow_rate:
+        print(f"🐢 Lambat   : {args.slow_rate:.1%} request +{args.slow_latency}s")
+    if args.rate_limit:
+        print(f"🚦 Rate limit: {args.rate_limit} req / {args.rate_window:.0f}s per provider")
+    print("\n💡 Arahkan pipeline ke server ini:")
+    print(f"   OPENWEATHER_BASE_URL={base_url} WEATHERAPI_BASE_URL={base_url} python src/etl_pipeline.py")
+    print("="*70)
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print("\n🛑 Mock server dihentikan")
+
+
+if __name__ == "__main__":
+    main()
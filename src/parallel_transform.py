@@ -0,0 +1,109 @@
+"""
+Parse paralel untuk transform data besar (backfill jutaan record)
+Record dibagi ke process pool; setiap worker mem-parse payload (dict atau teks JSON)
+dan menulis kolom numerik langsung ke shared memory, sehingga yang dikirim balik
+ke proses utama hanya daftar error, bukan record hasil parse
+"""
+
+import math
+import multiprocessing as mp
+import os
+import sys
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Tambahkan path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.etl_pipeline import NUMERIC_COLUMNS, fill_numeric
+
+# Record sumber untuk worker hasil fork (diwarisi copy-on-write, tanpa pickle)
+_records = None
+
+
+def _shared_arrays(shm, n):
+    numeric = np.ndarray((len(NUMERIC_COLUMNS), n), dtype=np.float64, buffer=shm.buf)
+    valid = np.ndarray(n, dtype=bool, buffer=shm.buf, offset=numeric.nbytes)
+    return numeric, valid
+
+
+def _parse_shard(task):
+    """
+    Parse record [start, end) ke shared memory
+
+    Returns:
+        list: (index, pesan error) untuk record yang gagal di-parse
+    """
+    shm_name, n, start, end, shard = task
+    records = shard if shard is not None else _records
+    offset = start if shard is not None else 0
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    numeric, valid = _shared_arrays(shm, n)
+    errors = []
+    try:
+        for i in range(start, end):
+            try:
+                fill_numeric(records[i - offset], numeric, i)
+                valid[i] = True
+            except Exception as e:
+                valid[i] = False
+                errors.append((i, str(e)))
+    finally:
+        # View ke buffer harus dilepas sebelum shared memory ditutup
+        del numeric, valid
+        shm.close()
+    return errors
+
+
+def parse_parallel(records, workers, chunk_size=None):
+    """
+    Parse kolom numerik semua record dengan process pool
+
+    Di platform dengan fork (Linux) worker membaca `records` langsung dari memori
+    proses induk; di platform lain setiap shard dikirim (pickle) ke worker.
+
+    Args:
+        records: List record hasil extract (format SimpleETL.data)
+        workers: Jumlah proses
+        chunk_size: Record per task (default: n / (workers × 4) untuk load balancing)
+
+    Returns:
+        tuple: (array numerik (len(NUMERIC_COLUMNS), n), array bool valid, list error)
+    """
+    global _records
+
+    n = len(records)
+    if n == 0:
+        return np.empty((len(NUMERIC_COLUMNS), 0)), np.ones(0, dtype=bool), []
+
+    chunk_size = chunk_size or max(1, math.ceil(n / (workers * 4)))
+    use_fork = 'fork' in mp.get_all_start_methods()
+    context = mp.get_context('fork' if use_fork else 'spawn')
+
+    size = len(NUMERIC_COLUMNS) * n * np.dtype(np.float64).itemsize + n
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    try:
+        tasks = [
+            (shm.name, n, start, min(start + chunk_size, n),
+             None if use_fork else records[start:start + chunk_size])
+            for start in range(0, n, chunk_size)
+        ]
+
+        _records = records if use_fork else None
+        try:
+            with context.Pool(processes=workers) as pool:
+                errors = [error for shard_errors in pool.imap_unordered(_parse_shard, tasks)
+                          for error in shard_errors]
+        finally:
+            _records = None
+
+        numeric_view, valid_view = _shared_arrays(shm, n)
+        numeric, valid = numeric_view.copy(), valid_view.copy()
+        del numeric_view, valid_view
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return numeric, valid, sorted(errors)
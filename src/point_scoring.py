@@ -0,0 +1,170 @@
+"""
+Skor risiko on-demand untuk koordinat sembarang (sekolah, klinik, ...)
+
+Koordinat di-snap ke sel grid (ON_DEMAND_CONFIG['cell_deg']); satu sel = satu fetch
+polusi + cuaca ke API, hasilnya di-cache selama jendela kesegaran data (ttl). Request
+bersamaan untuk sel yang sama menunggu fetch yang sedang berjalan (coalescing), sehingga
+jumlah request upstream sebanding dengan jumlah sel berbeda, bukan jumlah request.
+"""
+
+import asyncio
+import math
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Tambahkan path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import OPENWEATHER_BASE_URL, WEATHERAPI_BASE_URL, RETRY_CONFIG, ON_DEMAND_CONFIG, VALIDATION_CONFIG
+from src.etl_pipeline import (SimpleETL, SOURCES, TEXT_COLUMNS, NUMERIC_COLUMNS, fill_numeric, build_table,
+                              validation_columns)
+from src.metrics import CACHE_REQUESTS
+from src.rate_limit import RetryBudget
+from src import fastjson
+
+
+class PointScorer:
+    """
+    Skor RR untuk lat/lon sembarang dengan cache per sel grid dan request coalescing
+
+    Args:
+        cell_deg: Ukuran sel grid (derajat)
+        ttl: Detik hasil satu sel dianggap segar
+        cache_size: Jumlah sel maksimum di cache (LRU)
+        openweather_base_url, weatherapi_base_url: Base URL API (bisa diarahkan ke mock server)
+    """
+
+    def __init__(self, cell_deg=None, ttl=None, cache_size=None,
+                 openweather_base_url=OPENWEATHER_BASE_URL, weatherapi_base_url=WEATHERAPI_BASE_URL):
+        self.cell_deg = cell_deg or ON_DEMAND_CONFIG['cell_deg']
+        self.ttl = ttl or ON_DEMAND_CONFIG['ttl_seconds']
+        self.cache_size = cache_size or ON_DEMAND_CONFIG['cache_size']
+
+        # Client, URL & parsing sama dengan extract pipeline
+        self.etl = SimpleETL(cities=[], openweather_base_url=openweather_base_url,
+                             weatherapi_base_url=weatherapi_base_url)
+        self.etl._init_clients()
+        self._budget_reset = time.monotonic() + self.ttl
+
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._inflight = {}
+        self.upstream_fetches = 0
+
+    def cell(self, lat, lon):
+        """Indeks sel grid (i, j) untuk koordinat"""
+        return math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg)
+
+    def cell_center(self, cell):
+        return (round((cell[0] + 0.5) * self.cell_deg, 6), round((cell[1] + 0.5) * self.cell_deg, 6))
+
+    def _claim(self, cell):
+        """
+        Returns:
+            tuple: (hasil cache atau None, Future yang ditunggu, True jika pemanggil harus fetch)
+        """
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(cell)
+            if cached is not None and cached[0] > now:
+                self._cache.move_to_end(cell)
+                CACHE_REQUESTS.inc(cache='point_score', result='hit')
+                return cached[1], None, False
+
+            future = self._inflight.get(cell)
+            if future is not None:
+                CACHE_REQUESTS.inc(cache='point_score', result='coalesced')
+                return None, future, False
+
+            CACHE_REQUESTS.inc(cache='point_score', result='miss')
+            self.upstream_fetches += 1
+            future = self._inflight[cell] = Future()
+            return None, future, True
+
+    def _resolve(self, cell, future):
+        """Fetch satu sel, simpan ke cache, lalu bangunkan semua request yang menunggu"""
+        try:
+            result = self._fetch_cell(cell)
+        except Exception as e:
+            with self._lock:
+                del self._inflight[cell]
+            future.set_exception(e)
+            return
+
+        with self._lock:
+            self._cache[cell] = (time.monotonic() + self.ttl, result)
+            self._cache.move_to_end(cell)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            del self._inflight[cell]
+        future.set_result(result)
+
+    def _fetch_cell(self, cell):
+        # Retry budget diperbarui per jendela ttl (service berjalan terus, bukan per run)
+        if time.monotonic() > self._budget_reset:
+            budget = RetryBudget(RETRY_CONFIG['retry_budget'])
+            for client in self.etl.clients.values():
+                client.budget = budget
+            self._budget_reset = time.monotonic() + self.ttl
+
+        lat, lon = self.cell_center(cell)
+        record = {'city': f"{lat},{lon}", 'province': None, 'lat': lat, 'lon': lon,
+                  'timestamp': datetime.now().isoformat()}
+        record.update({source: None for source in SOURCES})
+        errors = self.etl.strategy.fetch(record, tuple(SOURCES))
+        if errors:
+            raise ValueError('; '.join(errors))
+
+        numeric = np.empty((len(NUMERIC_COLUMNS), 1), dtype=np.float64)
+        fill_numeric(record, numeric, 0)
+        if VALIDATION_CONFIG['enabled']:
+            from src.validation import validate
+            columns, observed = validation_columns(numeric)
+            result = validate(columns, [record['timestamp']], observed)
+            if not result.ok[0]:
+                raise ValueError(f"data provider tidak valid ({', '.join(result.reasons[0])})")
+        text = {column: np.array([record[column]], dtype=object) for column in TEXT_COLUMNS}
+        table = build_table(text, numeric, np.ones(1, dtype=bool))
+        scores = fastjson.to_records(pd.DataFrame(table))[0]
+        for column in ('city', 'province', 'lat', 'lon'):
+            del scores[column]
+        return {'cell': {'lat': lat, 'lon': lon, 'size_deg': self.cell_deg},
+                'fetched_at': time.time(), **scores}
+
+    def _response(self, lat, lon, result):
+        return {'lat': lat, 'lon': lon,
+                'expires_in': max(0, round(result['fetched_at'] + self.ttl - time.time())),
+                **result}
+
+    def score(self, lat, lon):
+        """
+        Skor untuk satu koordinat (blocking; aman dipanggil dari banyak thread)
+
+        Returns:
+            dict: koordinat, sel grid, sisa masa berlaku (detik) + kolom skor seperti output ETL
+        """
+        cell = self.cell(lat, lon)
+        result, future, owner = self._claim(cell)
+        if result is None:
+            if owner:
+                self._resolve(cell, future)
+            result = future.result()
+        return self._response(lat, lon, result)
+
+    async def score_async(self, lat, lon):
+        """Versi asyncio: fetch jalan di executor, request yang ikut menunggu tidak memakai thread"""
+        cell = self.cell(lat, lon)
+        result, future, owner = self._claim(cell)
+        if result is None:
+            if owner:
+                asyncio.get_running_loop().run_in_executor(None, self._resolve, cell, future)
+            result = await asyncio.wrap_future(future)
+        return self._response(lat, lon, result)
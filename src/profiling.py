@@ -0,0 +1,251 @@
+"""
+Profiling opt-in untuk run ETL (PROFILE_ENABLED=1 atau `--profile`)
+
+- sampling (default): thread background mengambil stack semua thread run setiap
+  PROFILE_INTERVAL_MS (sys._current_frames), termasuk worker extract. Waktu yang dihitung
+  adalah wall-clock, jadi menunggu API / rate limit juga terlihat. Overhead kecil dan tidak
+  bergantung pada jumlah pemanggilan fungsi. Hasil: output/profiles/profile_<run_id>.folded
+  (format "folded stacks": flamegraph.pl, speedscope, inferno)
+- cprofile: cProfile deterministik untuk thread yang menjalankan run (extract paralel tidak
+  ikut terukur, transform/load lengkap). Hasil: profile_<run_id>.pstats (snakeviz, flameprof,
+  `python -m pstats`)
+
+Hanya PROFILE_KEEP_LAST profil terbaru yang disimpan. Worker process pool transform (data
+besar) tidak ikut di-profile; yang terlihat hanya waktu menunggu hasilnya.
+
+Contoh:
+    PROFILE_ENABLED=1 python src/cli.py schedule
+    python src/etl_pipeline.py --profile cprofile
+    python src/profiling.py output/profiles/profile_20251123_100000.folded --top 15
+"""
+
+import argparse
+import glob
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Tambahkan path
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from config.config import PROFILE_CONFIG
+
+MODES = ('sampling', 'cprofile')
+EXTENSIONS = {'sampling': '.folded', 'cprofile': '.pstats'}
+
+# Worker pool bernomor (ThreadPoolExecutor-0_3, extract_2) digabung jadi satu akar flamegraph
+_THREAD_SUFFIX = re.compile(r'[-_]\d+(_\d+)?$')
+
+
+def _short_path(filename):
+    if filename.startswith(ROOT_DIR + os.sep):
+        return os.path.relpath(filename, ROOT_DIR)
+    parts = filename.replace('\\', '/').split('/')
+    return '/'.join(parts[-2:])
+
+
+class SamplingProfiler:
+    """
+    Sampling profiler stack thread (wall-clock)
+
+    Thread yang disampel: thread pemanggil start() + semua thread yang dibuat selama profiling
+    (worker extract, hedging, dispatcher alert); thread lama seperti server metrics/risk API
+    tidak ikut.
+    """
+
+    def __init__(self, interval_ms=None):
+        self.interval = (interval_ms or PROFILE_CONFIG['interval_ms']) / 1000
+        self.stacks = Counter()
+        self.samples = 0
+        self._labels = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = (f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+                                          .replace(';', ','))
+        return label
+
+    def start(self):
+        self._owner = threading.get_ident()
+        self._ignored = {thread.ident for thread in threading.enumerate()} - {self._owner}
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._loop, name='profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def _loop(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own or ident in self._ignored:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                thread = 'main' if ident == self._owner else _THREAD_SUFFIX.sub('', names.get(ident, 'thread'))
+                stack.append(thread)
+                self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self._started
+        return self
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def describe(self):
+        return f"{self.samples} sampel @ {self.interval * 1000:g} ms, {self.duration:.1f} s"
+
+
+class CProfiler:
+    """cProfile untuk thread pemanggil (deterministik, overhead per pemanggilan fungsi)"""
+
+    def start(self):
+        import cProfile
+
+        self.profile = cProfile.Profile()
+        self._started = time.perf_counter()
+        self.profile.enable()
+        return self
+
+    def stop(self):
+        self.profile.disable()
+        self.duration = time.perf_counter() - self._started
+        return self
+
+    def write(self, path):
+        self.profile.dump_stats(path)
+
+    def describe(self):
+        return f"cProfile thread utama, {self.duration:.1f} s"
+
+
+def create_profiler(mode=None, interval_ms=None):
+    mode = mode or PROFILE_CONFIG['mode']
+    if mode not in MODES:
+        raise ValueError(f"Mode profiling harus salah satu dari {MODES}")
+    return SamplingProfiler(interval_ms) if mode == 'sampling' else CProfiler()
+
+
+def prune_profiles(directory, keep_last):
+    """Hapus profil tertua di luar keep_last terbaru (urut mtime)"""
+    paths = [path for ext in EXTENSIONS.values() for path in glob.glob(os.path.join(directory, f"profile_*{ext}"))]
+    paths.sort(key=os.path.getmtime, reverse=True)
+    for path in paths[keep_last:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    return paths[keep_last:]
+
+
+@contextmanager
+def profiled(name, mode=None, directory=None, keep_last=None):
+    """
+    Profile blok kode lalu tulis ke <directory>/profile_<name><ext>
+
+    Args:
+        name: Nama file, atau fungsi tanpa argumen yang dipanggil setelah blok selesai
+              (run_id baru diketahui di dalam run)
+        mode: 'sampling' / 'cprofile' (default: PROFILE_CONFIG['mode'])
+
+    Kegagalan menulis profil hanya dicetak; tidak pernah menggagalkan run.
+    """
+    mode = mode or PROFILE_CONFIG['mode']
+    directory = str(directory or PROFILE_CONFIG['dir'])
+    keep_last = PROFILE_CONFIG['keep_last'] if keep_last is None else keep_last
+    profiler = create_profiler(mode).start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        try:
+            label = name() if callable(name) else name
+            label = label or time.strftime("%Y%m%d_%H%M%S")
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"profile_{label}{EXTENSIONS[mode]}")
+            tmp_path = path + '.tmp'
+            profiler.write(tmp_path)
+            os.replace(tmp_path, path)
+            if keep_last:
+                prune_profiles(directory, keep_last)
+            print(f"\n🔬 Profil saved: {path} ({profiler.describe()})")
+        except Exception as e:
+            print(f"\n⚠️  Profil gagal ditulis: {str(e)}")
+
+
+def folded_summary(path):
+    """
+    Ringkasan file folded
+
+    Returns:
+        tuple: (total sampel, Counter self per frame, Counter inklusif per frame)
+    """
+    total = 0
+    own = Counter()
+    inclusive = Counter()
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            stack, _, count = line.rstrip('\n').rpartition(' ')
+            if not stack:
+                continue
+            count = int(count)
+            frames = stack.split(';')
+            total += count
+            own[frames[-1]] += count
+            # Rekursi: frame yang sama dihitung sekali per stack
+            for frame in set(frames):
+                inclusive[frame] += count
+    return total, own, inclusive
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Ringkasan profil run ETL (.folded / .pstats)')
+    parser.add_argument('path', nargs='?', help='File profil (default: profil terbaru di output/profiles/)')
+    parser.add_argument('--top', type=int, default=20, help='Jumlah frame/fungsi yang ditampilkan')
+    args = parser.parse_args(argv)
+
+    path = args.path
+    if path is None:
+        paths = [p for ext in EXTENSIONS.values() for p in glob.glob(os.path.join(PROFILE_CONFIG['dir'], f"profile_*{ext}"))]
+        if not paths:
+            print(f"❌ Tidak ada profil di {PROFILE_CONFIG['dir']} (jalankan dengan PROFILE_ENABLED=1)")
+            return 1
+        path = max(paths, key=os.path.getmtime)
+
+    print(f"\n🔬 {path}")
+    if path.endswith('.pstats'):
+        import pstats
+
+        pstats.Stats(path).strip_dirs().sort_stats('cumulative').print_stats(args.top)
+        return 0
+
+    total, own, inclusive = folded_summary(path)
+    if not total:
+        print("   (kosong)")
+        return 0
+    for title, counter in (('Self (frame teratas stack)', own), ('Inklusif', inclusive)):
+        print(f"\n{title}:")
+        for frame, count in counter.most_common(args.top):
+            print(f"   {100 * count / total:5.1f}%  {count:6d}  {frame}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
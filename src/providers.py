@@ -0,0 +1,193 @@
+"""
+Strategi sumber data polusi untuk extract
+
+WeatherAPI current.json dengan aqi=yes sudah membawa blok air_quality (PM2.5, PM10, NO2,
+SO2, O3, CO dalam µg/m³, satuan sama dengan OpenWeatherMap). Dengan strategi 'bundled' /
+'hedged' satu call WeatherAPI per kota cukup untuk cuaca + polusi; blok tersebut diubah ke
+bentuk payload OpenWeatherMap air_pollution sehingga transform tidak perlu tahu sumbernya.
+
+- separate : polusi dari OpenWeatherMap, cuaca dari WeatherAPI (2 call/kota)
+- bundled  : 1 call WeatherAPI; OpenWeatherMap hanya jika blok air_quality tidak ada
+- hedged   : seperti bundled, tetapi jika call WeatherAPI belum selesai setelah persentil
+  latency-nya (POLLUTION_HEDGE_PERCENTILE) call WeatherAPI yang sama dikirim sekali lagi dan
+  respons pertama yang sukses dipakai. Call ini satu-satunya jalur kritis per kota (cuaca +
+  polusi), jadi hedge memotong ekor latency per kota dengan biaya ±(100 - persentil)% request
+  tambahan. Jika WeatherAPI gagal polusi tetap diambil dari OpenWeatherMap (retry_failed
+  cukup mengulang cuaca)
+
+Contoh:
+    POLLUTION_STRATEGY=hedged python src/etl_pipeline.py
+"""
+
+import threading
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+
+from config.config import EXTRACT_CONFIG, POLLUTION_SOURCE_CONFIG
+from src.metrics import CITIES_FETCHED, CITIES_FAILED, POLLUTION_SOURCES
+
+STRATEGIES = ('separate', 'bundled', 'hedged')
+
+# Key air_quality WeatherAPI -> key components OpenWeatherMap
+AIR_QUALITY_KEYS = {'pm2_5': 'pm2_5', 'pm10': 'pm10', 'no2': 'no2', 'so2': 'so2', 'o3': 'o3', 'co': 'co'}
+
+SOURCE_LABELS = {'pollution': 'polusi', 'weather': 'cuaca'}
+
+
+def bundled_pollution(weather_payload):
+    """
+    Blok air_quality payload WeatherAPI -> payload format OpenWeatherMap air_pollution
+
+    Returns:
+        dict: {'list': [{'dt', 'components'}], 'source': 'weatherapi'}, atau None jika
+        blok tidak ada / tidak berisi PM2.5 (paket API tanpa AQI, lokasi tanpa data)
+    """
+    current = weather_payload.get('current', {}) if isinstance(weather_payload, dict) else {}
+    air_quality = current.get('air_quality')
+    if not isinstance(air_quality, dict) or air_quality.get('pm2_5') is None:
+        return None
+    components = {key: air_quality[source] for key, source in AIR_QUALITY_KEYS.items()
+                  if air_quality.get(source) is not None}
+    item = {'components': components}
+    if current.get('last_updated_epoch') is not None:
+        item['dt'] = current['last_updated_epoch']
+    return {'list': [item], 'source': 'weatherapi'}
+
+
+class SourceStrategy:
+    """
+    Fetch sumber (polusi/cuaca) satu kota sesuai strategi
+
+    Args:
+        clients: Dict provider -> ProviderClient
+        source_url: Fungsi (source, entry) -> URL
+        sources: Dict source -> provider default ({'pollution': 'openweather', 'weather': 'weatherapi'})
+        strategy: Salah satu STRATEGIES (default: POLLUTION_SOURCE_CONFIG['strategy'])
+        workers: Jumlah thread extract yang memanggil fetch() paralel (default:
+            EXTRACT_CONFIG['max_workers']); pool hedging = 2 × workers (primary + cadangan)
+    """
+
+    def __init__(self, clients, source_url, sources, strategy=None, config=None, workers=None):
+        self.config = {**POLLUTION_SOURCE_CONFIG, **(config or {})}
+        self.strategy = strategy or self.config['strategy']
+        if self.strategy not in STRATEGIES:
+            raise ValueError(f"Strategi polusi harus salah satu dari {STRATEGIES}")
+        self.clients = clients
+        self.workers = max(1, workers or EXTRACT_CONFIG['max_workers'])
+        self.source_url = source_url
+        self.sources = sources
+        self.counts = Counter()
+        self.lock = threading.Lock()
+        self._executor = None
+
+    def _get(self, source, entry):
+        provider = self.sources[source]
+        try:
+            payload = self.clients[provider].get_json(self.source_url(source, entry))
+        except Exception:
+            CITIES_FAILED.inc(provider=provider)
+            raise
+        CITIES_FETCHED.inc(provider=provider)
+        return payload
+
+    def _count(self, provider, reason):
+        POLLUTION_SOURCES.inc(provider=provider, reason=reason)
+        with self.lock:
+            self.counts[f"{provider}:{reason}"] += 1
+
+    def hedge_delay(self):
+        """Detik menunggu WeatherAPI sebelum request cuaca cadangan dikirim"""
+        delay = self.clients[self.sources['weather']].latency_percentile(
+            self.config['hedge_percentile'], self.config['hedge_min_samples'])
+        return self.config['hedge_default_seconds'] if delay is None else delay
+
+    def executor(self):
+        with self.lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers * 2, thread_name_prefix='hedge')
+            return self._executor
+
+    def close(self):
+        """Lepas thread hedging (request cadangan yang masih berjalan dibiarkan selesai)"""
+        with self.lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _hedged_weather(self, entry):
+        """
+        Call WeatherAPI; jika belum selesai setelah hedge_delay() kirim call kedua yang sama
+        dan pakai respons sukses pertama (yang kalah dibiarkan selesai di background)
+
+        hedge_delay() dihitung sejak call pertama benar-benar mulai, bukan sejak di-submit:
+        waktu antre di pool (misal masih dipakai call yang kalah) tidak boleh memicu cadangan.
+        """
+        started = threading.Event()
+
+        def primary_call():
+            started.set()
+            return self._get('weather', entry)
+
+        primary = self.executor().submit(primary_call)
+        started.wait()
+        try:
+            return primary.result(timeout=self.hedge_delay())
+        except FutureTimeout:
+            pass
+
+        provider = self.sources['weather']
+        self._count(provider, 'hedge_sent')
+        backup = self.executor().submit(self._get, 'weather', entry)
+        pending = {primary, backup}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is backup:
+                        self._count(provider, 'hedge_won')
+                    return future.result()
+        # Keduanya gagal: error call pertama yang dilaporkan
+        return primary.result()
+
+    def fetch(self, entry, sources):
+        """
+        Isi entry[source] untuk setiap source di `sources` (yang gagal dibiarkan None)
+
+        Returns:
+            list: pesan error per source yang gagal
+        """
+        errors = []
+
+        def attempt(source, fn):
+            try:
+                entry[source] = fn()
+                return True
+            except Exception as e:
+                errors.append(f"{SOURCE_LABELS[source]}: {str(e)}")
+                return False
+
+        # Mode separate, atau hanya salah satu sumber yang perlu diulang: langsung ke provider-nya
+        if self.strategy == 'separate' or 'weather' not in sources or 'pollution' not in sources:
+            for source in sources:
+                if attempt(source, lambda: self._get(source, entry)) and source == 'pollution':
+                    self._count(self.sources['pollution'], 'direct')
+            return errors
+
+        if self.strategy == 'hedged':
+            attempt('weather', lambda: self._hedged_weather(entry))
+        else:
+            attempt('weather', lambda: self._get('weather', entry))
+
+        bundled = bundled_pollution(entry['weather']) if entry['weather'] is not None else None
+        if bundled is not None:
+            entry['pollution'] = bundled
+            self._count(self.sources['weather'], 'bundled')
+        elif entry['weather'] is not None or self.strategy == 'hedged':
+            # Blok air_quality tidak ada (bundled/hedged) atau WeatherAPI gagal (hedged)
+            if attempt('pollution', lambda: self._get('pollution', entry)):
+                self._count(self.sources['pollution'], 'fallback')
+        return errors
+
+    def summary(self):
+        with self.lock:
+            return dict(self.counts)
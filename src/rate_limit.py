@@ -0,0 +1,250 @@
+"""
+Rate limiter (token bucket) per provider + retry dengan exponential backoff
+Dipakai extract supaya berjalan di throughput maksimum yang masih diizinkan kuota API
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.fastjson import loads
+from src.metrics import HTTP_REQUESTS, HTTP_RETRIES
+
+# Status yang layak di-retry (selain 429 yang punya penanganan sendiri)
+RETRYABLE_STATUS = {500, 502, 503, 504}
+
+# Durasi get_json sukses per provider, dipakai bersama semua client dalam satu proses
+# (client dibuat ulang tiap run, sampel latency tetap bertahan untuk keputusan hedging)
+_LATENCIES = {}
+_latency_lock = threading.Lock()
+
+
+class FetchError(Exception):
+    """Request gagal setelah semua retry (status None = error jaringan/timeout)"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class TokenBucket:
+    """
+    Token bucket thread-safe
+
+    Args:
+        rate: Token per detik (None/0 = tanpa batas)
+        capacity: Ukuran burst maksimum
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blok sampai satu token tersedia"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif not self.rate:
+                    return
+                else:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Hentikan semua pengambilan token selama `seconds` (misal dari header Retry-After)"""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+            self.updated = self.blocked_until
+
+
+class RetryBudget:
+    """Jumlah retry maksimum yang boleh dipakai bersama oleh semua request dalam satu run"""
+
+    def __init__(self, max_retries):
+        self.remaining = max_retries
+        self.lock = threading.Lock()
+
+    def try_consume(self):
+        with self.lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+
+def parse_retry_after(value, default=1.0):
+    """Header Retry-After bisa berupa detik atau HTTP-date"""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return default
+
+
+class ProviderClient:
+    """
+    HTTP client untuk satu provider: rate limit, retry + backoff, dan statistik throughput
+
+    Args:
+        provider: Nama provider ('openweather', 'weatherapi')
+        rate_limit: Dict {'requests_per_second', 'burst'}
+        retry_config: Dict {'max_attempts', 'base_delay', 'max_delay', 'timeout'}
+        budget: RetryBudget bersama untuk run ini
+        pool_size: Ukuran connection pool (samakan dengan jumlah worker)
+        latency_window: Jumlah latency request sukses terakhir (per provider) untuk latency_percentile()
+    """
+
+    def __init__(self, provider, rate_limit, retry_config, budget, pool_size=10, latency_window=200):
+        self.provider = provider
+        self.configured_rps = rate_limit.get('requests_per_second')
+        self.bucket = TokenBucket(self.configured_rps, rate_limit.get('burst', 1))
+        self.max_attempts = retry_config['max_attempts']
+        self.base_delay = retry_config['base_delay']
+        self.max_delay = retry_config['max_delay']
+        self.timeout = retry_config['timeout']
+        self.budget = budget
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'retries': 0, 'throttled': 0, 'failed': 0}
+        self.first_request = None
+        self.last_request = None
+        with _latency_lock:
+            self.latencies = _LATENCIES.setdefault(provider, deque(maxlen=latency_window))
+
+    def _record_request(self, status):
+        now = time.monotonic()
+        with self.lock:
+            self.stats['requests'] += 1
+            if self.first_request is None:
+                self.first_request = now
+            self.last_request = now
+        HTTP_REQUESTS.inc(provider=self.provider, status=status)
+
+    def _backoff(self, attempt):
+        # Exponential backoff dengan full jitter
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _retry(self, attempt, reason, delay):
+        """Returns True jika boleh retry (bukan attempt terakhir & budget masih ada), sambil menunggu `delay`"""
+        if attempt >= self.max_attempts - 1 or not self.budget.try_consume():
+            return False
+        with self.lock:
+            self.stats['retries'] += 1
+        HTTP_RETRIES.inc(provider=self.provider, reason=reason)
+        time.sleep(delay)
+        return True
+
+    def get_json(self, url):
+        """
+        GET url dan parse JSON
+
+        Raises:
+            FetchError: status non-200 yang tidak bisa di-retry, atau retry habis (termasuk error
+                jaringan dan respons 200 dengan body bukan JSON)
+        """
+        start = time.monotonic()
+        for attempt in range(self.max_attempts):
+            self.bucket.acquire()
+            try:
+                response = self.session.get(url, timeout=self.timeout)
+            except requests.RequestException as e:
+                self._record_request('error')
+                error = FetchError(f"{type(e).__name__}: {e}")
+                if self._retry(attempt, 'network', self._backoff(attempt)):
+                    continue
+                break
+
+            if response.status_code == 200:
+                try:
+                    payload = loads(response.content)
+                except ValueError as e:
+                    # Halaman HTML proxy/captive portal atau body terpotong: di-retry seperti error jaringan
+                    self._record_request('invalid_json')
+                    error = FetchError(f"HTTP 200 dengan body bukan JSON: {e}")
+                    if self._retry(attempt, 'invalid_json', self._backoff(attempt)):
+                        continue
+                    break
+                self._record_request(response.status_code)
+                with _latency_lock:
+                    self.latencies.append(time.monotonic() - start)
+                return payload
+
+            self._record_request(response.status_code)
+            error = FetchError(f"HTTP {response.status_code}", response.status_code)
+
+            if response.status_code == 429:
+                # Hormati Retry-After: semua thread provider ini ikut menunggu lewat bucket
+                delay = parse_retry_after(response.headers.get('Retry-After'), self._backoff(attempt))
+                self.bucket.pause(delay)
+                with self.lock:
+                    self.stats['throttled'] += 1
+                if self._retry(attempt, 'rate_limited', 0):
+                    continue
+                break
+
+            if response.status_code in RETRYABLE_STATUS:
+                if self._retry(attempt, 'server_error', self._backoff(attempt)):
+                    continue
+                break
+
+            # 4xx lain (key salah, koordinat invalid): retry tidak akan membantu
+            break
+
+        with self.lock:
+            self.stats['failed'] += 1
+        raise error
+
+    def latency_percentile(self, q, min_samples=1):
+        """
+        Persentil ke-q (0-100) durasi get_json yang sukses (termasuk antre rate limit & retry)
+
+        Returns:
+            float: detik, atau None jika sampel < min_samples
+        """
+        with _latency_lock:
+            samples = sorted(self.latencies)
+        if len(samples) < max(1, min_samples):
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * q / 100))]
+
+    def summary(self):
+        """
+        Returns:
+            dict: statistik request + achieved vs configured requests/second
+        """
+        with self.lock:
+            stats = dict(self.stats)
+            elapsed = (self.last_request - self.first_request) if self.first_request is not None else 0.0
+        stats['elapsed_s'] = elapsed
+        stats['achieved_rps'] = (stats['requests'] - 1) / elapsed if elapsed > 0 else None
+        stats['configured_rps'] = self.configured_rps
+        return stats
@@ -0,0 +1,167 @@
+"""
+Recompute skor setelah tabel RR (POLLUTION_RR, WEATHER_RR, RISK_CATEGORIES) berubah
+
+Setiap record menyimpan versi tabel yang menghitungnya (kolom rr_version, lihat
+config.rr_tables.table_version). Job ini hanya membuka partisi history yang menurut
+data/history/_rr_versions.json berisi versi lain (atau belum tercatat), menghitung ulang
+record basi per batch vectorized dari kolom terukurnya, lalu menulis ulang partisi
+tersebut secara atomik. Snapshot output/risk_latest.csv ikut diperbarui.
+
+Output per run (output/risk_analysis_<run_id>.*) tidak diubah: setiap baris sudah
+mencatat versinya, dan setelah di-compact ke history ikut dihitung ulang oleh job ini.
+
+Contoh:
+    python src/recompute.py --dry-run
+    python src/recompute.py
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Tambahkan path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import DEDUP_CONFIG, RECOMPUTE_CONFIG
+from config.rr_tables import RR_TABLE_VERSION
+from src.change_detection import ChangeDetector
+from src.etl_pipeline import score_frame
+from src.history_store import HistoryStore
+
+
+def stale_mask(df, version=None):
+    """Record yang dihitung dengan versi tabel lain (default: versi saat ini) atau tanpa versi"""
+    version = version or RR_TABLE_VERSION
+    if 'rr_version' not in df.columns:
+        return np.ones(len(df), dtype=bool)
+    return (df['rr_version'].fillna('').astype(str) != version).to_numpy()
+
+
+def rescore(df, chunk_rows=None):
+    """
+    Hitung ulang kolom skor untuk record basi, per batch chunk_rows record
+
+    Returns:
+        tuple: (DataFrame baru, jumlah record yang dihitung ulang)
+    """
+    rows = np.flatnonzero(stale_mask(df))
+    if rows.size == 0:
+        return df, 0
+
+    chunk_rows = chunk_rows or RECOMPUTE_CONFIG['chunk_rows']
+    columns = {}
+    for start in range(0, rows.size, chunk_rows):
+        chunk = rows[start:start + chunk_rows]
+        for column, values in score_frame(df.iloc[chunk]).items():
+            values = np.asarray(values)
+            if column not in columns:
+                numeric = values.dtype.kind in 'fc'
+                if column in df.columns:
+                    columns[column] = df[column].to_numpy(dtype=float if numeric else object, copy=True)
+                else:
+                    columns[column] = np.full(len(df), np.nan if numeric else None, dtype=float if numeric else object)
+            columns[column][chunk] = values
+    return df.assign(**columns), int(rows.size)
+
+
+class Recompute:
+    """
+    Hitung ulang skor history & snapshot yang dibuat dengan versi tabel RR lama
+
+    Args:
+        store: HistoryStore (default: data/history)
+        latest_path: Snapshot observasi terakhir (default: DEDUP_CONFIG['latest_path'])
+        chunk_rows: Record per batch scoring
+        dry_run: Hanya hitung record basi, tanpa menulis
+    """
+
+    def __init__(self, store=None, latest_path=None, chunk_rows=None, dry_run=False):
+        self.store = store or HistoryStore()
+        self.latest_path = latest_path or DEDUP_CONFIG['latest_path']
+        self.chunk_rows = chunk_rows or RECOMPUTE_CONFIG['chunk_rows']
+        self.dry_run = dry_run
+        self.summary = {'version': RR_TABLE_VERSION, 'partitions_scanned': 0, 'partitions_rewritten': 0,
+                        'rows_rescored': 0, 'snapshot_rows': 0}
+
+    def stale_months(self):
+        """Partisi yang berisi versi lain atau belum tercatat versinya"""
+        recorded = self.store.versions()
+        return [month for month in self.store.months() if recorded.get(month) != [RR_TABLE_VERSION]]
+
+    def pending(self):
+        """True jika ada partisi atau baris snapshot yang perlu dihitung ulang"""
+        if self.stale_months():
+            return True
+        if not os.path.exists(self.latest_path):
+            return False
+        return bool(stale_mask(pd.read_csv(self.latest_path)).any())
+
+    def recompute_history(self):
+        print(f"\n♻️  Recompute history (tabel RR versi {RR_TABLE_VERSION})")
+        for month in self.stale_months():
+            df = self.store.read_partition(month)
+            self.summary['partitions_scanned'] += 1
+            updated, count = rescore(df, self.chunk_rows)
+            if count == 0:
+                # Partisi lama yang ternyata sudah versi terbaru: cukup dicatat
+                if not self.dry_run:
+                    self.store.set_versions(month, [RR_TABLE_VERSION])
+                continue
+
+            self.summary['partitions_rewritten'] += 1
+            self.summary['rows_rescored'] += count
+            print(f"   🔧 {month}: {count:,}/{len(df):,} records")
+            if not self.dry_run:
+                self.store.write_partition(month, updated)
+        print(f"   ✅ {self.summary['rows_rescored']:,} records di {self.summary['partitions_rewritten']} partisi")
+
+    def recompute_snapshot(self):
+        if not os.path.exists(self.latest_path):
+            return
+        detector = ChangeDetector(self.latest_path)
+        updated, count = rescore(detector.latest, self.chunk_rows)
+        self.summary['snapshot_rows'] = count
+        if count:
+            print(f"   🔧 {self.latest_path}: {count} kota")
+            if not self.dry_run:
+                detector.latest = updated
+                detector.save()
+
+    def run(self):
+        """
+        Returns:
+            dict: ringkasan (partisi diperiksa/ditulis ulang, record dihitung ulang, detik)
+        """
+        print("\n" + "="*70)
+        print(f"♻️  RECOMPUTE RR{' (DRY RUN)' if self.dry_run else ''} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print("="*70)
+
+        start = time.perf_counter()
+        self.recompute_history()
+        self.recompute_snapshot()
+        self.summary['seconds'] = round(time.perf_counter() - start, 3)
+
+        print("\n" + "="*70)
+        print(f"✅ Recompute selesai: {self.summary['rows_rescored']:,} records history + "
+              f"{self.summary['snapshot_rows']} kota snapshot ({self.summary['seconds']:.1f}s)")
+        print("="*70)
+        return self.summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Hitung ulang skor history yang dibuat dengan tabel RR lama')
+    parser.add_argument('--dry-run', action='store_true', help='Hitung record basi tanpa menulis')
+    parser.add_argument('--chunk-rows', type=int, default=RECOMPUTE_CONFIG['chunk_rows'], help='Record per batch')
+    args = parser.parse_args(argv)
+
+    Recompute(chunk_rows=args.chunk_rows, dry_run=args.dry_run).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,422 @@
+"""
+Laporan statis per run (HTML + JSON) dari snapshot terkini
+
+Dashboard Streamlit menjalankan ulang script, membaca CSV dan me-render Plotly untuk setiap
+viewer, padahal data hanya berubah sekali per run. Load menulis laporan sekali per run ke
+output/reports/<run_id>/ (index.html + report.json) dan menyalinnya ke output/reports/latest/,
+sehingga pembaca cukup dilayani sebagai file biasa (web server statis, object storage, atau
+`python -m http.server`) tanpa Python per request.
+
+index.html berdiri sendiri: CSS inline dan chart berupa SVG (peta titik kota + heatmap dari
+tile grid IDW, ranking, breakdown faktor, distribusi), tanpa JavaScript/CDN/plotly.
+
+Contoh:
+    python src/report.py                                # dari output/risk_latest.csv
+    python -m http.server 8000 --directory output/reports
+"""
+
+import argparse
+import html
+import os
+import shutil
+import sys
+from datetime import datetime
+
+import numpy as np
+
+# Tambahkan path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import REPORT_CONFIG, GRID_CONFIG, DEDUP_CONFIG
+from config.rr_tables import RISK_CATEGORIES
+from src import fastjson
+
+LATEST_DIR = 'latest'
+
+CATEGORY_COLORS = {item['category']: item['color'] for item in RISK_CATEGORIES}
+HIGH_RISK = ('Tinggi', 'Sangat Tinggi')
+
+RANKING_COLUMNS = ['city', 'province', 'lat', 'lon', 'rr_total', 'risk_category',
+                   'pm2_5', 'pm10', 'no2', 'temperature', 'humidity', 'wind_speed']
+
+# Faktor breakdown: label -> kolom RR (cuaca: + kolom kategori)
+POLLUTION_FACTORS = {'PM2.5': 'rr_pm2_5', 'PM10': 'rr_pm10', 'NO₂': 'rr_no2', 'SO₂': 'rr_so2', 'O₃': 'rr_o3'}
+WEATHER_FACTORS = {'Suhu': ('rr_temperature', 'temp_category'),
+                   'Kelembapan': ('rr_humidity', 'humidity_category'),
+                   'Angin': ('rr_wind', 'wind_category')}
+
+HISTOGRAM_BINS = 20
+
+# Skala warna heatmap (YlOrRd, sama dengan layer grid di dashboard)
+YLORRD = [(255, 255, 204), (254, 217, 118), (253, 141, 60), (227, 26, 28), (128, 0, 38)]
+
+# Peta: piksel per derajat (proyeksi equirectangular atas rentang GRID_CONFIG)
+MAP_SCALE = 20
+MAP_CELL_DEG = 0.5
+
+
+def _float(value, digits=4):
+    value = float(value)
+    return None if value != value else round(value, digits)
+
+
+def _column(df, name):
+    """Kolom sebagai list Python (kategori -> str, NaN -> None); None jika kolom tidak ada"""
+    if name not in df.columns:
+        return None
+    series = df[name]
+    if series.dtype.kind == 'f':
+        return [_float(value) for value in series.to_numpy()]
+    return [None if value is None or value != value else (value if isinstance(value, (int, float)) else str(value))
+            for value in series.tolist()]
+
+
+def _stats(values):
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    return {'count': int(len(values)), 'mean': _float(values.mean()),
+            'std': _float(values.std(ddof=1)) if len(values) > 1 else None,
+            'min': _float(values.min()), 'q1': _float(q1), 'median': _float(median),
+            'q3': _float(q3), 'iqr': _float(q3 - q1), 'max': _float(values.max())}
+
+
+def build_report(latest, run_id, top_n=None):
+    """
+    Ringkasan snapshot untuk laporan (semua nilai tipe Python, siap di-serialize)
+
+    Args:
+        latest: DataFrame snapshot lengkap (satu baris per kota, kolom output transform)
+        run_id: ID run
+        top_n: Jumlah provinsi di statistik per provinsi (default: REPORT_CONFIG['top_n'])
+
+    Returns:
+        dict: meta, summary, ranking, breakdown, categories, histogram, stats, provinces
+    """
+    top_n = top_n or REPORT_CONFIG['top_n']
+    df = latest[latest['rr_total'].notna()].sort_values('rr_total', ascending=False, kind='stable')
+    rr = df['rr_total'].to_numpy(dtype=float)
+    categories = [str(value) for value in df['risk_category'].tolist()]
+
+    columns = {name: _column(df, name) for name in RANKING_COLUMNS}
+    columns = {name: values for name, values in columns.items() if values is not None}
+    ranking = [dict(zip(columns, values)) for values in zip(*columns.values())]
+    for rank, row in enumerate(ranking, 1):
+        row['rank'] = rank
+
+    breakdown = []
+    factor_columns = {label: _column(df, column) for label, column in POLLUTION_FACTORS.items()}
+    weather_columns = {label: (_column(df, rr_column), _column(df, category))
+                       for label, (rr_column, category) in WEATHER_FACTORS.items()}
+    for i, row in enumerate(ranking):
+        pollution = {label: values[i] for label, values in factor_columns.items() if values is not None}
+        weather = {label: {'rr': values[i], 'category': labels[i] if labels is not None else None}
+                   for label, (values, labels) in weather_columns.items() if values is not None}
+        factors = {**pollution, **{label: item['rr'] for label, item in weather.items()}}
+        factors = {label: value for label, value in factors.items() if value is not None}
+        breakdown.append({'city': row['city'], 'rr_total': row['rr_total'], 'risk_category': row['risk_category'],
+                          'pollution': pollution, 'weather': weather,
+                          'dominant': max(factors, key=factors.get) if factors else None})
+
+    counts = {item['category']: 0 for item in RISK_CATEGORIES}
+    for category in categories:
+        counts[category] = counts.get(category, 0) + 1
+
+    histogram = {'edges': [], 'counts': []}
+    if len(rr):
+        hist, edges = np.histogram(rr, bins=HISTOGRAM_BINS)
+        histogram = {'edges': [_float(edge) for edge in edges], 'counts': hist.tolist()}
+
+    provinces = []
+    if 'province' in df.columns and len(rr):
+        province = df['province'].astype(str).to_numpy()
+        for name in df['province'].astype(str).value_counts().head(top_n).index:
+            provinces.append({'province': name, **_stats(rr[province == name])})
+
+    timestamps = [value for value in _column(df, 'timestamp') or [] if value is not None]
+    rr_version = _column(df, 'rr_version')
+    return {
+        'meta': {
+            'run_id': run_id,
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'data_timestamp': max(timestamps) if timestamps else None,
+            'rr_version': sorted({value for value in rr_version if value is not None}) if rr_version else []
+        },
+        'summary': {
+            'cities': int(len(rr)),
+            'rr_mean': _float(rr.mean()) if len(rr) else None,
+            'rr_max': _float(rr.max()) if len(rr) else None,
+            'rr_min': _float(rr.min()) if len(rr) else None,
+            'high_risk': sum(category in HIGH_RISK for category in categories)
+        },
+        'ranking': ranking,
+        'breakdown': breakdown,
+        'categories': counts,
+        'histogram': histogram,
+        'stats': _stats(rr) if len(rr) else {},
+        'provinces': provinces
+    }
+
+
+def _ramp(t):
+    """Nilai 0..1 -> warna hex YlOrRd"""
+    position = min(max(t, 0.0), 1.0) * (len(YLORRD) - 1)
+    i = min(int(position), len(YLORRD) - 2)
+    frac = position - i
+    rgb = [round(a + (b - a) * frac) for a, b in zip(YLORRD[i], YLORRD[i + 1])]
+    return '#%02x%02x%02x' % tuple(rgb)
+
+
+def _fmt(value, digits=4, suffix=''):
+    return '–' if value is None else f"{value:.{digits}f}{suffix}"
+
+
+def render_map(report, grid=None, layer='rr_total'):
+    """
+    Peta SVG: heatmap grid IDW (di-downsample ke ±MAP_CELL_DEG) + titik kota per kategori
+
+    Args:
+        grid: Hasil interpolation.read_tile (None = tanpa heatmap)
+    """
+    (lat_min, lat_max), (lon_min, lon_max) = GRID_CONFIG['lat_range'], GRID_CONFIG['lon_range']
+    width, height = (lon_max - lon_min) * MAP_SCALE, (lat_max - lat_min) * MAP_SCALE
+
+    def x(lon):
+        return (lon - lon_min) * MAP_SCALE
+
+    def y(lat):
+        return (lat_max - lat) * MAP_SCALE
+
+    parts = [f'<svg class="map" viewBox="0 0 {width:g} {height:g}" xmlns="http://www.w3.org/2000/svg">',
+             f'<rect width="{width:g}" height="{height:g}" fill="#eef3f7"/>']
+
+    legend = ''
+    if grid is not None and layer in grid[3]:
+        header, lats, lons, layers = grid
+        stride = max(1, int(round(MAP_CELL_DEG / header['step'])))
+        values = layers[layer][::stride, ::stride]
+        finite = values[~np.isnan(values)]
+        if finite.size:
+            low, high = float(finite.min()), float(finite.max())
+            span = (high - low) or 1.0
+            size = header['step'] * stride * MAP_SCALE
+            parts.append('<g opacity="0.55">')
+            for i, lat in enumerate(lats[::stride]):
+                for j, lon in enumerate(lons[::stride]):
+                    value = values[i, j]
+                    if value == value:
+                        parts.append(f'<rect x="{x(lon) - size / 2:.1f}" y="{y(lat) - size / 2:.1f}" '
+                                     f'width="{size:.1f}" height="{size:.1f}" fill="{_ramp((value - low) / span)}"/>')
+            parts.append('</g>')
+            legend = (f'<p class="caption">Heatmap IDW {html.escape(layer)}: {low:.3f} '
+                      f'<span class="ramp"></span> {high:.3f} · grid {header["nlat"]}×{header["nlon"]} sel '
+                      f'({header["step"]}°), {header["stations"]} kota, run {html.escape(str(header["run_id"]))}</p>')
+
+    rr_values = [row['rr_total'] for row in report['ranking']]
+    rr_low, rr_high = (min(rr_values), max(rr_values)) if rr_values else (0, 1)
+    # Titik RR terendah digambar dulu supaya kota berisiko tinggi ada di atas
+    for row in reversed(report['ranking']):
+        if row.get('lat') is None or row.get('lon') is None:
+            continue
+        radius = 4 + 6 * ((row['rr_total'] - rr_low) / ((rr_high - rr_low) or 1.0))
+        title = (f"{row['city']} ({row.get('province') or '-'}): RR {row['rr_total']:.4f} · {row['risk_category']}"
+                 f" · PM2.5 {_fmt(row.get('pm2_5'), 1)}")
+        parts.append(f'<circle cx="{x(row["lon"]):.1f}" cy="{y(row["lat"]):.1f}" r="{radius:.1f}" '
+                     f'fill="{CATEGORY_COLORS.get(row["risk_category"], "gray")}" stroke="#333" stroke-width="0.8">'
+                     f'<title>{html.escape(title)}</title></circle>')
+    parts.append('</svg>')
+    return ''.join(parts) + legend
+
+
+def _bars(items, color, width=420, digits=0):
+    """Bar chart horizontal SVG dari list (label, nilai[, warna])"""
+    if not items:
+        return '<p class="caption">Tidak ada data</p>'
+    top = max(item[1] for item in items) or 1
+    row_height, label_width = 18, 150
+    parts = [f'<svg class="bars" viewBox="0 0 {width} {row_height * len(items)}" xmlns="http://www.w3.org/2000/svg">']
+    for i, item in enumerate(items):
+        label, value = item[0], item[1]
+        bar = (width - label_width - 60) * value / top
+        parts.append(f'<text x="{label_width - 6}" y="{i * row_height + 13}" text-anchor="end">{html.escape(label)}</text>'
+                     f'<rect x="{label_width}" y="{i * row_height + 3}" width="{bar:.1f}" height="{row_height - 6}" '
+                     f'fill="{item[2] if len(item) > 2 else color}"/>'
+                     f'<text x="{label_width + bar + 4:.1f}" y="{i * row_height + 13}">{value:.{digits}f}</text>')
+    parts.append('</svg>')
+    return ''.join(parts)
+
+
+STYLE = """
+body{font-family:system-ui,-apple-system,Segoe UI,Roboto,sans-serif;margin:0 auto;max-width:1100px;padding:16px;color:#222}
+h1{font-size:1.5em}h2{margin-top:1.6em;border-bottom:1px solid #ddd;padding-bottom:4px}
+.metrics{display:flex;gap:12px;flex-wrap:wrap}.metric{flex:1;min-width:150px;background:#f6f7f9;border-radius:6px;padding:10px}
+.metric b{display:block;font-size:1.4em}.caption{color:#666;font-size:.85em}
+.map{width:100%;height:auto;border:1px solid #ddd}.bars{width:100%;max-width:560px;font-size:11px}
+table{border-collapse:collapse;width:100%;font-size:.85em}th,td{padding:3px 6px;border-bottom:1px solid #eee;text-align:right}
+th:first-child,td:first-child,td.text{text-align:left}.bar{display:inline-block;height:10px;border-radius:2px}
+.badge{display:inline-block;width:10px;height:10px;border-radius:50%;margin-right:4px;border:1px solid #999}
+.ramp{display:inline-block;width:120px;height:10px;vertical-align:middle;
+background:linear-gradient(to right,#ffffcc,#fed976,#fd8d3c,#e31a1c,#800026)}
+.cols{display:flex;gap:24px;flex-wrap:wrap}.cols>div{flex:1;min-width:320px}
+"""
+
+
+def _badge(category):
+    return (f'<span class="badge" style="background:{CATEGORY_COLORS.get(category, "gray")}"></span>'
+            f'{html.escape(str(category))}')
+
+
+def _table(headers, rows):
+    head = ''.join(f'<th>{html.escape(header)}</th>' for header in headers)
+    body = ''.join('<tr>' + ''.join(f'<td>{cell}</td>' for cell in row) + '</tr>' for row in rows)
+    return f'<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>'
+
+
+def render_html(report, grid=None):
+    """Laporan HTML mandiri (CSS inline, chart SVG) dari hasil build_report"""
+    meta, summary, stats = report['meta'], report['summary'], report['stats']
+    esc = html.escape
+    rr_high = summary['rr_max'] or 1.0
+
+    ranking_rows = [
+        [str(row['rank']), f'<span class="text">{esc(str(row["city"]))}</span>', esc(str(row.get('province') or '-')),
+         f'{row["rr_total"]:.4f} <span class="bar" style="width:{60 * row["rr_total"] / rr_high:.0f}px;'
+         f'background:{CATEGORY_COLORS.get(row["risk_category"], "gray")}"></span>',
+         _badge(row['risk_category']), _fmt(row.get('pm2_5'), 1), _fmt(row.get('pm10'), 1), _fmt(row.get('no2'), 1),
+         _fmt(row.get('temperature'), 1, '°C'), _fmt(row.get('humidity'), 0, '%'), _fmt(row.get('wind_speed'), 2)]
+        for row in report['ranking']
+    ]
+
+    breakdown_rows = []
+    for item in report['breakdown']:
+        weather = ' '.join(f"{esc(label)} {_fmt(value['rr'], 3)} ({esc(str(value['category'] or '-'))})"
+                           for label, value in item['weather'].items())
+        breakdown_rows.append(
+            [esc(str(item['city'])), f'{item["rr_total"]:.4f}', _badge(item['risk_category'])]
+            + [_fmt(item['pollution'].get(label), 3) for label in POLLUTION_FACTORS]
+            + [f'<span class="text">{weather}</span>', esc(str(item['dominant'] or '-'))]
+        )
+
+    categories = [(category, count, CATEGORY_COLORS.get(category, 'gray'))
+                  for category, count in report['categories'].items()]
+    edges, counts = report['histogram']['edges'], report['histogram']['counts']
+    histogram = [(f"{low:.3f}–{high:.3f}", count) for low, high, count in zip(edges, edges[1:], counts)]
+
+    stat_labels = [('Mean', 'mean'), ('Std Dev', 'std'), ('Median', 'median'), ('Q1', 'q1'), ('Q3', 'q3'),
+                   ('IQR', 'iqr'), ('Min', 'min'), ('Max', 'max')]
+    province_rows = [[esc(item['province']), str(item['count'])] + [_fmt(item[key]) for _, key in stat_labels]
+                     for item in report['provinces']]
+
+    metrics = [('Total Kota', str(summary['cities'])), ('RR Rata-rata', _fmt(summary['rr_mean'])),
+               ('RR Tertinggi', _fmt(summary['rr_max'])), ('Kota Risiko Tinggi', str(summary['high_risk']))]
+
+    return f"""<!DOCTYPE html>
+<html lang="id">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Risk Ratio ISPA – run {esc(str(meta['run_id']))}</title>
+<style>{STYLE}</style>
+</head>
+<body>
+<h1>🏥 Risk Ratio ISPA Indonesia</h1>
+<p class="caption">Run {esc(str(meta['run_id']))} · data {esc(str(meta['data_timestamp'] or '-'))} ·
+dibuat {esc(meta['generated_at'])} · tabel RR {esc(', '.join(meta['rr_version']) or '-')} ·
+<a href="report.json">report.json</a></p>
+<div class="metrics">{''.join(f'<div class="metric">{esc(label)}<b>{value}</b></div>' for label, value in metrics)}</div>
+
+<h2>🗺️ Peta Risk Ratio</h2>
+{render_map(report, grid)}
+
+<h2>🏙️ Ranking Kota</h2>
+{_table(['#', 'Kota', 'Provinsi', 'RR Total', 'Kategori', 'PM2.5', 'PM10', 'NO₂', 'Suhu', 'RH', 'Angin (m/s)'],
+        ranking_rows)}
+
+<h2>🔬 Breakdown Faktor</h2>
+{_table(['Kota', 'RR Total', 'Kategori', *POLLUTION_FACTORS, 'Cuaca (RR, kategori)', 'Faktor Dominan'],
+        breakdown_rows)}
+
+<h2>📈 Distribusi Risiko</h2>
+<div class="cols">
+<div><h3>Kategori</h3>{_bars(categories, 'gray')}</div>
+<div><h3>Histogram RR Total</h3>{_bars(histogram, '#636EFA')}</div>
+</div>
+<h3>Statistik Deskriptif</h3>
+{_table([label for label, _ in stat_labels], [[_fmt(stats.get(key)) for _, key in stat_labels]])}
+<h3>RR per Provinsi (Top {len(report['provinces'])})</h3>
+{_table(['Provinsi', 'Kota'] + [label for label, _ in stat_labels], province_rows)}
+</body>
+</html>
+"""
+
+
+def _write_atomic(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def prune_reports(root, keep_runs):
+    """Hapus folder run tertua di luar keep_runs terbaru (nama folder = run_id, urut waktu)"""
+    runs = sorted(name for name in os.listdir(root)
+                  if name != LATEST_DIR and os.path.isdir(os.path.join(root, name)))
+    removed = runs[:max(0, len(runs) - keep_runs)]
+    for name in removed:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    return removed
+
+
+def write_report(latest, run_id, root=None, tile_path=None, keep_runs=None):
+    """
+    Tulis <root>/<run_id>/index.html + report.json dan salinannya di <root>/latest/
+
+    Args:
+        latest: DataFrame snapshot lengkap
+        tile_path: Tile grid IDW untuk heatmap (default: GRID_CONFIG['tile_path'] jika ada)
+        keep_runs: Jumlah folder run yang disimpan (default: REPORT_CONFIG['keep_runs'])
+
+    Returns:
+        str: path index.html run
+    """
+    root = str(root or REPORT_CONFIG['root'])
+    keep_runs = REPORT_CONFIG['keep_runs'] if keep_runs is None else keep_runs
+    tile_path = str(tile_path or GRID_CONFIG['tile_path'])
+    run_id = str(run_id or datetime.now().strftime("%Y%m%d_%H%M%S"))
+
+    grid = None
+    if os.path.exists(tile_path):
+        from src.interpolation import read_tile
+        grid = read_tile(tile_path)
+
+    report = build_report(latest, run_id)
+    files = {'index.html': render_html(report, grid).encode('utf-8'), 'report.json': fastjson.dumps(report)}
+
+    for name in (run_id, LATEST_DIR):
+        directory = os.path.join(root, name)
+        os.makedirs(directory, exist_ok=True)
+        # report.json dulu: index.html latest tidak pernah menunjuk JSON run lama
+        for filename in ('report.json', 'index.html'):
+            _write_atomic(os.path.join(directory, filename), files[filename])
+
+    if keep_runs:
+        prune_reports(root, keep_runs)
+    return os.path.join(root, run_id, 'index.html')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Laporan statis HTML/JSON dari snapshot terkini')
+    parser.add_argument('--input', default=DEDUP_CONFIG['latest_path'],
+                        help='CSV snapshot (default: output/risk_latest.csv)')
+    parser.add_argument('--run-id', default=None, help='Nama folder laporan (default: waktu sekarang)')
+    parser.add_argument('--root', default=REPORT_CONFIG['root'], help='Folder laporan')
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+
+    latest = pd.read_csv(args.input)
+    path = write_report(latest, args.run_id, args.root)
+    print(f"✅ Laporan saved: {path} (salinan: {os.path.join(args.root, LATEST_DIR)})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,437 @@
+"""
+Risk API read-only (HTTP/1.1 di atas asyncio, satu proses)
+
+    GET /risk/latest                          skor terkini semua kota
+    GET /risk/{city}                          skor terkini satu kota
+    GET /risk/history?city=&from=&to=         riwayat satu kota (history store)
+    GET /risk/nearest?lat=&lon=               kota terdekat dari koordinat
+    GET /risk/score?lat=&lon=                 skor on-demand untuk koordinat sembarang
+    GET /risk/cube?by=region&from=&to=        agregat history per wilayah/provinsi/kota/waktu
+
+Jawaban /risk/latest, /risk/{city} dan /risk/nearest dilayani dari snapshot di memori
+(body JSON & ETag sudah jadi), tanpa akses disk. Snapshot diganti utuh (satu assignment)
+saat SimpleETL.load selesai di proses yang sama, atau saat output/risk_latest.csv berubah
+jika API berjalan terpisah dari scheduler. Semua jawaban memakai ETag (If-None-Match → 304).
+/risk/score mengambil data langsung dari API per sel grid (lihat src/point_scoring.py).
+/risk/cube dijawab dari cube agregat history (lihat src/cube.py), filter opsional region,
+province, city, category, hour dan measures (dipisah koma).
+
+Contoh:
+    python src/risk_api.py --port 8080
+    curl -i http://127.0.0.1:8080/risk/Jakarta
+"""
+
+import argparse
+import asyncio
+import glob
+import hashlib
+import math
+import os
+import sys
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit, parse_qs, unquote
+
+import numpy as np
+import pandas as pd
+
+# Tambahkan path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import RISK_API_CONFIG, DEDUP_CONFIG
+from src.etl_pipeline import TRANSFORM_COLUMNS, LOAD_LISTENERS
+from src.history_store import HistoryStore
+from src.metrics import API_REQUESTS, CACHE_REQUESTS
+from src import fastjson
+
+EARTH_RADIUS_KM = 6371.0088
+
+REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 500: 'Internal Server Error', 502: 'Bad Gateway',
+           503: 'Service Unavailable'}
+
+LOCAL_TZ = datetime.now().astimezone().tzinfo
+
+
+def _etag(body):
+    return '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+
+
+def _error(status, message):
+    return status, fastjson.dumps({'error': message}), None
+
+
+def _local_timestamp(value):
+    """Timestamp query string -> naive waktu lokal (history CSV tanpa zona, lihat HistoryStore.read)"""
+    ts = pd.Timestamp(value)
+    return ts.tz_convert(LOCAL_TZ).tz_localize(None) if ts.tzinfo is not None else ts
+
+
+class RiskSnapshot:
+    """
+    Snapshot skor terkini yang sudah di-encode (immutable setelah dibuat)
+
+    Args:
+        df: Observasi terakhir per kota (kolom TRANSFORM_COLUMNS, kolom lain diabaikan)
+        run_id: Run yang menghasilkan snapshot
+    """
+
+    def __init__(self, df, run_id=None):
+        df = df.reindex(columns=TRANSFORM_COLUMNS).sort_values('city').reset_index(drop=True)
+        self.run_id = run_id
+        self.loaded_at = datetime.now().isoformat()
+        self.records = fastjson.to_records(df)
+
+        self.latest = self._encode({'run_id': run_id, 'count': len(self.records), 'data': self.records})
+        self.cities = {record['city'].lower(): self._encode({'run_id': run_id, **record})
+                       for record in self.records}
+
+        self.lat = np.radians(df['lat'].to_numpy(dtype=float))
+        self.lon = np.radians(df['lon'].to_numpy(dtype=float))
+
+    @staticmethod
+    def _encode(payload):
+        body = fastjson.dumps(payload)
+        return body, _etag(body)
+
+    def nearest(self, lat, lon):
+        """
+        Returns:
+            tuple: (record kota terdekat, jarak km) — haversine ke semua kota
+        """
+        lat, lon = math.radians(lat), math.radians(lon)
+        a = (np.sin((self.lat - lat) / 2) ** 2
+             + np.cos(lat) * np.cos(self.lat) * np.sin((self.lon - lon) / 2) ** 2)
+        distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+        i = int(np.nanargmin(distances))
+        return self.records[i], float(distances[i])
+
+
+class RiskAPI:
+    """
+    Handler endpoint + sumber snapshot
+
+    Args:
+        latest_path: Snapshot di disk yang dipantau (default: DEDUP_CONFIG['latest_path'],
+                     fallback output/risk_analysis_* terbaru)
+        store: HistoryStore untuk /risk/history
+        reload_interval: Detik antar pengecekan perubahan file snapshot
+        history_cache_size: Jumlah jawaban /risk/history yang di-cache (LRU)
+        scorer: PointScorer untuk /risk/score (default: dibuat saat request pertama)
+        cube: RiskCube untuk /risk/cube (default: cube milik store, dibuat saat request pertama)
+    """
+
+    def __init__(self, latest_path=None, store=None, reload_interval=None, history_cache_size=None,
+                 scorer=None, cube=None):
+        self.latest_path = str(latest_path or DEDUP_CONFIG['latest_path'])
+        self.store = store or HistoryStore()
+        self.reload_interval = reload_interval or RISK_API_CONFIG['reload_interval']
+        self.history_cache_size = history_cache_size or RISK_API_CONFIG['history_cache_size']
+        self.snapshot = None
+        self.version = 0
+        self._source_mtime = None
+        self._history_cache = OrderedDict()
+        self.scorer = scorer
+        self.cube = cube
+
+    def publish(self, df, run_id=None):
+        """Bangun snapshot baru lalu ganti yang lama (dipanggil dari thread mana pun)"""
+        snapshot = RiskSnapshot(df, run_id)
+        # Satu assignment: request yang sedang berjalan tetap memakai snapshot lama
+        self.snapshot = snapshot
+        self.version += 1
+        return snapshot
+
+    def _source_file(self):
+        if os.path.exists(self.latest_path):
+            return self.latest_path
+        runs = sorted(glob.glob(os.path.join(os.path.dirname(self.latest_path) or '.', 'risk_analysis_*.csv')))
+        return runs[-1] if runs else None
+
+    def reload(self):
+        """
+        Muat ulang snapshot dari disk jika file berubah sejak pengecekan terakhir
+
+        Returns:
+            bool: True jika snapshot diganti
+        """
+        path = self._source_file()
+        if path is None:
+            return False
+        mtime = (path, os.path.getmtime(path))
+        if mtime == self._source_mtime:
+            return False
+        df = pd.read_csv(path)
+        run_id = df['run_id'].astype(str).max() if 'run_id' in df.columns else \
+            os.path.basename(path)[len('risk_analysis_'):-len('.csv')]
+        self.publish(df, run_id)
+        self._source_mtime = mtime
+        return True
+
+    async def watch(self):
+        """Cek perubahan file snapshot secara berkala (di thread executor, di luar hot path)"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                await loop.run_in_executor(None, self.reload)
+            except Exception as e:
+                print(f"⚠️  Reload snapshot gagal: {str(e)}")
+
+    async def handle(self, method, target):
+        """
+        Returns:
+            tuple: (status, body bytes, etag atau None)
+        """
+        if method not in ('GET', 'HEAD'):
+            return _error(405, 'Hanya GET/HEAD')
+
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.strip('/').split('/')]
+        if len(parts) != 2 or parts[0] != 'risk':
+            return _error(404, 'Endpoint tidak dikenal')
+
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        endpoint = parts[1]
+        if endpoint == 'score':
+            return await self._score(query)
+        if endpoint == 'cube':
+            return await self._cube(query)
+
+        snapshot = self.snapshot
+        if snapshot is None:
+            return _error(503, 'Snapshot belum tersedia (belum ada run ETL)')
+
+        if endpoint == 'latest':
+            return (200, *snapshot.latest)
+        if endpoint == 'nearest':
+            return self._nearest(snapshot, query)
+        if endpoint == 'history':
+            return await self._history(snapshot, query)
+
+        city = snapshot.cities.get(endpoint.lower())
+        if city is None:
+            return _error(404, f"Kota tidak dikenal: {endpoint}")
+        return (200, *city)
+
+    def _nearest(self, snapshot, query):
+        lat, lon = _coordinates(query)
+        if lat is None:
+            return _error(400, 'Parameter lat & lon wajib berupa angka dalam jangkauan')
+        record, distance = snapshot.nearest(lat, lon)
+        body = fastjson.dumps({'run_id': snapshot.run_id, 'distance_km': round(distance, 3), **record})
+        return 200, body, _etag(body)
+
+    async def _score(self, query):
+        lat, lon = _coordinates(query)
+        if lat is None:
+            return _error(400, 'Parameter lat & lon wajib berupa angka dalam jangkauan')
+        if self.scorer is None:
+            from src.point_scoring import PointScorer
+            self.scorer = PointScorer()
+        try:
+            result = await self.scorer.score_async(lat, lon)
+        except Exception as e:
+            return _error(502, f"Gagal mengambil data upstream: {str(e)}")
+        body = fastjson.dumps(result)
+        return 200, body, _etag(body)
+
+    async def _cube(self, query):
+        if self.cube is None:
+            from src.cube import RiskCube
+            self.cube = RiskCube(self.store.root)
+        filters = {name: query.get(name) for name in ('measures', 'region', 'province', 'city', 'category', 'hour')}
+        by = query.get('by', 'region')
+        loop = asyncio.get_running_loop()
+        try:
+            df = await loop.run_in_executor(None, lambda: self.cube.query(
+                by, start=query.get('from'), end=query.get('to'), **filters))
+        except ValueError as e:
+            return _error(400, str(e))
+        body = fastjson.dumps({'by': [dim.strip() for dim in by.split(',') if dim.strip()],
+                               'from': query.get('from'), 'to': query.get('to'),
+                               'count': len(df), 'data': fastjson.to_records(df)})
+        return 200, body, _etag(body)
+
+    async def _history(self, snapshot, query):
+        city = query.get('city')
+        if not city:
+            return _error(400, 'Parameter city wajib')
+        name = next((record['city'] for record in snapshot.records if record['city'].lower() == city.lower()), city)
+        try:
+            end = _local_timestamp(query['to']) if query.get('to') else None
+            start = _local_timestamp(query['from']) if query.get('from') else \
+                (end or pd.Timestamp(datetime.now())) - timedelta(days=RISK_API_CONFIG['history_default_days'])
+        except ValueError:
+            return _error(400, 'Format from/to tidak valid (ISO 8601)')
+
+        # Versi snapshot ikut di key: run baru (append ke history) otomatis membatalkan cache
+        key = (self.version, name, start, end)
+        cached = self._history_cache.get(key)
+        if cached is not None:
+            self._history_cache.move_to_end(key)
+            CACHE_REQUESTS.inc(cache='risk_history', result='hit')
+            return (200, *cached)
+        CACHE_REQUESTS.inc(cache='risk_history', result='miss')
+
+        loop = asyncio.get_running_loop()
+        df = await loop.run_in_executor(None, lambda: self.store.read(start=start, end=end, cities=[name]))
+        body = fastjson.dumps({'city': name, 'from': start.isoformat(), 'to': end.isoformat() if end else None,
+                               'count': len(df), 'data': fastjson.to_records(df)})
+        cached = self._history_cache[key] = (body, _etag(body))
+        while len(self._history_cache) > self.history_cache_size:
+            self._history_cache.popitem(last=False)
+        return (200, *cached)
+
+
+def _coordinates(query):
+    """(lat, lon) dari query string, atau (None, None) jika tidak valid"""
+    try:
+        lat, lon = float(query['lat']), float(query['lon'])
+    except (KeyError, ValueError):
+        return None, None
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None, None
+    return lat, lon
+
+
+def _matches(if_none_match, etag):
+    if if_none_match is None:
+        return False
+    candidates = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+    return etag in candidates or '*' in candidates
+
+
+def _endpoint_label(target):
+    # Label metric terbatas (nama kota tidak dijadikan label)
+    parts = urlsplit(target).path.strip('/').split('/')
+    if len(parts) != 2 or parts[0] != 'risk':
+        return 'other'
+    return parts[1] if parts[1] in ('latest', 'history', 'nearest', 'score', 'cube') else 'city'
+
+
+async def _serve_connection(api, reader, writer, idle_timeout=15):
+    """Satu koneksi HTTP/1.1 (keep-alive, request diproses berurutan)"""
+    try:
+        while True:
+            try:
+                request_line = await asyncio.wait_for(reader.readline(), idle_timeout)
+            except asyncio.TimeoutError:
+                break
+            if not request_line.strip():
+                break
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            if headers.get('content-length'):
+                await reader.readexactly(int(headers['content-length']))
+
+            try:
+                method, target, version = request_line.decode('latin-1').split()
+            except ValueError:
+                status, body, etag = _error(400, 'Request line tidak valid')
+                method, target, version = 'GET', '/', 'HTTP/1.0'
+            else:
+                try:
+                    status, body, etag = await api.handle(method, target)
+                except Exception as e:
+                    # Bug handler tidak boleh memutus koneksi tanpa respons
+                    print(f"⚠️  Handler {method} {target} gagal: {type(e).__name__}: {str(e)}")
+                    status, body, etag = _error(500, 'Internal server error')
+
+            if status == 200 and _matches(headers.get('if-none-match'), etag):
+                status, body = 304, b''
+
+            keep_alive = headers.get('connection', '').lower() != 'close' and \
+                (version == 'HTTP/1.1' or headers.get('connection', '').lower() == 'keep-alive')
+            head = [f"HTTP/1.1 {status} {REASONS[status]}",
+                    f"Content-Length: {len(body)}",
+                    "Content-Type: application/json; charset=utf-8",
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+            if etag is not None and status in (200, 304):
+                head.append(f"ETag: {etag}")
+                head.append(f"Cache-Control: max-age={RISK_API_CONFIG['max_age']}")
+            writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1'))
+            if method != 'HEAD':
+                writer.write(body)
+            await writer.drain()
+
+            API_REQUESTS.inc(endpoint=_endpoint_label(target), status=str(status))
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(api, host, port, ready=None):
+    """Jalankan server sampai dibatalkan; `ready` (threading.Event) diset setelah bind"""
+    server = await asyncio.start_server(lambda r, w: _serve_connection(api, r, w), host, port)
+    api.address = server.sockets[0].getsockname()[:2]
+    watcher = asyncio.ensure_future(api.watch())
+    if ready is not None:
+        ready.set()
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        watcher.cancel()
+
+
+def start_risk_api(host=None, port=None, api=None):
+    """
+    Menjalankan risk API di background thread (event loop sendiri) dan mendaftarkan
+    api.publish ke LOAD_LISTENERS supaya snapshot diganti setiap SimpleETL.load selesai
+
+    Returns:
+        RiskAPI: instance yang berjalan (alamat bind di api.address)
+    """
+    api = api or RiskAPI()
+    api.reload()
+    LOAD_LISTENERS.append(api.publish)
+
+    ready = threading.Event()
+    errors = []
+
+    def run():
+        try:
+            asyncio.run(serve(api, host or RISK_API_CONFIG['host'], RISK_API_CONFIG['port'] if port is None else port, ready))
+        except OSError as e:
+            errors.append(e)
+            ready.set()
+
+    threading.Thread(target=run, name='risk-api', daemon=True).start()
+    ready.wait()
+    if errors:
+        LOAD_LISTENERS.remove(api.publish)
+        raise errors[0]
+    return api
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Risk API read-only')
+    parser.add_argument('--host', default=RISK_API_CONFIG['host'])
+    parser.add_argument('--port', type=int, default=RISK_API_CONFIG['port'])
+    args = parser.parse_args(argv)
+
+    api = RiskAPI()
+    if api.reload():
+        print(f"📦 Snapshot dimuat: {len(api.snapshot.records)} kota (run {api.snapshot.run_id})")
+    else:
+        print("⚠️  Belum ada snapshot; API menjawab 503 sampai run ETL pertama selesai")
+    print(f"🌐 Risk API: http://{args.host}:{args.port}/risk/latest")
+    try:
+        asyncio.run(serve(api, args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n🛑 Risk API stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""
+Scenario engine: evaluasi banyak tabel RR alternatif terhadap history sekaligus
+
+Satu skenario = override atas tabel baseline:
+    {"name": "no2_max_rh65",
+     "pollution": {"NO2": "max"},                       # angka, atau "min"/"median"/"max" dari range
+     "weather": {"humidity": {"edges": [40, 60, 65],     # cut-off (lihat WEATHER_BINS)
+                              "rr": {"Tinggi": 1.05}}}}  # RR per kategori
+
+Di model multiplikatif RR polutan konstan dan RR cuaca hanya bergantung pada kategori,
+sehingga setiap record history cukup diwakili oleh (kota, kategori baseline, bin suhu,
+bin kelembaban, bin angin). Record dikelompokkan sekali per kombinasi cut-off yang berbeda
+(np.bincount), lalu semua skenario dievaluasi bersamaan sebagai broadcast
+(skenario × kelompok) — hasilnya identik dengan menghitung ulang setiap record.
+
+Contoh:
+    python src/scenarios.py --preset range
+    python src/scenarios.py --sweep NO2=1.05:1.15:5 --sweep humidity.edges.2=60:75:16
+    python src/scenarios.py --file scenarios.json --start 2025-01-01 --end 2025-12-31
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Tambahkan path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import SCENARIO_CONFIG
+from config.rr_tables import POLLUTION_RR, WEATHER_BINS, RISK_CATEGORIES, CATEGORY_LEVELS
+from src.history_store import HistoryStore
+from src import fastjson
+
+# Kolom history untuk tiap parameter cuaca
+WEATHER_COLUMNS = {'temperature': 'temperature', 'humidity': 'humidity', 'wind_speed': 'wind_speed'}
+RISK_LEVELS = CATEGORY_LEVELS['risk_category']
+UNKNOWN_RISK = len(RISK_LEVELS) - 1
+BASELINE = {'name': 'baseline'}
+
+
+def _bins(values, edges):
+    """Index kategori (aturan WEATHER_BINS); NaN → len(edges) + 1 (Unknown)"""
+    codes = (values >= edges[0]).astype(np.int8)
+    for edge in edges[1:]:
+        codes += values > edge
+    codes[np.isnan(values)] = len(edges) + 1
+    return codes
+
+
+def _risk_codes(rr_total):
+    """Kode RISK_LEVELS untuk rr_total (sudah dibulatkan seperti calculate_total_rr_batch)"""
+    conditions = [(rr_total >= cat['min']) & (rr_total < cat['max']) for cat in RISK_CATEGORIES]
+    return np.select(conditions, [RISK_LEVELS.index(cat['category']) for cat in RISK_CATEGORIES],
+                     default=UNKNOWN_RISK).astype(np.int8)
+
+
+def resolve(scenarios):
+    """
+    Ubah daftar skenario menjadi array parameter (satu baris per skenario)
+
+    Returns:
+        tuple: (array produk RR polutan (S,), dict parameter -> (edges (S, E), rr (S, E + 2)))
+            kolom rr terakhir adalah kategori Unknown (RR 1.0)
+    """
+    S = len(scenarios)
+    pollution = np.ones(S)
+    weather = {}
+    for parameter, base in WEATHER_BINS.items():
+        edges = np.tile(np.asarray(base['edges'], dtype=float), (S, 1))
+        rr = np.tile(np.asarray(base['rr'] + [1.0], dtype=float), (S, 1))
+        weather[parameter] = (edges, rr)
+
+    for s, scenario in enumerate(scenarios):
+        name = scenario.get('name', f"scenario_{s}")
+        overrides = scenario.get('pollution', {})
+        unknown = set(overrides) - set(POLLUTION_RR)
+        if unknown:
+            raise ValueError(f"{name}: polutan tidak dikenal {sorted(unknown)}")
+        for pollutant, table in POLLUTION_RR.items():
+            value = overrides.get(pollutant, table['median'])
+            if isinstance(value, str):
+                value = {'min': table['range'][0], 'median': table['median'], 'max': table['range'][1]}[value]
+            pollution[s] *= value
+
+        for parameter, override in scenario.get('weather', {}).items():
+            if parameter not in WEATHER_BINS:
+                raise ValueError(f"{name}: parameter cuaca tidak dikenal '{parameter}'")
+            edges, rr = weather[parameter]
+            categories = WEATHER_BINS[parameter]['categories']
+            if 'edges' in override:
+                if len(override['edges']) != edges.shape[1] or np.any(np.diff(override['edges']) < 0):
+                    raise ValueError(f"{name}: {parameter}.edges harus {edges.shape[1]} nilai naik")
+                edges[s] = override['edges']
+            rr_override = override.get('rr', {})
+            if isinstance(rr_override, (list, tuple)):
+                rr_override = dict(zip(categories, rr_override))
+            for category, value in rr_override.items():
+                if category not in categories:
+                    raise ValueError(f"{name}: kategori {parameter} tidak dikenal '{category}'")
+                rr[s, categories.index(category)] = value
+
+    return pollution, weather
+
+
+class ScenarioEngine:
+    """
+    Evaluasi skenario RR terhadap record history (suhu, kelembaban, angin per kota)
+
+    Args:
+        history: DataFrame dengan kolom city, temperature, humidity, wind_speed
+    """
+
+    def __init__(self, history):
+        self.cities, city_codes = np.unique(history['city'].to_numpy(dtype=str), return_inverse=True)
+        self.values = {parameter: pd.to_numeric(history[column], errors='coerce').to_numpy(dtype=float)
+                       for parameter, column in WEATHER_COLUMNS.items()}
+        self.rows = len(history)
+        self._bin_cache = {}
+        self._group_cache = {}
+
+        # Kategori baseline per record (dari nilai cuaca, bukan kolom risk_category yang
+        # mungkin dihitung dengan tabel lama)
+        pollution, weather = resolve([BASELINE])
+        rr_total = np.full(self.rows, pollution[0])
+        for parameter, (edges, rr) in weather.items():
+            rr_total = rr_total * rr[0][self._parameter_bins(parameter, edges[0])]
+        self._prefix = city_codes.astype(np.int64) * len(RISK_LEVELS) + _risk_codes(np.round(rr_total, 4))
+
+    def _parameter_bins(self, parameter, edges):
+        key = (parameter, tuple(edges))
+        if key not in self._bin_cache:
+            self._bin_cache[key] = _bins(self.values[parameter], edges)
+        return self._bin_cache[key]
+
+    def _groups(self, edges_key):
+        """
+        Jumlah record per (kota, kategori baseline, bin suhu, bin kelembaban, bin angin)
+        untuk satu kombinasi cut-off
+
+        Returns:
+            ndarray: (kota, kategori baseline, kelompok bin) int64
+        """
+        if edges_key not in self._group_cache:
+            key = self._prefix
+            for parameter, edges in zip(WEATHER_BINS, edges_key):
+                key = key * (len(edges) + 2) + self._parameter_bins(parameter, edges)
+            sizes = [len(self.cities), len(RISK_LEVELS)] + [len(edges) + 2 for edges in edges_key]
+            counts = np.bincount(key, minlength=int(np.prod(sizes)))
+            self._group_cache[edges_key] = counts.reshape(len(self.cities), len(RISK_LEVELS), -1)
+        return self._group_cache[edges_key]
+
+    def evaluate(self, scenarios):
+        """
+        Returns:
+            dict: names (S,), cities (C,), hours (C,), mean_rr (S, C) dan
+                transitions (S, C, kategori baseline, kategori skenario) jumlah record
+        """
+        pollution, weather = resolve(scenarios)
+        S = len(scenarios)
+
+        # RR total per skenario untuk setiap kombinasi bin: (S, n_suhu × n_rh × n_angin)
+        rr_grid = pollution.reshape(S, 1)
+        for parameter in WEATHER_BINS:
+            rr = weather[parameter][1]
+            rr_grid = (rr_grid[:, :, None] * rr[:, None, :]).reshape(S, -1)
+        rr_grid = np.round(rr_grid, 4)
+        onehot = np.eye(len(RISK_LEVELS), dtype=np.int64)[_risk_codes(rr_grid)]
+
+        mean_rr = np.empty((S, len(self.cities)))
+        transitions = np.empty((S, len(self.cities), len(RISK_LEVELS), len(RISK_LEVELS)), dtype=np.int64)
+        edges_keys = [tuple(tuple(weather[parameter][0][s]) for parameter in WEATHER_BINS) for s in range(S)]
+        hours = None
+        for edges_key in dict.fromkeys(edges_keys):
+            members = np.array([s for s in range(S) if edges_keys[s] == edges_key])
+            counts = self._groups(edges_key)
+            by_group = counts.sum(axis=1)
+            hours = by_group.sum(axis=1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean_rr[members] = (rr_grid[members] @ by_group.T) / hours
+            transitions[members] = np.einsum('cbg,sgq->scbq', counts, onehot[members])
+
+        return {
+            'names': [scenario.get('name', f"scenario_{s}") for s, scenario in enumerate(scenarios)],
+            'cities': self.cities, 'hours': hours,
+            'mean_rr': mean_rr, 'transitions': transitions
+        }
+
+
+def summarize(result):
+    """
+    Tabel per (skenario, kota): jam per kategori, pergeseran kategori vs baseline
+    (skenario pertama) dan selisih rata-rata RR total
+    """
+    transitions = result['transitions']
+    known = UNKNOWN_RISK
+    upper = np.triu(np.ones((known, known), dtype=bool), k=1)
+    up = (transitions[:, :, :known, :known] * upper).sum(axis=(2, 3))
+    down = (transitions[:, :, :known, :known] * upper.T).sum(axis=(2, 3))
+    by_category = transitions.sum(axis=2)
+
+    S, C = result['mean_rr'].shape
+    df = pd.DataFrame({
+        'scenario': np.repeat(result['names'], C),
+        'city': np.tile(result['cities'], S),
+        'hours': np.tile(result['hours'], S),
+        'mean_rr_total': result['mean_rr'].ravel().round(4),
+        'delta_rr_total': (result['mean_rr'] - result['mean_rr'][:1]).ravel().round(4),
+        'hours_up': up.ravel(),
+        'hours_down': down.ravel()
+    })
+    for i, category in enumerate(RISK_LEVELS):
+        df[f"hours_{category.lower().replace(' ', '_')}"] = by_category[:, :, i].ravel()
+    return df
+
+
+def _parse_values(spec):
+    if ':' in spec:
+        start, stop, num = spec.split(':')
+        return [round(float(v), 6) for v in np.linspace(float(start), float(stop), int(num))]
+    return [v if v in ('min', 'median', 'max') else float(v) for v in spec.split(',')]
+
+
+def sweep(specs, max_scenarios=None):
+    """
+    Skenario dari produk kartesius sweep, mis. ['NO2=1.05:1.15:5', 'humidity.edges.2=60:75:16',
+    'humidity.rr.Tinggi=1.00,1.05', 'PM2.5=min,max']
+
+    Returns:
+        list: dict skenario
+    """
+    axes = []
+    for spec in specs:
+        path, values = spec.split('=', 1)
+        axes.append([(path, value) for value in _parse_values(values)])
+
+    scenarios = []
+    for combination in itertools.product(*axes):
+        scenario = {'name': ','.join(f"{path}={value}" for path, value in combination),
+                    'pollution': {}, 'weather': {}}
+        for path, value in combination:
+            parts = path.split('.')
+            if len(parts) == 1:
+                scenario['pollution'][parts[0]] = value
+                continue
+            parameter, kind, key = parts
+            if parameter not in WEATHER_BINS or kind not in ('edges', 'rr'):
+                raise ValueError(f"Sweep tidak dikenal: {path} (format <polutan> | <cuaca>.edges.<i> | <cuaca>.rr.<kategori>)")
+            override = scenario['weather'].setdefault(parameter, {})
+            if kind == 'edges':
+                override.setdefault('edges', list(WEATHER_BINS[parameter]['edges']))[int(key)] = value
+            else:
+                override.setdefault('rr', {})[key] = value
+        scenarios.append(scenario)
+
+    limit = max_scenarios or SCENARIO_CONFIG['max_scenarios']
+    if len(scenarios) > limit:
+        raise ValueError(f"Sweep menghasilkan {len(scenarios)} skenario (batas {limit}, SCENARIO_MAX_SCENARIOS)")
+    return scenarios
+
+
+def range_preset():
+    """Setiap polutan di ujung bawah/atas range-nya, plus semua polutan di ujung bawah/atas"""
+    scenarios = []
+    for pollutant in POLLUTION_RR:
+        for end in ('min', 'max'):
+            scenarios.append({'name': f"{pollutant}_{end}", 'pollution': {pollutant: end}})
+    for end in ('min', 'max'):
+        scenarios.append({'name': f"all_{end}", 'pollution': {pollutant: end for pollutant in POLLUTION_RR}})
+    return scenarios
+
+
+def print_summary(df, top=10):
+    totals = df.groupby('scenario', sort=False)[['hours', 'hours_up', 'hours_down']].sum()
+    totals['mean_delta_rr'] = df.groupby('scenario', sort=False)['delta_rr_total'].mean()
+    totals['shifted_pct'] = (totals['hours_up'] + totals['hours_down']) / totals['hours'] * 100
+    print(f"\n   {'Skenario':40s} {'Δ RR':>8s} {'Naik':>10s} {'Turun':>10s} {'Bergeser':>9s}")
+    for name, row in totals.sort_values('shifted_pct', ascending=False).head(top).iterrows():
+        print(f"   {name[:40]:40s} {row['mean_delta_rr']:+8.4f} {int(row['hours_up']):10,d} "
+              f"{int(row['hours_down']):10,d} {row['shifted_pct']:8.1f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Scenario & sensitivity sweep tabel RR terhadap history')
+    parser.add_argument('--file', help='File JSON berisi list skenario')
+    parser.add_argument('--sweep', action='append', default=[], help="Sweep parameter, mis. NO2=1.05:1.15:5 (bisa berulang)")
+    parser.add_argument('--preset', choices=['range'], help='range: setiap polutan di ujung range-nya')
+    parser.add_argument('--start', help='Awal history (default: SCENARIO_HISTORY_DAYS hari terakhir)')
+    parser.add_argument('--end', help='Akhir history')
+    parser.add_argument('--cities', help='Daftar kota dipisah koma')
+    parser.add_argument('--output', default='output', help='Folder hasil CSV')
+    args = parser.parse_args(argv)
+
+    scenarios = [BASELINE]
+    if args.file:
+        with open(args.file, 'rb') as f:
+            scenarios += fastjson.loads(f.read())
+    if args.preset == 'range':
+        scenarios += range_preset()
+    if args.sweep:
+        scenarios += sweep(args.sweep)
+    if len(scenarios) == 1:
+        parser.error("Tidak ada skenario (pakai --file, --sweep atau --preset)")
+
+    start = args.start or (datetime.now() - timedelta(days=SCENARIO_CONFIG['history_days'])).isoformat()
+    cities = args.cities.split(',') if args.cities else None
+    history = HistoryStore().read(start=start, end=args.end, cities=cities, columns=list(WEATHER_COLUMNS.values()))
+    if history.empty:
+        print("❌ History kosong untuk rentang ini (jalankan ETL/backfill dulu)")
+        return 1
+
+    began = time.perf_counter()
+    df = summarize(ScenarioEngine(history).evaluate(scenarios))
+    elapsed = time.perf_counter() - began
+
+    print("\n" + "="*70)
+    print(f"🔀 SCENARIO SWEEP - {len(scenarios) - 1} skenario × {len(history):,} records ({elapsed:.2f}s)")
+    print("="*70)
+    print_summary(df)
+
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"scenarios_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+    df.to_csv(path, index=False)
+    print(f"\n   💾 {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
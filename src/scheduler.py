@@ -14,6 +14,12 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.etl_pipeline import SimpleETL
+from src.metrics import (
+    RUNS_STARTED, RUNS_SUCCEEDED, RUNS_FAILED, RUN_DURATION, LAST_SUCCESS,
+    start_metrics_server
+)
+from config.config import (METRICS_CONFIG, RETRY_FAILED_DELAY_MINUTES, MAINTENANCE_CONFIG, RISK_API_CONFIG,
+                           PROFILE_CONFIG)
 
 def run_etl_job():
     """Fungsi yang akan dijalankan setiap 1 jam"""
@@ -21,30 +27,101 @@ def run_etl_job():
     print(f"🔄 SCHEDULED ETL RUN - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("="*70)
     
+    RUNS_STARTED.inc()
+    start = time.perf_counter()
+    
     try:
         # Jalankan ETL pipeline
         etl = SimpleETL()
         result = etl.run(output_format='both')
         
         if result is not None:
+            RUNS_SUCCEEDED.inc()
+            LAST_SUCCESS.set(time.time())
             print("\n✅ Scheduled ETL job completed successfully!")
         else:
+            RUNS_FAILED.inc()
             print("\n❌ Scheduled ETL job failed!")
             
     except Exception as e:
+        RUNS_FAILED.inc()
         print(f"\n❌ Error in scheduled job: {str(e)}")
+        etl = None
+    finally:
+        RUN_DURATION.observe(time.perf_counter() - start)
+    
+    # Jadwalkan retry sekali jalan untuk kota/sumber yang gagal (output run yang sama dilengkapi)
+    if etl is not None and etl.failed_pairs() and RETRY_FAILED_DELAY_MINUTES > 0:
+        schedule.every(RETRY_FAILED_DELAY_MINUTES).minutes.do(retry_failed_job, etl)
+        print(f"\n🔁 {len(etl.failed_pairs())} fetch gagal akan dicoba ulang dalam {RETRY_FAILED_DELAY_MINUTES} menit")
     
     print(f"\n⏰ Next run scheduled at: {datetime.now().replace(hour=(datetime.now().hour + 1) % 24, minute=0, second=0)}")
     print("="*70)
 
+def retry_failed_job(etl):
+    """Retry sekali jalan untuk pasangan (kota, sumber) yang gagal pada run sebelumnya"""
+    print("\n" + "="*70)
+    print(f"🔁 SCHEDULED RETRY (run {etl.run_id}) - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("="*70)
+    
+    try:
+        etl.retry_failed(output_format='both')
+    except Exception as e:
+        print(f"\n❌ Error in retry job: {str(e)}")
+    
+    return schedule.CancelJob
+
+def run_maintenance_job():
+    """Compaction, downsampling & retensi harian (off-peak)"""
+    from src.maintenance import Maintenance
+    
+    try:
+        Maintenance().run()
+    except Exception as e:
+        print(f"\n❌ Error in maintenance job: {str(e)}")
+
+def run_recompute_job():
+    """Hitung ulang skor history setelah tabel RR berubah (sekali jalan)"""
+    from src.recompute import Recompute
+    
+    try:
+        Recompute().run()
+    except Exception as e:
+        print(f"\n❌ Error in recompute job: {str(e)}")
+    
+    return schedule.CancelJob
+
 def main():
     """Main scheduler function"""
     print("\n" + "="*70)
     print("🚀 ETL PIPELINE SCHEDULER")
     print("="*70)
     print("📅 Schedule: Every 1 hour")
+    if MAINTENANCE_CONFIG['enabled']:
+        print(f"🧰 Maintenance: setiap hari pukul {MAINTENANCE_CONFIG['at']}")
+    if PROFILE_CONFIG['enabled']:
+        # SimpleETL membaca PROFILE_CONFIG sendiri; setiap run & retry menulis satu profil
+        print(f"🔬 Profiling: {PROFILE_CONFIG['mode']} → {PROFILE_CONFIG['dir']}/ ({PROFILE_CONFIG['keep_last']} terakhir)")
     print(f"⏰ Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("="*70)
+    
+    # Endpoint metrics untuk monitoring (Prometheus)
+    if METRICS_CONFIG['enabled']:
+        try:
+            start_metrics_server(METRICS_CONFIG['host'], METRICS_CONFIG['port'])
+            print(f"📈 Metrics: http://{METRICS_CONFIG['host']}:{METRICS_CONFIG['port']}/metrics")
+        except OSError as e:
+            print(f"⚠️  Metrics server tidak bisa dijalankan: {str(e)}")
+    
+    # Risk API read-only; snapshot diganti setiap run ETL selesai
+    if RISK_API_CONFIG['enabled']:
+        try:
+            from src.risk_api import start_risk_api
+            start_risk_api()
+            print(f"🌐 Risk API: http://{RISK_API_CONFIG['host']}:{RISK_API_CONFIG['port']}/risk/latest")
+        except OSError as e:
+            print(f"⚠️  Risk API tidak bisa dijalankan: {str(e)}")
+    
     print("\n💡 Tips:")
     print("   - Tekan Ctrl+C untuk stop scheduler")
     print("   - Scheduler akan terus berjalan di background")
@@ -58,6 +135,16 @@ def main():
     # Schedule untuk setiap 1 jam
     schedule.every(1).hours.do(run_etl_job)
     
+    # Tabel RR berubah sejak history ditulis → hitung ulang record basi (sekali, setelah run awal)
+    from src.recompute import Recompute
+    if Recompute().pending():
+        print("\n♻️  History berisi skor dari tabel RR lama, recompute dijadwalkan")
+        schedule.every(1).minutes.do(run_recompute_job)
+    
+    # Compaction & retensi sekali sehari di jam sepi
+    if MAINTENANCE_CONFIG['enabled']:
+        schedule.every().day.at(MAINTENANCE_CONFIG['at']).do(run_maintenance_job)
+    
     # Alternative: Bisa juga setiap X menit untuk testing
     # schedule.every(5).minutes.do(run_etl_job)  # Setiap 5 menit
     
@@ -0,0 +1,228 @@
+"""
+Data sintetis berbentuk respons API asli (OpenWeatherMap Air Pollution & WeatherAPI)
+Dipakai untuk benchmark dan run offline tanpa memakai kuota API
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+
+from config.rr_tables import INDONESIAN_CITIES
+
+
+def _rng_for(lat, lon, seed=None):
+    # Seed deterministik per koordinat supaya payload yang sama bisa direproduksi
+    if seed is None:
+        seed = hash((round(lat, 4), round(lon, 4))) & 0xFFFFFFFF
+    return random.Random(seed)
+
+
+def make_pollution_payload(lat, lon, seed=None, dt=None):
+    """
+    Membuat payload seperti respons /data/2.5/air_pollution OpenWeatherMap
+
+    Args:
+        lat, lon: Koordinat lokasi
+        seed: Seed random (opsional, default deterministik dari koordinat)
+        dt: Unix timestamp pengukuran (default: sekarang)
+
+    Returns:
+        dict: payload JSON
+    """
+    rng = _rng_for(lat, lon, seed)
+    pm2_5 = round(rng.uniform(5, 120), 2)
+    return {
+        'coord': {'lon': lon, 'lat': lat},
+        'list': [{
+            'main': {'aqi': min(5, 1 + int(pm2_5 // 25))},
+            'components': {
+                'co': round(rng.uniform(200, 2500), 2),
+                'no': round(rng.uniform(0, 20), 2),
+                'no2': round(rng.uniform(1, 80), 2),
+                'o3': round(rng.uniform(5, 150), 2),
+                'so2': round(rng.uniform(1, 60), 2),
+                'pm2_5': pm2_5,
+                'pm10': round(pm2_5 * rng.uniform(1.1, 1.8), 2),
+                'nh3': round(rng.uniform(0, 30), 2)
+            },
+            'dt': int(dt if dt is not None else time.time())
+        }]
+    }
+
+
+def make_weather_payload(lat, lon, seed=None, epoch=None):
+    """
+    Membuat payload seperti respons /v1/current.json?aqi=yes WeatherAPI
+
+    Args:
+        lat, lon: Koordinat lokasi
+        seed: Seed random (opsional, default deterministik dari koordinat)
+        epoch: Unix timestamp observasi (default: sekarang)
+
+    Returns:
+        dict: payload JSON
+    """
+    rng = _rng_for(lat, lon, None if seed is None else seed + 1)
+    epoch = int(epoch if epoch is not None else time.time())
+    local = datetime.fromtimestamp(epoch).strftime('%Y-%m-%d %H:%M')
+    temp_c = round(rng.uniform(18, 36), 1)
+    wind_kph = round(rng.uniform(0, 25), 1)
+    pressure_mb = float(rng.randint(1002, 1016))
+    pm2_5 = round(rng.uniform(5, 120), 2)
+    return {
+        'location': {
+            'name': f'{lat:.2f},{lon:.2f}',
+            'region': '',
+            'country': 'Indonesia',
+            'lat': lat,
+            'lon': lon,
+            'tz_id': 'Asia/Jakarta',
+            'localtime_epoch': epoch,
+            'localtime': local
+        },
+        'current': {
+            'last_updated_epoch': epoch,
+            'last_updated': local,
+            'temp_c': temp_c,
+            'temp_f': round(temp_c * 9 / 5 + 32, 1),
+            'is_day': 1,
+            'condition': {'text': 'Partly cloudy', 'icon': '//cdn.weatherapi.com/weather/64x64/day/116.png', 'code': 1003},
+            'wind_mph': round(wind_kph / 1.609, 1),
+            'wind_kph': wind_kph,
+            'wind_degree': rng.randint(0, 359),
+            'wind_dir': rng.choice(['N', 'NE', 'E', 'SE', 'S', 'SW', 'W', 'NW']),
+            'pressure_mb': pressure_mb,
+            'pressure_in': round(pressure_mb * 0.02953, 2),
+            'precip_mm': round(rng.uniform(0, 5), 1),
+            'precip_in': 0.0,
+            'humidity': rng.randint(35, 98),
+            'cloud': rng.randint(0, 100),
+            'feelslike_c': temp_c + 2,
+            'vis_km': 10.0,
+            'uv': round(rng.uniform(0, 11), 1),
+            'gust_kph': round(wind_kph * 1.4, 1),
+            'air_quality': {
+                'co': round(rng.uniform(200, 2500), 1),
+                'no2': round(rng.uniform(1, 80), 1),
+                'o3': round(rng.uniform(5, 150), 1),
+                'so2': round(rng.uniform(1, 60), 1),
+                'pm2_5': pm2_5,
+                'pm10': round(pm2_5 * rng.uniform(1.1, 1.8), 1),
+                'us-epa-index': min(6, 1 + int(pm2_5 // 25)),
+                'gb-defra-index': min(10, 1 + int(pm2_5 // 12))
+            }
+        }
+    }
+
+
+def make_pollution_history_payload(lat, lon, start, end):
+    """
+    Payload seperti /data/2.5/air_pollution/history: satu item per jam dalam [start, end)
+
+    Args:
+        start, end: Unix timestamp
+    """
+    first = int(start) - int(start) % 3600 + (3600 if int(start) % 3600 else 0)
+    items = []
+    for dt in range(first, int(end), 3600):
+        items.extend(make_pollution_payload(lat, lon, seed=hash((round(lat, 4), round(lon, 4), dt)) & 0xFFFFFFFF, dt=dt)['list'])
+    return {'coord': {'lon': lon, 'lat': lat}, 'list': items}
+
+
+def make_weather_history_payload(lat, lon, date):
+    """
+    Payload seperti /v1/history.json WeatherAPI: 24 jam untuk tanggal `date` (YYYY-MM-DD)
+    """
+    day_start = int(datetime.strptime(date, '%Y-%m-%d').timestamp())
+    hours = []
+    for h in range(24):
+        epoch = day_start + h * 3600
+        current = make_weather_payload(lat, lon, seed=hash((round(lat, 4), round(lon, 4), epoch)) & 0xFFFFFFFF, epoch=epoch)['current']
+        hours.append({
+            'time_epoch': epoch,
+            'time': datetime.fromtimestamp(epoch).strftime('%Y-%m-%d %H:%M'),
+            'temp_c': current['temp_c'],
+            'wind_kph': current['wind_kph'],
+            'pressure_mb': current['pressure_mb'],
+            'humidity': current['humidity'],
+            'cloud': current['cloud']
+        })
+    return {
+        'location': {'lat': lat, 'lon': lon, 'tz_id': 'Asia/Jakarta'},
+        'forecast': {'forecastday': [{'date': date, 'date_epoch': day_start, 'hour': hours}]}
+    }
+
+
+def make_pollution_forecast_payload(lat, lon, hours=96, now=None):
+    """
+    Payload seperti /data/2.5/air_pollution/forecast: satu item per jam mulai jam sekarang
+
+    Args:
+        hours: Jumlah jam forecast (API asli ±96 jam)
+        now: Unix timestamp acuan (default: sekarang)
+    """
+    now = int(now if now is not None else time.time())
+    start = now - now % 3600
+    return make_pollution_history_payload(lat, lon, start, start + hours * 3600)
+
+
+def make_weather_forecast_payload(lat, lon, days=3, now=None):
+    """
+    Payload seperti /v1/forecast.json WeatherAPI: 24 jam per hari mulai hari ini (waktu lokal)
+    """
+    today = datetime.fromtimestamp(int(now if now is not None else time.time())).date()
+    payload = make_weather_history_payload(lat, lon, today.isoformat())
+    for offset in range(1, days):
+        date = (today + timedelta(days=offset)).isoformat()
+        payload['forecast']['forecastday'].extend(make_weather_history_payload(lat, lon, date)['forecast']['forecastday'])
+    return payload
+
+
+def make_locations(n, seed=42):
+    """
+    Membuat n lokasi (format sama dengan INDONESIAN_CITIES) untuk load test extract
+
+    n <= jumlah kota memakai kota asli; sisanya titik acak di sekitar kota-kota tersebut.
+    """
+    rng = random.Random(seed)
+    locations = []
+    for i in range(n):
+        city = INDONESIAN_CITIES[i % len(INDONESIAN_CITIES)]
+        if i < len(INDONESIAN_CITIES):
+            locations.append(dict(city))
+            continue
+        locations.append({
+            'name': f"{city['name']} #{i // len(INDONESIAN_CITIES)}",
+            'lat': round(city['lat'] + rng.uniform(-0.5, 0.5), 4),
+            'lon': round(city['lon'] + rng.uniform(-0.5, 0.5), 4),
+            'province': city['province']
+        })
+    return locations
+
+
+def make_raw_records(n, seed=42):
+    """
+    Membuat n record mentah dengan format yang sama seperti SimpleETL.data hasil extract
+
+    Lokasi diambil bergiliran dari INDONESIAN_CITIES dengan jitter koordinat kecil.
+
+    Returns:
+        list: record dict dengan key city, province, lat, lon, pollution, weather, timestamp
+    """
+    rng = random.Random(seed)
+    timestamp = datetime.now().isoformat()
+    records = []
+    for i in range(n):
+        city = INDONESIAN_CITIES[i % len(INDONESIAN_CITIES)]
+        lat = round(city['lat'] + rng.uniform(-0.2, 0.2), 4)
+        lon = round(city['lon'] + rng.uniform(-0.2, 0.2), 4)
+        records.append({
+            'city': city['name'],
+            'province': city['province'],
+            'lat': lat,
+            'lon': lon,
+            'pollution': make_pollution_payload(lat, lon, seed=seed + i),
+            'weather': make_weather_payload(lat, lon, seed=seed + i),
+            'timestamp': timestamp
+        })
+    return records
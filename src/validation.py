@@ -0,0 +1,244 @@
+"""
+Validasi batch kolom-per-kolom sebelum scoring
+
+Semua cek berupa mask numpy atas seluruh batch (bukan model per record), jadi biayanya
+beberapa mikrodetik per baris dan bisa selalu aktif, termasuk saat backfill besar:
+- parse   : payload tidak bisa dibaca / nilai bukan angka
+- missing : kolom wajib (VALIDATION_CONFIG['required']) kosong
+- range   : di luar rentang fisik (VALIDATION_CONFIG['ranges'])
+- timestamp / stale / future : timestamp fetch tidak valid, observasi provider lebih tua
+  dari max_age_hours sebelum timestamp fetch, atau lebih dari max_future_minutes di depan
+  jam sekarang (jam provider/payload rusak)
+
+Baris yang gagal dibuang dari batch dan ditulis ke output/quarantine/quarantine_<run_id>.ndjson
+(satu baris per record: alasan + nilai + payload mentah). Polutan opsional yang kosong tetap
+NaN (tidak lagi dianggap 0) dan hanya dihitung di laporan.
+
+Contoh:
+    python src/validation.py output/quarantine/quarantine_20251123_100000.ndjson
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+
+# Tambahkan path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import VALIDATION_CONFIG
+from src import fastjson
+
+LOCAL_TZ = datetime.now().astimezone().tzinfo
+
+# Satu file quarantine bisa ditulis beberapa thread (backfill paralel per lokasi)
+_write_lock = threading.Lock()
+
+
+def epoch_seconds(timestamps):
+    """Timestamp ISO (tanpa zona = waktu lokal) -> epoch detik float, NaN jika kosong/invalid"""
+    import pandas as pd
+
+    ts = pd.to_datetime(pd.Series(timestamps, dtype=object), format='ISO8601', errors='coerce')
+    if ts.dt.tz is None:
+        ts = ts.dt.tz_localize(LOCAL_TZ)
+    return (ts - pd.Timestamp(0, tz='UTC')).dt.total_seconds().to_numpy()
+
+
+def check_columns(columns, timestamps=None, observed=None, required=None, config=None, now=None):
+    """
+    Jalankan semua cek untuk satu batch
+
+    Args:
+        columns: Dict nama kolom (satuan output transform) -> array float
+        timestamps: Array timestamp fetch per baris (None = lewati cek waktu)
+        observed: Dict sumber -> array epoch observasi provider (NaN = tidak diketahui)
+        required: Override kolom wajib
+        now: Epoch acuan cek future (default: sekarang)
+
+    Returns:
+        dict: nama cek ('missing:pm2_5', 'range:humidity', 'stale:weather', ...) -> mask
+        bool (True = gagal)
+    """
+    config = config or VALIDATION_CONFIG
+    required = config['required'] if required is None else required
+    n = len(next(iter(columns.values()))) if columns else 0
+    checks = {}
+
+    for column in required:
+        values = columns.get(column)
+        checks[f"missing:{column}"] = np.ones(n, dtype=bool) if values is None else np.isnan(values)
+
+    with np.errstate(invalid='ignore'):
+        for column, (low, high) in config['ranges'].items():
+            if column in columns:
+                values = columns[column]
+                checks[f"range:{column}"] = (values < low) | (values > high)
+
+        if timestamps is not None:
+            reference = epoch_seconds(timestamps)
+            checks['timestamp'] = np.isnan(reference)
+            for source, values in (observed or {}).items():
+                checks[f"stale:{source}"] = reference - values > config['max_age_hours'] * 3600
+        # Acuan jam sekarang (bukan timestamp fetch): retry_failed mengisi record lama dengan observasi baru
+        limit = (time.time() if now is None else now) + config['max_future_minutes'] * 60
+        for source, values in (observed or {}).items():
+            checks[f"future:{source}"] = values > limit
+    return checks
+
+
+def missing_counts(columns, required=None, config=None, rows=None):
+    """Jumlah NaN per kolom opsional (tidak membuat baris gagal, hanya dilaporkan)"""
+    config = config or VALIDATION_CONFIG
+    required = set(config['required'] if required is None else required)
+    counts = {}
+    for column in config['ranges']:
+        if column in columns and column not in required:
+            missing = np.isnan(columns[column])
+            count = int((missing if rows is None else missing & rows).sum())
+            if count:
+                counts[column] = count
+    return counts
+
+
+class ValidationResult:
+    """
+    Hasil validasi satu batch
+
+    Attributes:
+        ok: Mask bool baris yang lolos
+        reasons: Dict index baris gagal -> list alasan
+        counts: Dict nama cek -> jumlah baris gagal
+        missing_optional: Dict kolom opsional -> jumlah NaN
+    """
+
+    def __init__(self, checks, n, parse_errors=(), missing_optional=None):
+        parsed = np.ones(n, dtype=bool)
+        for i, _ in parse_errors:
+            parsed[i] = False
+
+        # Baris yang gagal di-parse berisi nilai sembarang: hanya alasan parse yang dicatat
+        ok = parsed.copy()
+        self.counts = {}
+        failed = {}
+        for name, mask in checks.items():
+            mask = mask & parsed
+            if mask.any():
+                failed[name] = mask
+                self.counts[name] = int(mask.sum())
+                ok &= ~mask
+        if parse_errors:
+            self.counts['parse'] = len(parse_errors)
+
+        self.reasons = {int(i): [] for i in np.flatnonzero(~ok)}
+        for name, mask in failed.items():
+            for i in np.flatnonzero(mask):
+                self.reasons[int(i)].append(name)
+        for i, message in parse_errors:
+            self.reasons[int(i)] = [f"parse: {message}"]
+
+        self.ok = ok
+        self.n = n
+        self.missing_optional = missing_optional or {}
+
+    @property
+    def quarantined(self):
+        return self.n - int(self.ok.sum())
+
+    def summary(self):
+        return {
+            'rows': self.n,
+            'valid': self.n - self.quarantined,
+            'quarantined': self.quarantined,
+            'checks': dict(self.counts),
+            'missing_optional': dict(self.missing_optional)
+        }
+
+    def print_report(self):
+        print(f"\n🛡️  Validasi: {self.n - self.quarantined:,}/{self.n:,} valid, {self.quarantined:,} di-quarantine")
+        for name, count in sorted(self.counts.items(), key=lambda item: -item[1]):
+            print(f"   ❌ {name:22s}: {count:,}")
+        for column, count in self.missing_optional.items():
+            print(f"   ⚪ {column:22s}: {count:,} kosong (opsional)")
+
+
+def validate(columns, timestamps=None, observed=None, parse_errors=(), required=None, config=None, now=None):
+    """
+    Validasi batch (lihat check_columns)
+
+    Args:
+        parse_errors: List (index, pesan) record yang gagal di-parse
+
+    Returns:
+        ValidationResult
+    """
+    n = len(next(iter(columns.values()))) if columns else 0
+    checks = check_columns(columns, timestamps, observed, required, config, now)
+    parsed = None
+    if parse_errors:
+        parsed = np.ones(n, dtype=bool)
+        parsed[[i for i, _ in parse_errors]] = False
+    return ValidationResult(checks, n, parse_errors, missing_counts(columns, required, config, parsed))
+
+
+def quarantine_path(name, config=None):
+    config = config or VALIDATION_CONFIG
+    return os.path.join(config['quarantine_dir'], f"quarantine_{name}.ndjson")
+
+
+def write_quarantine(path, result, records):
+    """
+    Tambahkan baris gagal ke file NDJSON quarantine
+
+    Args:
+        result: ValidationResult
+        records: Fungsi index -> dict isi baris (nilai, payload mentah) untuk baris gagal
+
+    Returns:
+        int: jumlah baris yang ditulis
+    """
+    if not result.reasons:
+        return 0
+    quarantined_at = datetime.now().isoformat(timespec='seconds')
+    lines = [fastjson.dumps({'quarantined_at': quarantined_at, 'reasons': reasons, **records(i)})
+             for i, reasons in result.reasons.items()]
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with _write_lock, open(path, 'ab') as f:
+        f.write(b'\n'.join(lines) + b'\n')
+    return len(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Ringkasan file quarantine validasi')
+    parser.add_argument('paths', nargs='+', help='File output/quarantine/quarantine_*.ndjson')
+    args = parser.parse_args(argv)
+
+    reasons = Counter()
+    cities = Counter()
+    total = 0
+    for path in args.paths:
+        with open(path, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    row = fastjson.loads(line)
+                    total += 1
+                    cities[row.get('city')] += 1
+                    reasons.update(reason.split(':')[0] if reason.startswith('parse') else reason
+                                   for reason in row['reasons'])
+
+    print(f"\n🛡️  {total:,} baris di-quarantine ({len(args.paths)} file)")
+    for reason, count in reasons.most_common():
+        print(f"   ❌ {reason:22s}: {count:,}")
+    print("\n🏙️ Kota terbanyak:")
+    for city, count in cities.most_common(5):
+        print(f"   {str(city):15s}: {count:,}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())